@@ -45,109 +45,124 @@ def read_graph(filename):
     
     return graph
 
-def create_edge_list(graph):
-    """Convert adjacency list to a list of available edges."""
-    edges = defaultdict(list)
-    for node in graph:
-        for neighbor in graph[node]:
-            edges[node].append(neighbor)
-    return edges
-
-def calculate_degrees(graph):
-    """Calculate in-degree and out-degree for each node."""
-    in_degree = defaultdict(int)
-    out_degree = defaultdict(int)
-    
+def index_graph(graph):
+    """
+    Number the nodes of an adjacency list and store its edges in compressed form.
+
+    The edges leaving node i are targets[offsets[i]:offsets[i + 1]], in the order of the adjacency list.
+
+    Args:
+        graph: Dictionary mapping each node to the list of its successors (nodes of any hashable type)
+
+    Returns:
+        tuple: (nodes, offsets, targets) - nodes[i] is the node with ID i
+    """
+    node_ids = {}
+    nodes = []
     for node in graph:
-        out_degree[node] += len(graph[node])
-        for neighbor in graph[node]:
-            in_degree[neighbor] += 1
-    
-    # Ensure all nodes are in both dictionaries
-    all_nodes = set(graph.keys()) | set(in_degree.keys())
-    for node in all_nodes:
-        if node not in in_degree:
-            in_degree[node] = 0
-        if node not in out_degree:
-            out_degree[node] = 0
-    
-    return in_degree, out_degree
+        node_ids[node] = len(nodes)
+        nodes.append(node)
+    for successors in graph.values():
+        for successor in successors:
+            if successor not in node_ids:
+                node_ids[successor] = len(nodes)
+                nodes.append(successor)
 
-def find_start_node(graph):
-    """Find the starting node for Eulerian path."""
-    in_degree, out_degree = calculate_degrees(graph)
-    
-    # Look for node with out-degree - in-degree = 1 (start of path)
-    start_node = None
-    for node in set(list(in_degree.keys()) + list(out_degree.keys())):
-        if out_degree[node] - in_degree[node] == 1:
-            start_node = node
-            break
-    
-    # If no such node exists, start from any node with edges (Eulerian cycle case)
-    if start_node is None:
-        for node in graph:
-            if graph[node]:
-                start_node = node
-                break
-    
-    return start_node
+    offsets = [0] * (len(nodes) + 1)
+    targets = []
+    for node, successors in graph.items():
+        targets.extend(node_ids[successor] for successor in successors)
+        offsets[node_ids[node] + 1] = len(successors)
+    for i in range(len(nodes)):
+        offsets[i + 1] += offsets[i]
 
-def find_cycle(edges, start):
-    """Find a cycle starting from a given node."""
-    cycle = [start]
-    current = start
-    
-    while edges[current]:
-        next_node = edges[current].pop(0)
-        cycle.append(next_node)
-        current = next_node
-    
-    return cycle
-
-def has_unexplored_edges(edges):
-    """Check if there are any unexplored edges remaining."""
-    for node in edges:
-        if edges[node]:
-            return True
-    return False
-
-def find_node_with_unexplored_edges(cycle, edges):
-    """Find a node in the cycle that still has unexplored edges."""
-    for node in cycle:
-        if edges[node]:
+    # Nodes of graph come first and in order, so their edges are already laid out by offsets
+    return nodes, offsets, targets
+
+
+def eulerian_start(offsets, targets):
+    """
+    Start node ID of an Eulerian walk: the node with one more outgoing than incoming edge
+    if there is one (path), else the first node with an outgoing edge (cycle), None without edges.
+    """
+    node_count = len(offsets) - 1
+    balance = [offsets[i + 1] - offsets[i] for i in range(node_count)]
+    for target in targets:
+        balance[target] -= 1
+
+    for node in range(node_count):
+        if balance[node] == 1:
+            return node
+    for node in range(node_count):
+        if offsets[node + 1] > offsets[node]:
             return node
     return None
 
+
+def hierholzer(offsets, targets, start):
+    """
+    Eulerian walk from start with an iterative Hierholzer algorithm, in O(V + E).
+
+    A stack holds the current walk; each node keeps a cursor on its next unused edge.
+    The top of the stack follows unused edges while there are some; a node with none left
+    is final and moves to the walk, so the sub-cycles are spliced in without any list search.
+
+    Args:
+        offsets, targets: Edges of the graph (see index_graph)
+        start: Node ID to start from
+
+    Returns:
+        list: Node IDs of the walk, using each edge reachable from start once
+    """
+    cursor = offsets[:-1]
+    stack = [start]
+    walk = []
+
+    while stack:
+        node = stack[-1]
+        edge = cursor[node]
+        if edge < offsets[node + 1]:
+            cursor[node] = edge + 1
+            stack.append(targets[edge])
+        else:
+            walk.append(stack.pop())
+
+    walk.reverse()
+    return walk
+
+
+def eulerian_walk(graph, cycle=False):
+    """
+    Eulerian path or cycle of a directed graph, in O(V + E).
+
+    Args:
+        graph: Dictionary mapping each node to the list of its successors
+        cycle: Start from the first node with edges (Eulerian cycle, first and last nodes equal)
+               instead of looking for the unbalanced start node of a path
+
+    Returns:
+        list: Nodes of the walk ([] if the graph has no edges)
+    """
+    nodes, offsets, targets = index_graph(graph)
+
+    if cycle:
+        start = next((node for node in range(len(nodes)) if offsets[node + 1] > offsets[node]), None)
+    else:
+        start = eulerian_start(offsets, targets)
+    if start is None:
+        return []
+
+    return [nodes[node] for node in hierholzer(offsets, targets, start)]
+
+
 def eulerian_path(graph):
     """Find an Eulerian path in the graph."""
-    edges = create_edge_list(graph)
-    
-    # Find the starting node
-    start_node = find_start_node(graph)
-    
-    if start_node is None:
-        return []
-    
-    # Form initial cycle/path
-    path = find_cycle(edges, start_node)
-    
-    # While there are unexplored edges
-    while has_unexplored_edges(edges):
-        # Find a node in the current path with unexplored edges
-        new_start = find_node_with_unexplored_edges(path, edges)
-        
-        if new_start is None:
-            break
-        
-        # Form a new cycle starting from new_start
-        new_cycle = find_cycle(edges, new_start)
-        
-        # Merge: insert the new cycle at the position of new_start
-        idx = path.index(new_start)
-        path = path[:idx] + new_cycle + path[idx+1:]
-    
-    return path
+    return eulerian_walk(graph)
+
+
+def eulerian_cycle(graph):
+    """Find an Eulerian cycle in the graph."""
+    return eulerian_walk(graph, cycle=True)
 
 def path_to_genome(kmers):
     """
@@ -0,0 +1,145 @@
+#Streaming FASTA/FASTQ reader for sequencing reads and genomes
+#records are yielded one at a time from large buffered reads (gzip supported),
+#so a multi-GB run never has to be loaded in memory or turned into an intermediate list
+
+import gzip
+import io
+import sys
+
+from string_composition_problem import iter_composition_k
+from helpers import debruijn_graph_from_kmers
+
+BUFFER_SIZE = 1 << 22  # 4 MB reads from disk
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def open_sequence_file(filename):
+    """Open a plain or gzipped sequence file for buffered binary reading."""
+    with open(filename, 'rb') as f:
+        is_gzipped = f.read(2) == GZIP_MAGIC
+
+    if is_gzipped:
+        return io.BufferedReader(gzip.open(filename, 'rb'), buffer_size=BUFFER_SIZE)
+    return open(filename, 'rb', buffering=BUFFER_SIZE)
+
+
+def read_fasta(filename):
+    """
+    Yield the records of a FASTA file one at a time.
+
+    Args:
+        filename: Path of a FASTA file (optionally gzipped)
+
+    Yields:
+        tuple: (name, sequence) with the sequence lines joined
+    """
+    with open_sequence_file(filename) as f:
+        name = None
+        chunks = []
+
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+
+            if line.startswith(b'>'):
+                if name is not None:
+                    yield name, b''.join(chunks).decode('ascii')
+                name = line[1:].decode('ascii')
+                chunks = []
+            else:
+                chunks.append(line)
+
+        if name is not None:
+            yield name, b''.join(chunks).decode('ascii')
+
+
+def read_fastq(filename):
+    """
+    Yield the records of a FASTQ file one at a time.
+
+    Args:
+        filename: Path of a FASTQ file (optionally gzipped), 4 lines per record
+
+    Yields:
+        tuple: (name, sequence, quality)
+    """
+    with open_sequence_file(filename) as f:
+        while True:
+            header = f.readline()
+            if not header:
+                return
+            if not header.strip():
+                continue
+
+            sequence = f.readline().strip()
+            separator = f.readline()
+            quality = f.readline().strip()
+
+            if not header.startswith(b'@') or not separator.startswith(b'+'):
+                raise ValueError(f"Malformed FASTQ record: {header.strip().decode('ascii', 'replace')}")
+            if len(quality) != len(sequence):
+                raise ValueError(f"Quality length differs from sequence length in {header.strip().decode('ascii')}")
+
+            yield header[1:].strip().decode('ascii'), sequence.decode('ascii'), quality.decode('ascii')
+
+
+def read_sequences(filename):
+    """
+    Yield (name, sequence) records of a FASTA or FASTQ file, detected from its first symbol.
+    """
+    with open_sequence_file(filename) as f:
+        first_symbol = f.peek(1)[:1]
+
+    if first_symbol == b'@':
+        for name, sequence, _ in read_fastq(filename):
+            yield name, sequence
+    else:
+        yield from read_fasta(filename)
+
+
+def sequences(records):
+    """Adapter: keep only the sequence of each record."""
+    for record in records:
+        yield record[1]
+
+
+def kmers_from_reads(reads, k):
+    """
+    Adapter: yield the k-mer composition of every read, read after read.
+    k-mers never span two reads.
+
+    Args:
+        reads: Iterable of read sequences (e.g. sequences(read_fastq(filename)))
+        k: Length of k-mers
+    """
+    for read in reads:
+        yield from iter_composition_k(k, read)
+
+
+def debruijn_graph_from_reads(filename, k):
+    """
+    Build the De Bruijn graph of the k-mers of all reads in a FASTA/FASTQ file,
+    streaming the k-mers straight from the file into the graph.
+    """
+    return debruijn_graph_from_kmers(kmers_from_reads(sequences(read_sequences(filename)), k))
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python sequence_reader.py reads.fastq[.gz]")
+        return
+
+    record_count = 0
+    total_length = 0
+    for _, sequence in read_sequences(sys.argv[1]):
+        record_count += 1
+        total_length += len(sequence)
+
+    print(f"{record_count} records, {total_length} bases")
+    if record_count:
+        print(f"Mean length: {total_length / record_count:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,25 +5,41 @@
 
 #hypothesis = full coverage of genome (ideal situation) + order of k-mer doesn't matter yet
 
-def composition_k(k, text):
+def iter_composition_k(k, text):
     """
-    Find all k-mers in the given text.
+    Yield the k-mers of the given text one at a time (no list is built).
     
     Args:
         k: Length of each k-mer
-        text: The DNA string to analyze
+        text: The DNA string to analyze (str, or a bytes-like/uint8 view of a memory-mapped genome)
     
-    Returns:
-        List of k-mers
+    Yields:
+        k-mers in order of position
     """
-    kmers = []
+    if not isinstance(text, str):
+        # Decode each k-mer from the byte view instead of the whole genome
+        view = memoryview(text)
+        for i in range(len(view) - k + 1):
+            yield bytes(view[i:i+k]).decode('ascii')
+        return
     
     # Slide a window of size k across the text
     for i in range(len(text) - k + 1):
-        kmer = text[i:i+k]
-        kmers.append(kmer)
+        yield text[i:i+k]
+
+
+def composition_k(k, text):
+    """
+    Find all k-mers in the given text.
+    
+    Args:
+        k: Length of each k-mer
+        text: The DNA string to analyze (str, or a bytes-like/uint8 view of a memory-mapped genome)
     
-    return kmers
+    Returns:
+        List of k-mers
+    """
+    return list(iter_composition_k(k, text))
 
 
 def main():
@@ -1,4 +1,5 @@
 from collections import defaultdict
+from helpers import eulerian_path
 
 def build_paired_debruijn_graph(paired_reads):
     """
@@ -22,48 +23,6 @@ def build_paired_debruijn_graph(paired_reads):
     
     return graph
 
-def find_eulerian_path_paired(graph):
-    """Find Eulerian path in paired De Bruijn graph."""
-    # Calculate degrees
-    in_degree = defaultdict(int)
-    out_degree = defaultdict(int)
-    
-    for node in graph:
-        out_degree[node] = len(graph[node])
-        for neighbor in graph[node]:
-            in_degree[neighbor] += 1
-    
-    # Find start node
-    start_node = None
-    all_nodes = set(graph.keys()) | set(in_degree.keys())
-    
-    for node in all_nodes:
-        if out_degree[node] - in_degree[node] == 1:
-            start_node = node
-            break
-    
-    if start_node is None:
-        start_node = next(iter(graph.keys()))
-    
-    # Build path using Hierholzer's algorithm
-    edges = defaultdict(list)
-    for node in graph:
-        edges[node] = graph[node][:]
-    
-    stack = [start_node]
-    path = []
-    
-    while stack:
-        current = stack[-1]
-        if edges[current]:
-            next_node = edges[current].pop(0)
-            stack.append(next_node)
-        else:
-            path.append(stack.pop())
-    
-    path.reverse()
-    return path
-
 def string_spelled_by_gapped_patterns(gapped_patterns, k, d):
     """
     Reconstruct string from ordered gapped patterns.
@@ -114,7 +73,7 @@ def string_reconstruction_from_read_pairs(k, d, paired_reads):
     graph = build_paired_debruijn_graph(paired_reads)
     
     # Find Eulerian path
-    path = find_eulerian_path_paired(graph)
+    path = eulerian_path(graph)
     
     # Convert path nodes to gapped patterns
     # Each edge in the path represents a (k,d)-mer
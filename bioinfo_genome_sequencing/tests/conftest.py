@@ -0,0 +1,10 @@
+#Shared test setup
+#the genome_assembly scripts import each other by name (from helpers import ...), so their directory
+#is put on the path and the tests import them the same way
+
+import os
+import sys
+
+GENOME_ASSEMBLY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'genome_assembly')
+if GENOME_ASSEMBLY not in sys.path:
+    sys.path.insert(0, GENOME_ASSEMBLY)
@@ -0,0 +1,132 @@
+#Hierholzer engine: every edge once, consecutive nodes adjacent, walks starting and ending where they must
+
+import os
+import random
+from collections import Counter
+
+import pytest
+
+import eulerian_cycle as eulerian_cycle_script
+import eulerian_path as eulerian_path_script
+from helpers import eulerian_cycle, eulerian_path
+from string_read_pairs import string_reconstruction_from_read_pairs
+
+DATASETS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'datasets')
+
+
+def random_graph(rng, node_count, edge_count, closed, labels=None):
+    """
+    Graph made of the edges of one random walk, listed in random order:
+    balanced if the walk is closed, else semi-balanced (start and end differ).
+
+    Returns:
+        tuple: (graph, edges)
+    """
+    walk = [rng.randrange(node_count) for _ in range(edge_count)]
+    if closed:
+        walk.append(walk[0])
+    else:
+        walk.append(rng.choice([node for node in range(node_count) if node != walk[0]]))
+    if labels is not None:
+        walk = [labels[node] for node in walk]
+
+    edges = list(zip(walk, walk[1:]))
+    rng.shuffle(edges)
+    graph = {}
+    for source, target in edges:
+        graph.setdefault(source, []).append(target)
+    return graph, edges
+
+
+def balance(edges):
+    """Outgoing minus incoming edges of every node."""
+    counts = Counter()
+    for source, target in edges:
+        counts[source] += 1
+        counts[target] -= 1
+    return counts
+
+
+def assert_eulerian(graph, edges, walk):
+    # Consecutive nodes are adjacent, and the walk uses every edge exactly once
+    assert all(target in graph.get(source, ()) for source, target in zip(walk, walk[1:]))
+    assert Counter(zip(walk, walk[1:])) == Counter(edges)
+
+
+@pytest.mark.parametrize('labels', [None, ['ACG', 'CGT', 'GTA', 'TAC', 'ACC', 'CCG'],
+                                    [('AC', 'GT'), ('CA', 'TG'), ('GG', 'CC'), ('TT', 'AA')]])
+def test_random_balanced_graphs(labels):
+    rng = random.Random(str(labels))
+    for _ in range(200):
+        node_count = len(labels) if labels else rng.randint(1, 12)
+        graph, edges = random_graph(rng, node_count, rng.randint(1, 40), True, labels)
+        cycle = eulerian_cycle(graph)
+        assert_eulerian(graph, edges, cycle)
+        # Starts and ends at the first node with edges
+        assert cycle[0] == cycle[-1] == next(iter(graph))
+
+
+@pytest.mark.parametrize('labels', [None, ['ACG', 'CGT', 'GTA', 'TAC', 'ACC', 'CCG'],
+                                    [('AC', 'GT'), ('CA', 'TG'), ('GG', 'CC'), ('TT', 'AA')]])
+def test_random_semi_balanced_graphs(labels):
+    rng = random.Random(str(labels) + 'path')
+    for _ in range(200):
+        node_count = len(labels) if labels else rng.randint(2, 12)
+        graph, edges = random_graph(rng, node_count, rng.randint(1, 40), False, labels)
+        path = eulerian_path(graph)
+        assert_eulerian(graph, edges, path)
+        # From the node with one more outgoing edge to the node with one more incoming edge
+        node_balance = balance(edges)
+        assert node_balance[path[0]] == 1
+        assert node_balance[path[-1]] == -1
+
+
+def test_balanced_graph_as_path():
+    # A path on a balanced graph is a cycle from its first node with edges
+    graph = {2: [0], 0: [1, 2], 1: [0]}
+    path = eulerian_path(graph)
+    assert_eulerian(graph, [(2, 0), (0, 1), (0, 2), (1, 0)], path)
+    assert path[0] == path[-1] == 2
+
+
+def test_graphs_without_edges():
+    assert eulerian_path({}) == []
+    assert eulerian_cycle({}) == []
+    assert eulerian_path({0: [], 1: []}) == []
+    assert eulerian_cycle({0: [], 1: []}) == []
+
+
+def test_long_cycle():
+    rng = random.Random(0)
+    graph, edges = random_graph(rng, 1000, 100000, True)
+    assert_eulerian(graph, edges, eulerian_cycle(graph))
+
+
+def graph_edges(graph):
+    return [(source, target) for source, targets in graph.items() for target in targets]
+
+
+def test_eulerian_cycle_sample():
+    graph = eulerian_cycle_script.read_graph(os.path.join(DATASETS, 'dataset_6.txt'))
+    cycle = eulerian_cycle(graph)
+    assert_eulerian(graph, graph_edges(graph), cycle)
+    assert cycle[0] == cycle[-1]
+
+
+def test_eulerian_path_sample():
+    graph = eulerian_path_script.read_graph(os.path.join(DATASETS, 'dataset_7.txt'))
+    path = eulerian_path(graph)
+    assert_eulerian(graph, graph_edges(graph), path)
+    with open(os.path.join(DATASETS, 'output_7.txt')) as f:
+        expected = [int(node) for node in f.read().split()]
+    assert (path[0], path[-1]) == (expected[0], expected[-1])
+
+
+def test_read_pairs_sample():
+    with open(os.path.join(DATASETS, 'dataset_10.txt')) as f:
+        lines = f.read().split('\n')
+    k, d = map(int, lines[0].split())
+    paired_reads = [tuple(read.split('|')) for read in lines[1].split()]
+    with open(os.path.join(DATASETS, 'output_10.txt')) as f:
+        expected = f.read().strip()
+    assert string_reconstruction_from_read_pairs(k, d, paired_reads) == expected
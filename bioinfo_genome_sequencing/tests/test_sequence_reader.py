@@ -0,0 +1,128 @@
+#Streaming FASTA/FASTQ reader against the string k-mer composition and De Bruijn graph
+
+import gzip
+import random
+import types
+
+import numpy as np
+import pytest
+
+from debruijn_graph import debruijn_graph_from_string
+from debruijn_graph_with_kmers import debruijn_graph_from_kmers
+from sequence_reader import (debruijn_graph_from_reads, kmers_from_reads, open_sequence_file, read_fasta, read_fastq,
+                             read_sequences, sequences)
+from string_composition_problem import composition_k, iter_composition_k
+
+FASTA = b""">read_1 first record
+ACGTACGTAC
+GTTGCA
+
+>read_2
+ttgcaNNACG
+>read_3
+GATTACA
+"""
+FASTA_RECORDS = [('read_1 first record', 'ACGTACGTACGTTGCA'), ('read_2', 'ttgcaNNACG'), ('read_3', 'GATTACA')]
+
+FASTQ = b"""@read_1
+ACGTTGCAAC
++
+IIIIIHHHGG
+@read_2 lane 2
+GATTACA
++read_2 lane 2
+#######
+
+@read_3
+ACGTN
++
+IIII!
+"""
+FASTQ_RECORDS = [('read_1', 'ACGTTGCAAC', 'IIIIIHHHGG'), ('read_2 lane 2', 'GATTACA', '#######'),
+                 ('read_3', 'ACGTN', 'IIII!')]
+
+
+def reference_composition(k, text):
+    """The original composition_k loop."""
+    return [text[i:i + k] for i in range(len(text) - k + 1)]
+
+
+@pytest.fixture(params=['plain', 'gzip'])
+def write_file(request, tmp_path):
+    """Write content to a file, gzipped or not, under a name that does not tell which."""
+    def write(content, name='reads.txt'):
+        path = tmp_path / name
+        path.write_bytes(gzip.compress(content) if request.param == 'gzip' else content)
+        return str(path)
+    return write
+
+
+def test_read_fasta(write_file):
+    path = write_file(FASTA)
+    assert list(read_fasta(path)) == FASTA_RECORDS
+    assert list(read_sequences(path)) == FASTA_RECORDS
+
+
+def test_read_fastq(write_file):
+    path = write_file(FASTQ)
+    assert list(read_fastq(path)) == FASTQ_RECORDS
+    assert list(read_sequences(path)) == [record[:2] for record in FASTQ_RECORDS]
+
+
+def test_gzip_is_detected_from_the_content(tmp_path):
+    compressed = tmp_path / 'reads.fa'
+    compressed.write_bytes(gzip.compress(FASTA))
+    plain = tmp_path / 'reads.fa.gz'
+    plain.write_bytes(FASTA)
+    for path in (compressed, plain):
+        with open_sequence_file(str(path)) as f:
+            assert f.read() == FASTA
+
+
+@pytest.mark.parametrize('content', [
+    FASTQ + b"@read_4\nACGT\n",        # Separator and quality lines missing
+    FASTQ + b"@read_4\nACGT\n+\nIII\n",  # Quality shorter than the sequence
+    b"read_1\nACGT\n+\nIIII\n",        # Header without @
+])
+def test_truncated_fastq(write_file, content):
+    records = read_fastq(write_file(content))
+    with pytest.raises(ValueError):
+        list(records)
+
+
+def test_iter_composition_k():
+    rng = random.Random(0)
+    for _ in range(50):
+        k = rng.randint(1, 6)
+        text = ''.join(rng.choice('ACGTN') for _ in range(rng.randint(0, 20)))
+        assert isinstance(iter_composition_k(k, text), types.GeneratorType)
+        expected = reference_composition(k, text)
+        assert composition_k(k, text) == expected
+        data = text.encode('ascii')
+        for view in (data, bytearray(data), memoryview(data), np.frombuffer(data, dtype=np.uint8)):
+            assert list(iter_composition_k(k, view)) == expected
+
+
+@pytest.mark.parametrize('k', [2, 3, 5])
+def test_kmers_and_graph_from_reads(write_file, k):
+    rng = random.Random(k)
+    reads = [''.join(rng.choice('ACGT') for _ in range(rng.randint(1, 30))) for _ in range(20)]
+    fasta = b''.join(b'>read_%d\n%s\n' % (i, read.encode('ascii')) for i, read in enumerate(reads))
+    fastq = b''.join(b'@read_%d\n%s\n+\n%s\n' % (i, read.encode('ascii'), b'I' * len(read))
+                     for i, read in enumerate(reads))
+
+    # k-mers never span two reads
+    expected_kmers = [kmer for read in reads for kmer in reference_composition(k, read)]
+    expected_graph = debruijn_graph_from_kmers(expected_kmers)
+    for content, name in ((fasta, 'reads.fa'), (fastq, 'reads.fq')):
+        path = write_file(content, name)
+        assert list(kmers_from_reads(sequences(read_sequences(path)), k)) == expected_kmers
+        assert debruijn_graph_from_reads(path, k) == expected_graph
+
+
+def test_graph_of_one_genome(write_file):
+    rng = random.Random(1)
+    genome = ''.join(rng.choice('ACGT') for _ in range(200))
+    lines = b'\n'.join(genome[i:i + 60].encode('ascii') for i in range(0, len(genome), 60))
+    path = write_file(b'>genome\n' + lines + b'\n')
+    assert debruijn_graph_from_reads(path, 12) == debruijn_graph_from_string(12, genome)
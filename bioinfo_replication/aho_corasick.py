@@ -0,0 +1,188 @@
+#Aho-Corasick automaton for searching many DNA patterns in one pass over a genome
+#the trie of all patterns is completed into a DFA (every state has a transition for every symbol),
+#so scanning the genome costs one table lookup per nucleotide plus one step per reported match
+
+#symbols are compared as they are, like the string search: A, C, G, T get codes 0-3, every other
+#symbol used by the patterns (N, lower case, ...) gets a code of its own, and the symbols no pattern
+#uses share one last code that always leads back to the root
+
+#memory stays proportional to the total length of the patterns: all tables are flat int arrays
+#(one transition per symbol code + 2 links per trie node) and no output lists are copied between states
+
+from array import array
+from collections import deque
+
+import numpy as np
+
+from dna_encoding import NUCLEOTIDES, STRICT_BASE_TO_CODE, as_byte_array
+
+
+def symbol_codes(patterns):
+    """
+    Code of every ASCII byte for an automaton of the given patterns.
+
+    Returns:
+        tuple: (uint8 lookup table of 256 codes, number of distinct codes)
+    """
+    used = np.zeros(256, dtype=bool)
+    for pattern in patterns:
+        used[as_byte_array(pattern)] = True
+
+    table = STRICT_BASE_TO_CODE.copy()
+    used[table != 255] = False
+    others = np.flatnonzero(used)
+    table[others] = np.arange(len(NUCLEOTIDES), len(NUCLEOTIDES) + len(others))
+    width = len(NUCLEOTIDES) + len(others)
+
+    unused = table == 255
+    if unused.any():
+        table[unused] = width
+        width += 1
+    return table, width
+
+
+def build_automaton(patterns):
+    """
+    Build the Aho-Corasick automaton of a collection of DNA patterns.
+
+    Args:
+        patterns: Iterable of non-empty DNA strings (duplicates are merged)
+
+    Returns:
+        dict: Automaton tables
+            'patterns': list of distinct patterns (index = pattern id)
+            'symbol_codes': lookup table from ASCII byte to symbol code (see symbol_codes)
+            'width': number of symbol codes
+            'transitions': flat array, transitions[width * state + code] = next state
+            'terminal': terminal[state] = id of the pattern ending at state, or -1
+            'output_link': nearest terminal state on the failure chain, or -1
+    """
+    distinct_patterns = list(dict.fromkeys(patterns))
+    table, width = symbol_codes(distinct_patterns)
+
+    transitions = array('i', [-1] * width)
+    terminal = array('i', [-1])
+
+    # Step 1: Insert every pattern in the trie
+    for pattern_id, pattern in enumerate(distinct_patterns):
+        if not pattern:
+            raise ValueError("Patterns must be non-empty")
+
+        state = 0
+        for code in table[as_byte_array(pattern)].tolist():
+            next_state = transitions[width * state + code]
+            if next_state == -1:
+                next_state = len(terminal)
+                transitions[width * state + code] = next_state
+                transitions.extend([-1] * width)
+                terminal.append(-1)
+            state = next_state
+
+        terminal[state] = pattern_id
+
+    # Step 2: Breadth-first computation of failure links, completing missing transitions
+    state_count = len(terminal)
+    fail = array('i', [0] * state_count)
+    output_link = array('i', [-1] * state_count)
+
+    queue = deque()
+    for code in range(width):
+        child = transitions[code]
+        if child == -1:
+            transitions[code] = 0
+        else:
+            queue.append(child)
+
+    while queue:
+        state = queue.popleft()
+        for code in range(width):
+            child = transitions[width * state + code]
+            fallback = transitions[width * fail[state] + code]
+
+            if child == -1:
+                # Missing edge: go where the failure state would go
+                transitions[width * state + code] = fallback
+            else:
+                fail[child] = fallback
+                # Closest proper suffix of child that is itself a pattern
+                if terminal[fallback] != -1:
+                    output_link[child] = fallback
+                else:
+                    output_link[child] = output_link[fallback]
+                queue.append(child)
+
+    return {
+        'patterns': distinct_patterns,
+        'symbol_codes': table,
+        'width': width,
+        'transitions': transitions,
+        'terminal': terminal,
+        'output_link': output_link,
+    }
+
+
+def scan_automaton(automaton, genome, on_match):
+    """
+    Run the automaton over a genome, calling on_match(pattern_id, end_position)
+    for every (possibly overlapping) occurrence. end_position is the index of the last nucleotide.
+    """
+    transitions = automaton['transitions']
+    terminal = automaton['terminal']
+    output_link = automaton['output_link']
+    width = automaton['width']
+
+    state = 0
+    for position, code in enumerate(automaton['symbol_codes'][as_byte_array(genome)].tobytes()):
+        state = transitions[width * state + code]
+
+        match = state if terminal[state] != -1 else output_link[state]
+        while match != -1:
+            on_match(terminal[match], position)
+            match = output_link[match]
+
+
+def multiple_pattern_matching(patterns, genome, automaton=None):
+    """
+    Find all starting positions of every pattern in a genome in a single pass.
+
+    Args:
+        patterns: Collection of DNA patterns
+        genome: DNA string (str, bytes-like or uint8 array)
+        automaton: Optional automaton already built from patterns, to reuse across genomes
+
+    Returns:
+        dict: pattern -> sorted list of starting positions (0-indexed)
+    """
+    if automaton is None:
+        automaton = build_automaton(patterns)
+
+    distinct_patterns = automaton['patterns']
+    lengths = [len(pattern) for pattern in distinct_patterns]
+    positions = [[] for _ in distinct_patterns]
+
+    def record(pattern_id, end_position):
+        positions[pattern_id].append(end_position - lengths[pattern_id] + 1)
+
+    scan_automaton(automaton, genome, record)
+
+    return dict(zip(distinct_patterns, positions))
+
+
+def multiple_pattern_count(patterns, genome, automaton=None):
+    """
+    Count the (possibly overlapping) occurrences of every pattern in a genome in a single pass.
+
+    Returns:
+        dict: pattern -> number of occurrences
+    """
+    if automaton is None:
+        automaton = build_automaton(patterns)
+
+    counts = [0] * len(automaton['patterns'])
+
+    def record(pattern_id, end_position):
+        counts[pattern_id] += 1
+
+    scan_automaton(automaton, genome, record)
+
+    return dict(zip(automaton['patterns'], counts))
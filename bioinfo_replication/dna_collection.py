@@ -0,0 +1,156 @@
+#Encoded DNA collection in shared memory for multiprocess motif searches
+#the t sequences are stored back to back in one multiprocessing.shared_memory block, with an offsets array
+#(sequence i is [offsets[i]:offsets[i + 1]]), as:
+#- their original ASCII symbols: motifs are sliced from these, so case and other symbols are kept
+#- nucleotide codes (A=0, C=1, G=2, T=3, 4 for other symbols, the encoding of pwm_scanner), one per base
+#- given a motif length k <= 32, the 2-bit code of every k-mer (dna_encoding) and whether it is made only
+#  of A, C, G, T, precomputed once so that the scoring kernels of every worker read them in place
+#Pickling a collection only sends the block name and the offsets, so worker processes attach to
+#the same buffer without copying the sequences
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from dna_encoding import as_byte_array, kmer_text, masked_kmer_codes
+from pwm_scanner import encode_for_scan
+
+
+class DnaCollection:
+    """
+    t DNA sequences (symbols, codes and k-mer codes) in one shared memory buffer.
+
+    The process that creates the collection owns the shared block and frees it with close()
+    (or by using the collection as a context manager); processes that receive it attach to it.
+
+    Example:
+        with DnaCollection(dna_strings, k) as collection:
+            codes = collection.sequence(0)
+            kmer_codes, valid = collection.kmer_codes(0, k)
+            motif = collection.kmer(0, start, k)
+    """
+
+    def __init__(self, dna_strings, k=None):
+        """
+        Args:
+            dna_strings: DNA sequences (str, bytes-like or uint8 arrays)
+            k: Length of the k-mers whose codes are precomputed in the shared block (1 <= k <= 32, None: none)
+        """
+        symbols = [as_byte_array(dna_string) for dna_string in dna_strings]
+        self.k = k
+        self.offsets = np.zeros(len(symbols) + 1, dtype=np.int64)
+        self.offsets[1:] = np.cumsum([len(sequence) for sequence in symbols])
+        self.window_offsets = np.zeros(len(symbols) + 1, dtype=np.int64)
+        if k is not None:
+            self.window_offsets[1:] = np.cumsum([max(0, len(sequence) - k + 1) for sequence in symbols])
+
+        # Shared blocks cannot be empty
+        self._memory = shared_memory.SharedMemory(create=True, size=max(1, self._layout()[-1]))
+        self._owner = True
+        self._map_buffer()
+        for i, sequence in enumerate(symbols):
+            self.symbols[self.offsets[i]:self.offsets[i + 1]] = sequence
+            self.codes[self.offsets[i]:self.offsets[i + 1]] = encode_for_scan(sequence)
+            if k is not None:
+                windows = slice(self.window_offsets[i], self.window_offsets[i + 1])
+                self.window_codes[windows], self.window_valid[windows] = masked_kmer_codes(sequence, k)
+
+    @classmethod
+    def _attach(cls, name, offsets, k, window_offsets):
+        """Attach to the shared block of a collection created by another process."""
+        collection = cls.__new__(cls)
+        collection.offsets = offsets
+        collection.k = k
+        collection.window_offsets = window_offsets
+        collection._memory = shared_memory.SharedMemory(name=name)
+        collection._owner = False
+        collection._map_buffer()
+        return collection
+
+    def _layout(self):
+        """Byte offsets of the k-mer codes and of their valid flags in the shared block, and its size."""
+        length = int(self.offsets[-1])
+        window_count = int(self.window_offsets[-1])
+        # The uint64 k-mer codes start on an 8-byte boundary
+        codes_start = -(-2 * length // 8) * 8
+        valid_start = codes_start + 8 * window_count
+        return codes_start, valid_start, valid_start + window_count
+
+    def _map_buffer(self):
+        """Symbols, codes, then the k-mer codes and their valid flags, back to back in the shared block."""
+        length = int(self.offsets[-1])
+        window_count = int(self.window_offsets[-1])
+        codes_start, valid_start, _ = self._layout()
+        buffer = self._memory.buf
+        self.symbols = np.ndarray(length, dtype=np.uint8, buffer=buffer)
+        self.codes = np.ndarray(length, dtype=np.uint8, buffer=buffer, offset=length)
+        self.window_codes = np.ndarray(window_count, dtype=np.uint64, buffer=buffer, offset=codes_start)
+        self.window_valid = np.ndarray(window_count, dtype=bool, buffer=buffer, offset=valid_start)
+
+    def __reduce__(self):
+        return DnaCollection._attach, (self._memory.name, self.offsets, self.k, self.window_offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Detach from the shared block (and free it in the process that created it)."""
+        self.symbols = None
+        self.codes = None
+        self.window_codes = None
+        self.window_valid = None
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+    def _view(self, array, i, offsets=None):
+        if offsets is None:
+            offsets = self.offsets
+        view = array[offsets[i]:offsets[i + 1]]
+        view.flags.writeable = False
+        return view
+
+    def sequence(self, i):
+        """Codes of sequence i (a read-only view of the shared buffer)."""
+        return self._view(self.codes, i)
+
+    def sequences(self):
+        """Codes of every sequence."""
+        return [self.sequence(i) for i in range(len(self))]
+
+    def symbol_view(self, i):
+        """ASCII symbols of sequence i as given (a read-only view of the shared buffer)."""
+        return self._view(self.symbols, i)
+
+    def symbol_views(self):
+        """ASCII symbols of every sequence."""
+        return [self.symbol_view(i) for i in range(len(self))]
+
+    def string(self, i):
+        """Sequence i as a string, exactly as given."""
+        return kmer_text(self.symbol_view(i), 0, len(self.symbol_view(i)))
+
+    def kmer(self, i, start, k):
+        """k-mer of sequence i starting at start, as a string."""
+        return kmer_text(self.symbol_view(i), start, k)
+
+    def kmer_codes(self, i, k):
+        """
+        Masked codes of all k-mers of sequence i (see dna_encoding.masked_kmer_codes).
+
+        For the k given to the collection these are read-only views of the shared buffer;
+        for another k they are computed from the symbols in this process.
+
+        Returns:
+            tuple: (codes, valid)
+        """
+        if k == self.k:
+            return (self._view(self.window_codes, i, self.window_offsets),
+                    self._view(self.window_valid, i, self.window_offsets))
+        return masked_kmer_codes(self.symbol_view(i), k)
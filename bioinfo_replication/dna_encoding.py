@@ -0,0 +1,223 @@
+#2-bit encoding of DNA shared by the k-mer engines
+#A=0, C=1, G=2, T=3 (same row order as the profile matrices in part_3 and part_4)
+#a k-mer of length k <= 32 then fits in one unsigned 64-bit integer,
+#with the first nucleotide in the most significant bits so that code order = lexicographic order
+
+import numpy as np
+
+NUCLEOTIDES = 'ACGT'
+MAX_K = 32
+
+# Lookup table from ASCII byte to 2-bit code (255 marks an invalid symbol)
+BASE_TO_CODE = np.full(256, 255, dtype=np.uint8)
+for _code, _nucleotide in enumerate(NUCLEOTIDES):
+    BASE_TO_CODE[ord(_nucleotide)] = _code
+    BASE_TO_CODE[ord(_nucleotide.lower())] = _code
+
+# Same table for upper-case A, C, G, T only: the string versions of the algorithms compare symbols
+# as they are, so lower-case k-mers are distinct k-mers there and must not share codes with upper-case ones
+STRICT_BASE_TO_CODE = np.full(256, 255, dtype=np.uint8)
+for _code, _nucleotide in enumerate(NUCLEOTIDES):
+    STRICT_BASE_TO_CODE[ord(_nucleotide)] = _code
+
+# Reverse complement of the 4 nucleotides packed in one byte (complement of code c is 3 - c)
+REVERSE_COMPLEMENT_BYTE = np.zeros(256, dtype=np.uint8)
+for _byte in range(256):
+    for _position in range(4):
+        _complement = 3 - ((_byte >> (2 * _position)) & 3)
+        REVERSE_COMPLEMENT_BYTE[_byte] |= _complement << (2 * (3 - _position))
+
+
+def as_byte_array(sequence):
+    """
+    View a DNA sequence as a NumPy array of ASCII bytes without copying when possible.
+
+    Args:
+        sequence: str, bytes, bytearray, memoryview or uint8 NumPy array
+
+    Returns:
+        np.ndarray: uint8 array of ASCII characters
+    """
+    if isinstance(sequence, np.ndarray):
+        return sequence.astype(np.uint8, copy=False)
+    if isinstance(sequence, str):
+        sequence = sequence.encode('ascii')
+    return np.frombuffer(sequence, dtype=np.uint8)
+
+
+def encode_sequence(sequence):
+    """
+    Encode a DNA sequence into an array of 2-bit nucleotide codes.
+
+    Args:
+        sequence: str, bytes, bytearray, memoryview or uint8 NumPy array of ASCII characters
+
+    Returns:
+        np.ndarray: uint8 array of codes (A=0, C=1, G=2, T=3)
+
+    Raises:
+        ValueError: If the sequence contains a symbol other than A, C, G, T
+    """
+    codes = BASE_TO_CODE[as_byte_array(sequence)]
+
+    if codes.size and codes.max() == 255:
+        position = int(np.argmax(codes == 255))
+        raise ValueError(f"Invalid nucleotide at position {position}")
+
+    return codes
+
+
+def encode_kmer(kmer):
+    """
+    Encode a single k-mer into its integer code.
+    For example: ACG -> 0b000110 = 6
+    """
+    code = 0
+    for nucleotide in encode_sequence(kmer):
+        code = (code << 2) | int(nucleotide)
+    return code
+
+
+def decode_kmer(code, k):
+    """
+    Decode an integer code back into its k-mer string.
+    For example: decode_kmer(6, 3) -> ACG
+    """
+    code = int(code)
+    nucleotides = []
+    for _ in range(k):
+        nucleotides.append(NUCLEOTIDES[code & 3])
+        code >>= 2
+    return ''.join(reversed(nucleotides))
+
+
+def kmer_codes(sequence, k):
+    """
+    Compute the integer code of every k-mer of a sequence.
+
+    Instead of rolling one position at a time in Python, codes for windows of
+    length 1, 2, 4, 8, ... are built by doubling (code_2m[i] = code_m[i] << 2m | code_m[i+m])
+    and combined following the binary decomposition of k, so the whole
+    array is produced in O(n log k) vectorized operations.
+
+    Args:
+        sequence: DNA sequence (str, bytes-like or uint8 array) or an already encoded uint8 code array
+        k: Length of k-mers (1 <= k <= 32)
+
+    Returns:
+        np.ndarray: uint64 array of length len(sequence) - k + 1, element i being the code of sequence[i:i+k]
+    """
+    if not 1 <= k <= MAX_K:
+        raise ValueError(f"k must be between 1 and {MAX_K}")
+
+    if isinstance(sequence, np.ndarray) and sequence.size and sequence.max() <= 3:
+        bases = sequence.astype(np.uint64)
+    else:
+        bases = encode_sequence(sequence).astype(np.uint64)
+
+    n = len(bases)
+    if n < k:
+        return np.empty(0, dtype=np.uint64)
+
+    codes = None
+    codes_length = 0
+    block = bases
+    block_length = 1
+    remaining = k
+
+    while remaining:
+        # Append the current block to the codes built so far
+        if remaining & 1:
+            if codes is None:
+                codes, codes_length = block, block_length
+            else:
+                count = n - codes_length - block_length + 1
+                shift = np.uint64(2 * block_length)
+                codes = (codes[:count] << shift) | block[codes_length:codes_length + count]
+                codes_length += block_length
+
+        remaining >>= 1
+
+        # Double the block length for the next bit of k
+        if remaining:
+            count = n - 2 * block_length + 1
+            shift = np.uint64(2 * block_length)
+            block = (block[:count] << shift) | block[block_length:block_length + count]
+            block_length *= 2
+
+    return codes
+
+
+def masked_kmer_codes(sequence, k, ignore_case=False):
+    """
+    Integer code of every k-mer of a sequence that may contain symbols other than A, C, G, T.
+
+    Args:
+        sequence: DNA sequence (str, bytes-like or uint8 array) or an already encoded uint8 code array
+        k: Length of k-mers (1 <= k <= 32)
+        ignore_case: Encode a, c, g, t like A, C, G, T (by default they count as other symbols)
+
+    Returns:
+        tuple: (codes, valid) - codes as returned by kmer_codes, and a bool array marking the k-mers
+               made only of A, C, G, T (the codes of the other k-mers are meaningless)
+    """
+    if isinstance(sequence, np.ndarray) and sequence.size and sequence.max() <= 3:
+        codes = kmer_codes(sequence, k)
+        return codes, np.ones(len(codes), dtype=bool)
+
+    table = BASE_TO_CODE if ignore_case else STRICT_BASE_TO_CODE
+    bases = table[as_byte_array(sequence)]
+    invalid = bases == 255
+    if not invalid.any():
+        codes = kmer_codes(bases, k)
+        return codes, np.ones(len(codes), dtype=bool)
+
+    bases[invalid] = 0
+    codes = kmer_codes(bases, k)
+
+    # Number of invalid symbols inside each window of length k
+    invalid_before = np.concatenate(([0], np.cumsum(invalid)))
+    valid = invalid_before[k:] == invalid_before[:-k] if len(bases) >= k else np.empty(0, dtype=bool)
+    return codes, valid
+
+
+def is_nucleotide_string(text):
+    """True if text only holds upper-case A, C, G, T (so its k-mer codes stand for it exactly)."""
+    if isinstance(text, str) and not text.isascii():
+        return False
+    return bool((STRICT_BASE_TO_CODE[as_byte_array(text)] != 255).all())
+
+
+def kmer_text(sequence, start, k):
+    """k-mer of a sequence starting at start, as a string (sliced as is, whatever its symbols)."""
+    if isinstance(sequence, str):
+        return sequence[start:start + k]
+    return as_byte_array(sequence)[start:start + k].tobytes().decode('latin-1')
+
+
+def reverse_complement_codes(codes, k):
+    """
+    Codes of the reverse complements of an array of k-mer codes.
+
+    Each code is handled as 32 nucleotides (4 per byte): every byte goes through
+    REVERSE_COMPLEMENT_BYTE, the byte order is reversed, and the complemented
+    padding (now at the low end) is shifted out.
+
+    Args:
+        codes: Array of k-mer codes
+        k: Length of k-mers (1 <= k <= 32)
+
+    Returns:
+        np.ndarray: uint64 array, element i being the code of the reverse complement of k-mer i
+    """
+    codes = np.ascontiguousarray(codes, dtype=np.uint64)
+    complemented = REVERSE_COMPLEMENT_BYTE[codes.view(np.uint8)].view(np.uint64).byteswap()
+    return complemented >> np.uint64(2 * (MAX_K - k))
+
+
+def reverse_complement_code(code, k):
+    """
+    Code of the reverse complement of a k-mer code.
+    For example: reverse_complement_code(encode_kmer('AACG'), 4) == encode_kmer('CGTT')
+    """
+    return int(reverse_complement_codes(np.array([code], dtype=np.uint64), k)[0])
@@ -0,0 +1,168 @@
+#Expectation-maximization motif finder (MEME's OOPS model: One Occurrence Per Sequence)
+#each DNA string holds one occurrence of the motif at an unknown position, the rest being background.
+#E-step: the posterior probability of every window of every string being the occurrence is its likelihood
+#ratio under the profile and under the background, normalized over the windows of the string.
+#M-step: the new profile is made of the nucleotide counts of all windows weighted by their posteriors.
+#both steps cover all windows of all strings at once (padded code matrix of pwm_scanner), so an iteration
+#is k gathers and k weighted bincounts; started from the greedy motifs it converges in tens of iterations
+
+import numpy as np
+
+from motif_profile import MotifProfile
+from parallel_motif_search import parallel_greedy_motif_search
+from pwm_scanner import encode_padded, first_best, log_profile, padded_window_log_scores
+
+# Stop after this many iterations even if the profile still changes
+EM_MAX_ITERATIONS = 200
+# Converged once no profile entry moves by more than this in an iteration
+EM_TOLERANCE = 1e-6
+
+
+def background_log_frequencies(codes):
+    """
+    Log-frequencies of A, C, G, T over encoded sequences (zero-order background model),
+    with one pseudocount per nucleotide.
+
+    Args:
+        codes: Array from encode_padded
+
+    Returns:
+        np.ndarray: Array of 4 log-frequencies
+    """
+    counts = np.bincount(codes.ravel(), minlength=5)[:4] + 1
+    return np.log(counts / counts.sum())
+
+
+def window_log_odds(codes, profile, log_background):
+    """
+    Log-likelihood ratio (profile against background) of every window of every sequence,
+    -inf for windows holding other symbols or running past the end of a sequence.
+
+    Returns:
+        np.ndarray: (number of sequences, longest length - k + 1) array
+    """
+    log_probabilities = log_profile(profile)
+    log_probabilities[:4] -= log_background[:, None]
+    return padded_window_log_scores(codes, log_probabilities)
+
+
+def window_posteriors(log_odds):
+    """
+    E-step: posterior probability of each window being the motif occurrence of its sequence.
+    Sequences without any possible window get posteriors 0.
+
+    Returns:
+        tuple: (posteriors, log_likelihood) - posteriors has the shape of log_odds, log_likelihood is the
+               log-likelihood ratio of the sequences against the background (up to a constant)
+    """
+    if log_odds.shape[1] == 0:
+        return np.zeros(log_odds.shape), 0.0
+
+    # Subtract the best window of each sequence before exponentiating (no overflow or underflow)
+    best = log_odds.max(axis=1, keepdims=True)
+    has_window = np.isfinite(best)
+    shifted = np.exp(log_odds - np.where(has_window, best, 0.0))
+    totals = shifted.sum(axis=1, keepdims=True)
+
+    posteriors = np.divide(shifted, totals, out=np.zeros_like(shifted), where=has_window)
+    log_likelihood = float((best[has_window] + np.log(totals[has_window])).sum())
+    return posteriors, log_likelihood
+
+
+def weighted_counts(codes, posteriors, k):
+    """
+    M-step: nucleotide counts of every motif position, each window counting for its posterior.
+
+    Returns:
+        np.ndarray: (4, k) float array, rows A, C, G, T
+    """
+    window_count = posteriors.shape[1]
+    weights = posteriors.ravel()
+    counts = np.empty((4, k))
+    for j in range(k):
+        # Windows past the end only read padding (code 4), and have weight 0 anyway
+        counts[:, j] = np.bincount(codes[:, j:j + window_count].ravel(), weights=weights, minlength=5)[:4]
+    return counts
+
+
+def expectation_maximization(dna_strings, k, initial_motifs, max_iterations=EM_MAX_ITERATIONS,
+                             tolerance=EM_TOLERANCE, pseudocount=1):
+    """
+    Refine a motif profile with the EM algorithm of the OOPS model.
+
+    Args:
+        dna_strings: List of DNA strings
+        k: Length of motifs
+        initial_motifs: Motifs of the starting profile (counted with pseudocounts, see MotifProfile)
+        max_iterations: Maximum number of E/M iterations
+        tolerance: Stop once no profile entry changes by more than this
+        pseudocount: Added to every weighted count of the M-step
+
+    Returns:
+        dict: {
+            'profile': (4, k) profile matrix, rows A, C, G, T,
+            'motifs': most probable occurrence in each string under the profile ("" for strings shorter than k),
+            'iterations': number of iterations done,
+            'log_likelihood': log-likelihood ratio of the last E-step,
+            'converged': True if the tolerance was reached
+        }
+    """
+    codes = encode_padded(dna_strings)
+    log_background = background_log_frequencies(codes)
+    profile = MotifProfile.from_motifs(initial_motifs, k).profile()
+
+    iterations = 0
+    log_likelihood = 0.0
+    converged = False
+    while iterations < max_iterations:
+        iterations += 1
+        posteriors, log_likelihood = window_posteriors(window_log_odds(codes, profile, log_background))
+
+        counts = weighted_counts(codes, posteriors, k) + pseudocount
+        new_profile = counts / counts.sum(axis=0)
+
+        change = float(np.abs(new_profile - profile).max())
+        profile = new_profile
+        if change <= tolerance:
+            converged = True
+            break
+
+    # Occurrence of each string: its window of highest posterior (the first one in case of ties)
+    log_odds = window_log_odds(codes, profile, log_background)
+    positions = first_best(log_odds).tolist() if log_odds.shape[1] else [0] * len(dna_strings)
+    motifs = [
+        dna_string[position:position + k] if len(dna_string) >= k else ""
+        for position, dna_string in zip(positions, dna_strings)
+    ]
+
+    return {
+        'profile': profile,
+        'motifs': motifs,
+        'iterations': iterations,
+        'log_likelihood': log_likelihood,
+        'converged': converged,
+    }
+
+
+def em_motif_search(dna_strings, k, t, initial_motifs=None, workers=1, max_iterations=EM_MAX_ITERATIONS,
+                    tolerance=EM_TOLERANCE, pseudocount=1):
+    """
+    Find motifs with the EM algorithm, started from the GreedyMotifSearch (with pseudocounts) motifs.
+
+    Args:
+        dna_strings: List of DNA strings
+        k: Length of motifs
+        t: Number of strings
+        initial_motifs: Starting motifs (default: result of the greedy search)
+        workers: Number of processes of the greedy search
+        max_iterations: Maximum number of E/M iterations
+        tolerance: Stop once no profile entry changes by more than this
+        pseudocount: Added to every weighted count of the M-step
+
+    Returns:
+        list: Motifs found, one per string
+    """
+    if initial_motifs is None:
+        initial_motifs = parallel_greedy_motif_search(dna_strings[:t], k, t, workers)
+    result = expectation_maximization(dna_strings[:t], k, initial_motifs, max_iterations, tolerance, pseudocount)
+    return result['motifs']
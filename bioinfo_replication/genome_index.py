@@ -0,0 +1,302 @@
+#Persistent genome index: suffix array + Burrows-Wheeler transform / FM-index
+#built once per genome and saved to disk, then every exact query costs O(|Pattern|)
+#instead of a full O(|Genome|) rescan, and approximate queries backtrack over the index
+
+#rows of the index are the sorted suffixes of Genome$, symbols are the codes A=0, C=1, G=2, T=3,
+#then one code per other symbol of the genome (N, lower case, ...), compared as they are like the
+#string search, and the sentinel $ (smaller than everything, stored as the code after the last symbol)
+
+import sys
+
+import numpy as np
+
+from dna_encoding import NUCLEOTIDES, as_byte_array
+from sequence_loader import load_genome
+
+# One occurrence checkpoint every OCC_STEP rows of the BWT
+OCC_STEP = 64
+# Symbols of indexes saved without their alphabet
+DEFAULT_SYMBOLS = np.frombuffer(NUCLEOTIDES.encode('ascii'), dtype=np.uint8)
+
+
+def genome_alphabet(data):
+    """
+    Symbols of the index of a genome: A, C, G, T, then every other byte of the genome in byte order.
+
+    Returns:
+        np.ndarray: uint8 array, symbols[code] = ASCII byte
+    """
+    present = np.bincount(data, minlength=256) > 0
+    present[DEFAULT_SYMBOLS] = False
+    return np.concatenate((DEFAULT_SYMBOLS, np.flatnonzero(present).astype(np.uint8)))
+
+
+def _pattern_codes(index, pattern):
+    """Codes of the symbols of a pattern in an index, -1 for symbols absent from the genome."""
+    table = np.full(256, -1, dtype=np.int16)
+    symbols = index.get('symbols', DEFAULT_SYMBOLS)
+    table[symbols] = np.arange(len(symbols))
+    return table[as_byte_array(pattern)].tolist()
+
+
+def build_suffix_array(codes):
+    """
+    Build the suffix array of Genome$ by prefix doubling.
+
+    Suffixes are first ranked by their first symbols packed in one integer (21 for A, C, G, T),
+    then the rank of (suffix i) is refined with the rank of (suffix i + h) while ties remain,
+    doubling h each round. Each round is one NumPy sort.
+
+    Args:
+        codes: uint8 array of symbol codes (without sentinel)
+
+    Returns:
+        np.ndarray: Suffix array of length len(codes) + 1 (position of the i-th smallest suffix)
+    """
+    n = len(codes) + 1
+    # Each symbol takes the bits of code + 1 (0 past the end), as many as fit in an int64 sort key
+    bits = (int(codes.max()) + 1 if len(codes) else 1).bit_length()
+    packed_symbols = 63 // bits
+    symbols = np.zeros(n + packed_symbols, dtype=np.int64)
+    symbols[:n - 1] = codes.astype(np.int64) + 1
+
+    # Step 1: Rank suffixes by their first symbols
+    keys = np.zeros(n, dtype=np.int64)
+    for offset in range(packed_symbols):
+        keys = (keys << bits) | symbols[offset:offset + n]
+
+    # Suffixes are sorted by (rank, following); the first round only has the packed keys
+    rank, following = keys, None
+    h = packed_symbols
+    while True:
+        if following is None:
+            suffix_array = np.argsort(rank, kind='stable')
+        else:
+            suffix_array = np.lexsort((following, rank))
+
+        # Equal (rank, following) pairs share a new rank (index of the first suffix of the group, starting at 1)
+        sorted_rank = rank[suffix_array]
+        is_new_group = np.empty(n, dtype=bool)
+        is_new_group[0] = True
+        np.not_equal(sorted_rank[1:], sorted_rank[:-1], out=is_new_group[1:])
+        if following is not None:
+            sorted_following = following[suffix_array]
+            is_new_group[1:] |= sorted_following[1:] != sorted_following[:-1]
+        group_start = np.maximum.accumulate(np.where(is_new_group, np.arange(n), 0))
+
+        rank = np.empty(n, dtype=np.int64)
+        rank[suffix_array] = group_start + 1
+
+        if is_new_group.all():
+            return suffix_array
+
+        # Step 2: Refine with the rank h positions further (0 past the end)
+        following = np.zeros(n, dtype=np.int64)
+        if h < n:
+            following[:n - h] = rank[h:]
+        h *= 2
+
+
+def build_genome_index(genome):
+    """
+    Build the FM-index of a genome.
+
+    Args:
+        genome: DNA sequence (str, bytes-like or uint8 array)
+
+    Returns:
+        dict: Index arrays
+            'symbols': ASCII byte of every symbol code (see genome_alphabet)
+            'suffix_array': positions of the sorted suffixes of Genome$
+            'bwt': last column of the sorted rotations (codes, len(symbols) for $)
+            'checkpoints': cumulative count of every symbol in bwt before every OCC_STEP-th row
+            'first_row': first_row[c] = first row starting with symbol c (the C array)
+    """
+    data = as_byte_array(genome)
+    symbols = genome_alphabet(data)
+    symbol_count = len(symbols)
+    if symbol_count > 255:
+        raise ValueError("Genomes with more than 255 distinct symbols cannot be indexed")
+
+    table = np.zeros(256, dtype=np.uint8)
+    table[symbols] = np.arange(symbol_count)
+    codes = table[data]
+    n = len(codes) + 1
+
+    suffix_array = build_suffix_array(codes)
+    index_dtype = np.uint32 if n < 2 ** 32 else np.uint64
+    suffix_array = suffix_array.astype(index_dtype)
+
+    # BWT: symbol preceding each sorted suffix
+    text = np.empty(n, dtype=np.uint8)
+    text[:-1] = codes
+    text[-1] = symbol_count
+    bwt = text[suffix_array.astype(np.int64) - 1]
+
+    # Occurrence checkpoints every OCC_STEP rows
+    checkpoints = np.zeros((n // OCC_STEP + 1, symbol_count), dtype=index_dtype)
+    for code in range(symbol_count):
+        running_count = np.cumsum(bwt == code, dtype=index_dtype)
+        checkpoints[1:, code] = running_count[OCC_STEP - 1::OCC_STEP][:n // OCC_STEP]
+
+    symbol_counts = np.bincount(codes, minlength=symbol_count)
+    first_row = np.empty(symbol_count, dtype=np.int64)
+    first_row[0] = 1  # row 0 is the sentinel suffix
+    first_row[1:] = 1 + np.cumsum(symbol_counts)[:-1]
+
+    return {
+        'symbols': symbols,
+        'suffix_array': suffix_array,
+        'bwt': bwt,
+        'checkpoints': checkpoints,
+        'first_row': first_row,
+    }
+
+
+def save_genome_index(index, path):
+    """
+    Save the index arrays to an uncompressed .npz file.
+    The file is written at path as given (np.savez would append .npz to a path without it).
+    """
+    with open(path, 'wb') as f:
+        np.savez(f, **index)
+
+
+def load_genome_index(path):
+    """Load an index saved with save_genome_index."""
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def index_genome_file(genome_path, index_path):
+    """
+    Build the index of a genome file once and save it to disk.
+    Accepts a plain sequence file or a FASTA file (header lines are skipped).
+    """
+    index = build_genome_index(load_genome(genome_path))
+    save_genome_index(index, index_path)
+    return index
+
+
+def _occurrences(index, row):
+    """Number of every symbol in bwt[0:row] (one checkpoint lookup + at most OCC_STEP - 1 symbols)."""
+    block = row // OCC_STEP
+    counts = index['checkpoints'][block].astype(np.int64)
+    tail = index['bwt'][block * OCC_STEP:row]
+    if tail.size:
+        counts = counts + np.bincount(tail, minlength=len(counts) + 1)[:len(counts)]
+    return counts
+
+
+def _backward_search(index, codes):
+    """Return the row interval [top, bottom) of suffixes starting with the encoded pattern."""
+    first_row = index['first_row']
+    top, bottom = 0, len(index['bwt'])
+    if -1 in codes:
+        return 0, 0
+
+    for code in reversed(codes):
+        top = first_row[code] + _occurrences(index, top)[code]
+        bottom = first_row[code] + _occurrences(index, bottom)[code]
+        if top >= bottom:
+            return 0, 0
+
+    return int(top), int(bottom)
+
+
+def count_pattern(index, pattern):
+    """Count the occurrences of pattern in the indexed genome in O(|pattern|)."""
+    top, bottom = _backward_search(index, _pattern_codes(index, pattern))
+    return bottom - top
+
+
+def locate_pattern(index, pattern):
+    """
+    Find all starting positions of pattern in the indexed genome.
+
+    Returns:
+        list: Sorted starting positions (0-indexed)
+    """
+    top, bottom = _backward_search(index, _pattern_codes(index, pattern))
+    return sorted(index['suffix_array'][top:bottom].tolist())
+
+
+def approximate_locate_pattern(index, pattern, d):
+    """
+    Find all starting positions where pattern appears with at most d mismatches.
+
+    Backtracking backward search: the pattern is read from its last symbol, and at every
+    step every symbol of the genome is tried while the mismatch budget allows it. Branches whose
+    row interval becomes empty are abandoned, so only prefixes present in the genome are explored.
+
+    Returns:
+        list: Sorted starting positions (0-indexed), same as approximate_pattern_matching
+    """
+    codes = _pattern_codes(index, pattern)
+    first_row = index['first_row']
+    rows = []
+
+    stack = [(len(codes) - 1, 0, len(index['bwt']), 0)]
+    while stack:
+        i, top, bottom, mismatches = stack.pop()
+        if i < 0:
+            rows.append((top, bottom))
+            continue
+
+        top_counts = _occurrences(index, top)
+        bottom_counts = _occurrences(index, bottom)
+        for code in range(len(first_row)):
+            new_mismatches = mismatches + (code != codes[i])
+            if new_mismatches > d or top_counts[code] == bottom_counts[code]:
+                continue
+            stack.append((
+                i - 1,
+                int(first_row[code] + top_counts[code]),
+                int(first_row[code] + bottom_counts[code]),
+                new_mismatches,
+            ))
+
+    positions = []
+    for top, bottom in rows:
+        positions.extend(index['suffix_array'][top:bottom].tolist())
+    return sorted(positions)
+
+
+def main():
+    """
+    Interactive queries against a genome index.
+    Usage: python genome_index.py genome.txt index.npz
+    The index is built and saved on first use, then loaded.
+    Each input line is 'Pattern' (exact) or 'Pattern d' (up to d mismatches).
+    """
+    if len(sys.argv) < 3:
+        print("Usage: python genome_index.py genome.txt index.npz")
+        return
+
+    genome_path, index_path = sys.argv[1], sys.argv[2]
+
+    try:
+        index = load_genome_index(index_path)
+        print(f"Loaded index from {index_path}", file=sys.stderr)
+    except FileNotFoundError:
+        print(f"Building index of {genome_path}...", file=sys.stderr)
+        index = index_genome_file(genome_path, index_path)
+        print(f"Index saved to {index_path}", file=sys.stderr)
+
+    for line in sys.stdin:
+        parts = line.split()
+        if not parts:
+            continue
+
+        pattern = parts[0]
+        if len(parts) > 1:
+            positions = approximate_locate_pattern(index, pattern, int(parts[1]))
+        else:
+            positions = locate_pattern(index, pattern)
+
+        print(f"{pattern}: {len(positions)} occurrence(s)")
+        print(' '.join(map(str, positions)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#Bit-parallel Hamming distance on 2-bit packed k-mers
+#XOR of two codes leaves a non-zero 2-bit group at every mismatch; folding each group onto its
+#low bit ((x | x >> 1) & 0b0101...) leaves exactly one set bit per mismatch, then a popcount gives the distance
+
+import numpy as np
+
+from dna_encoding import MAX_K, as_byte_array, encode_kmer, is_nucleotide_string, masked_kmer_codes
+
+LOW_BITS = 0x5555555555555555
+
+_LOW_BITS_64 = np.uint64(LOW_BITS)
+_ONE = np.uint64(1)
+
+
+def hamming_distance_codes(code1, code2):
+    """
+    Hamming distance between two k-mers of the same length given by their integer codes.
+    For example: hamming_distance_codes(encode_kmer('ACGT'), encode_kmer('ACCA')) -> 2
+    """
+    difference = code1 ^ code2
+    return ((difference | (difference >> 1)) & LOW_BITS).bit_count()
+
+
+def popcount(values):
+    """Number of set bits of every element of a uint64 array."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+
+    # SWAR popcount for NumPy < 2.0
+    values = values - ((values >> _ONE) & np.uint64(0x5555555555555555))
+    values = (values & np.uint64(0x3333333333333333)) + ((values >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    values = (values + (values >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((values * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.uint8)
+
+
+def hamming_distances_codes(codes, pattern_code):
+    """Hamming distance between one k-mer code and every code of a uint64 array."""
+    difference = codes ^ np.uint64(pattern_code)
+    return popcount((difference | (difference >> _ONE)) & _LOW_BITS_64)
+
+
+def window_hamming_distances(pattern, text):
+    """
+    Hamming distance from pattern to every window of text, in one batch.
+
+    Symbols are compared as they are, like the string version: N, lower case or any other
+    symbol only matches itself. Windows made of A, C, G, T are compared on their 2-bit codes,
+    the others (and every window when the pattern itself has other symbols) column by column.
+
+    Args:
+        pattern: DNA string
+        text: DNA sequence (str, bytes-like or uint8 array)
+
+    Returns:
+        np.ndarray: Array of length len(text) - len(pattern) + 1, element i = d(pattern, text[i:i+k])
+    """
+    k = len(pattern)
+    data = as_byte_array(text)
+    symbols = as_byte_array(pattern)
+    window_count = len(data) - k + 1
+    if window_count <= 0:
+        return np.empty(0, dtype=np.uint32)
+
+    if k == 0 or k > MAX_K or not is_nucleotide_string(pattern):
+        # Patterns longer than 32 do not fit in one code: compare column by column
+        return column_distances(data, symbols, np.arange(window_count))
+
+    codes, valid = masked_kmer_codes(data, k)
+    distances = hamming_distances_codes(codes, encode_kmer(pattern)).astype(np.uint32)
+    if not valid.all():
+        invalid = np.flatnonzero(~valid)
+        distances[invalid] = column_distances(data, symbols, invalid)
+    return distances
+
+
+def column_distances(data, symbols, starts):
+    """Hamming distance between the pattern symbols and the windows of data at the given starts."""
+    distances = np.zeros(len(starts), dtype=np.uint32)
+    for offset in range(len(symbols)):
+        distances += data[starts + offset] != symbols[offset]
+    return distances
+
+
+def min_window_distance(pattern, text):
+    """
+    Minimum Hamming distance between pattern and any k-mer of text
+    (float('inf') if text is shorter than pattern).
+    """
+    distances = window_hamming_distances(pattern, text)
+    if distances.size == 0:
+        return float('inf')
+    return int(distances.min())
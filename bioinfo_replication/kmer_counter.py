@@ -0,0 +1,226 @@
+#k-mer counting engine on 2-bit encoded k-mers
+#for k <= DENSE_K_LIMIT the counts go into a dense frequency array of size 4^k (indexed by k-mer code),
+#above that the codes are sorted and counted (no 4^k array could fit in memory)
+
+import numpy as np
+
+from dna_encoding import MAX_K, decode_kmer, kmer_codes, kmer_text, masked_kmer_codes
+
+# Largest k kept dense: 4^14 counts of 8 bytes = 2 GB, 4^15 would already need 8 GB
+DENSE_K_LIMIT = 14
+# Reads are counted in batches of about this many bases
+READ_BATCH_BASES = 1 << 22
+
+
+def frequency_array(sequence, k):
+    """
+    Compute the dense frequency array of a sequence.
+
+    Args:
+        sequence: DNA sequence (str, bytes-like or uint8 array)
+        k: Length of k-mers (k <= DENSE_K_LIMIT)
+
+    Returns:
+        np.ndarray: Array of length 4^k, element i being the count of the k-mer with code i
+    """
+    if k > DENSE_K_LIMIT:
+        raise ValueError(f"Dense frequency array only available for k <= {DENSE_K_LIMIT}")
+
+    codes = kmer_codes(sequence, k)
+    return np.bincount(codes.astype(np.intp), minlength=4 ** k)
+
+
+def count_kmers(sequence, k):
+    """
+    Count every distinct k-mer of a sequence.
+
+    Args:
+        sequence: DNA sequence (str, bytes-like or uint8 array)
+        k: Length of k-mers
+
+    Returns:
+        tuple: (codes, counts) - sorted uint64 codes of the k-mers present and their counts
+    """
+    if k <= DENSE_K_LIMIT:
+        frequencies = frequency_array(sequence, k)
+        present = np.flatnonzero(frequencies)
+        return present.astype(np.uint64), frequencies[present]
+
+    # Sorted-uint64 fallback for large k
+    return np.unique(kmer_codes(sequence, k), return_counts=True)
+
+
+def _valid_kmer_codes(data, k):
+    """
+    Codes of the k-mers of an ASCII byte array that only contain A, C, G, T (either case).
+    k-mers overlapping any other byte (N, or the newline separating two reads) are dropped.
+    """
+    codes, valid = masked_kmer_codes(data, k, ignore_case=True)
+    return codes[valid]
+
+
+def count_kmers_in_reads(reads, k):
+    """
+    Count k-mers over a stream of reads without building a list of reads or k-mers.
+
+    Reads are packed into batches separated by newlines and counted batch by batch,
+    so k-mers never span two reads; k-mers containing N (or any other symbol) are skipped.
+
+    Args:
+        reads: Iterable of read sequences (str or bytes), e.g. a FASTA/FASTQ record generator
+        k: Length of k-mers
+
+    Returns:
+        tuple: (codes, counts) - sorted uint64 codes of the k-mers present and their counts
+    """
+    dense = k <= DENSE_K_LIMIT
+    frequencies = np.zeros(4 ** k, dtype=np.int64) if dense else None
+    batch_codes = []
+    batch_counts = []
+
+    def count_batch(batch):
+        data = np.frombuffer(b'\n'.join(batch), dtype=np.uint8)
+        codes = _valid_kmer_codes(data, k)
+        if dense:
+            frequencies[:] += np.bincount(codes.astype(np.intp), minlength=4 ** k)
+        else:
+            distinct, counts = np.unique(codes, return_counts=True)
+            batch_codes.append(distinct)
+            batch_counts.append(counts)
+
+    batch = []
+    batch_size = 0
+    for read in reads:
+        if isinstance(read, str):
+            read = read.encode('ascii')
+        batch.append(read)
+        batch_size += len(read) + 1
+
+        if batch_size >= READ_BATCH_BASES:
+            count_batch(batch)
+            batch = []
+            batch_size = 0
+
+    if batch:
+        count_batch(batch)
+
+    if dense:
+        present = np.flatnonzero(frequencies)
+        return present.astype(np.uint64), frequencies[present]
+
+    if not batch_codes:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+
+    # Merge the per-batch counts
+    distinct, inverse = np.unique(np.concatenate(batch_codes), return_inverse=True)
+    counts = np.bincount(inverse, weights=np.concatenate(batch_counts)).astype(np.int64)
+    return distinct, counts
+
+
+def first_positions(codes, selected):
+    """
+    Position of the first occurrence of every selected k-mer code in the code array, in increasing order,
+    i.e. the order in which a dictionary filled left to right would list them.
+    """
+    positions = np.flatnonzero(np.isin(codes, selected))
+    _, first_index = np.unique(codes[positions], return_index=True)
+    return positions[np.sort(first_index)]
+
+
+def count_other_kmers(sequence, positions, k):
+    """
+    Count the k-mers starting at the given positions as strings, for k-mers holding
+    symbols that have no 2-bit code (N, lower case, ...).
+
+    Returns:
+        dict: k-mer -> [count, first position], in order of first appearance
+    """
+    counts = {}
+    for position in positions.tolist():
+        kmer = kmer_text(sequence, position, k)
+        if kmer in counts:
+            counts[kmer][0] += 1
+        else:
+            counts[kmer] = [1, position]
+    return counts
+
+
+def split_kmers(sequence, k):
+    """
+    Split the k-mers of a sequence into those made of A, C, G, T, counted on their codes,
+    and those holding any other symbol (N, lower case, ...), counted as strings.
+
+    Returns:
+        tuple: (positions, codes, others) - positions and codes of the first kind,
+               count_other_kmers of the second kind
+    """
+    if k > MAX_K:
+        # No code holds k-mers this long: count every k-mer as a string
+        window_count = max(len(sequence) - k + 1, 0)
+        codes, valid = np.empty(0, dtype=np.uint64), np.zeros(window_count, dtype=bool)
+    else:
+        codes, valid = masked_kmer_codes(sequence, k)
+
+    positions = np.flatnonzero(valid)
+    others = count_other_kmers(sequence, np.flatnonzero(~valid), k) if positions.size < valid.size else {}
+    return positions, codes[positions], others
+
+
+def kmer_frequencies(sequence, k):
+    """
+    Count of every distinct k-mer of a sequence, as the dictionary of all substrings would hold it.
+
+    Returns:
+        dict: k-mer -> count, in order of first appearance in the sequence
+    """
+    positions, codes, others = split_kmers(sequence, k)
+    distinct, first_index, counts = np.unique(codes, return_index=True, return_counts=True)
+
+    found = [(position, decode_kmer(code, k), count)
+             for position, code, count in zip(positions[first_index].tolist(), distinct.tolist(), counts.tolist())]
+    found.extend((position, kmer, count) for kmer, (count, position) in others.items())
+    return {kmer: count for _, kmer, count in sorted(found)}
+
+
+def most_frequent_kmers(sequence, k):
+    """
+    Find all most frequent k-mers in a sequence.
+
+    k-mers made of A, C, G, T are counted on their codes; k-mers holding any other symbol
+    (N, lower case, ...) are counted as strings, so the result is the one of a dictionary of all substrings.
+
+    Args:
+        sequence: DNA sequence (str, bytes-like or uint8 array)
+        k: Length of k-mers
+
+    Returns:
+        list: All most frequent k-mers, in order of first appearance in the sequence
+    """
+    positions, codes, others = split_kmers(sequence, k)
+    if positions.size == 0 and not others:
+        return []
+
+    # Most frequent k-mers among those with codes, then among the others
+    code_frequency = 0
+    if codes.size:
+        if k <= DENSE_K_LIMIT:
+            frequencies = np.bincount(codes.astype(np.intp), minlength=4 ** k)
+            code_frequency = int(frequencies.max())
+            winners = np.flatnonzero(frequencies == code_frequency).astype(np.uint64)
+        else:
+            distinct, counts = np.unique(codes, return_counts=True)
+            code_frequency = int(counts.max())
+            winners = distinct[counts == code_frequency]
+    other_frequency = max((count for count, _ in others.values()), default=0)
+    max_frequency = max(code_frequency, other_frequency)
+
+    # (first position, k-mer) of every winner, so both kinds come out in order of first appearance
+    found = []
+    if code_frequency == max_frequency:
+        winner_positions = first_positions(codes, winners)
+        found.extend(zip(positions[winner_positions].tolist(),
+                         (decode_kmer(code, k) for code in codes[winner_positions])))
+    if other_frequency == max_frequency:
+        found.extend((position, kmer) for kmer, (count, position) in others.items() if count == max_frequency)
+
+    return [kmer for _, kmer in sorted(found)]
@@ -0,0 +1,327 @@
+#Median string search without scoring all 4^k patterns one by one
+#branch and bound: patterns are built nucleotide by nucleotide, depth-first in lexicographic order,
+#over the prefix tree of all k-mers. The distance of a prefix to the first symbols of every window
+#can only grow when the prefix is extended, so its sum over the DNA strings is a lower bound
+#for every pattern below it: whole subtrees are skipped once that bound exceeds the best distance found.
+#once only s symbols are left, the subtree is solved exactly with a distance table of the 4^s suffixes
+#whose windows start at their prefix distance instead of 0 (see _subtree_distances)
+
+#distance tables: for small k, d(Pattern, Dna) is computed for all 4^k patterns at once.
+#the minimum distance from every pattern to the k-mers of a string is its distance in the Hamming graph
+#(k-mers linked when they differ by one substitution) to the nearest k-mer of the string, i.e. a
+#multi-source BFS from those k-mers. Hamming distance adds up position by position, so the same table
+#is obtained with one relaxation sweep per position: D(x) = min(D(x), min over nucleotides b of D(x with b at p) + 1)
+#symbols other than upper-case A, C, G, T match no nucleotide (as in the string comparison): a window holding
+#one is a source for all 4 nucleotides at that position, one mismatch further (see _expand_sources)
+
+import numpy as np
+
+from dna_encoding import NUCLEOTIDES, decode_kmer, encode_kmer, kmer_codes
+from pwm_scanner import INVALID_ROW, encode_for_scan
+
+# Largest k for distance tables: 4^12 entries = 16 MB per uint8 table
+DISTANCE_TABLE_K_LIMIT = 12
+# Up to this k a full distance table is faster than branch and bound on typical inputs
+MEDIAN_TABLE_K_LIMIT = 10
+# Branch and bound solves the subtrees of patterns with this many symbols left with a distance table
+SUBTREE_TABLE_K = 7
+
+
+def _window_columns(dna_strings, k):
+    """
+    Symbol columns of all k-mers of all DNA strings.
+
+    Returns:
+        tuple: (columns, segment_starts) - columns[j, w] is the code of symbol j of window w
+               (INVALID_ROW for other symbols, windows of all strings concatenated), segment_starts the index of the
+               first window of each string
+    """
+    codes = [encode_for_scan(dna_string) for dna_string in dna_strings]
+    window_counts = [len(string_codes) - k + 1 for string_codes in codes]
+
+    columns = np.empty((k, sum(window_counts)), dtype=np.uint8)
+    for j in range(k):
+        columns[j] = np.concatenate([
+            string_codes[j:j + count] for string_codes, count in zip(codes, window_counts)
+        ])
+
+    segment_starts = np.concatenate(([0], np.cumsum(window_counts)[:-1]))
+    return columns, segment_starts
+
+
+def _relax_positions(tables, k):
+    """
+    One relaxation sweep per position over rows of distance tables indexed by k-mer code, in place:
+    D(x) = min(D(x), min over nucleotides b of D(x with b at p) + 1).
+    """
+    for position in range(k):
+        grouped = tables.reshape(tables.shape[0] * 4 ** position, 4, 4 ** (k - 1 - position))
+        # Minimum of the 4 slices (faster than a reduction over a middle axis this short)
+        lowest = np.minimum(np.minimum(grouped[:, 0], grouped[:, 1]), np.minimum(grouped[:, 2], grouped[:, 3]))
+        lowest += 1
+        np.minimum(grouped, lowest[:, np.newaxis], out=grouped)
+
+
+def _distinct_windows(columns, groups=None):
+    """
+    Distinct windows of columns (one column per window, codes 0-3 and INVALID_ROW for other symbols),
+    optionally told apart by a group (DNA string) index per window.
+
+    Returns:
+        tuple: (distinct columns, their groups or None, index of the distinct column of every window)
+    """
+    k = columns.shape[0]
+    keys = np.zeros(columns.shape[1], dtype=np.int64)
+    for j in range(k):
+        keys = keys * 5 + columns[j]
+    if groups is not None:
+        keys += groups * 5 ** k
+
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    return columns[:, first], None if groups is None else groups[first], inverse
+
+
+def _expand_sources(columns, limit):
+    """
+    Sources of a distance table for windows given as columns (codes 0-3 and INVALID_ROW for other symbols).
+
+    An other symbol matches no nucleotide, so a window holding one is expanded into its 4 variants
+    with A, C, G, T at that position, each one mismatch further. Windows with limit or more
+    other symbols are left out (they cannot get below the distance tables start from).
+
+    Returns:
+        tuple: (codes, windows, extra) - k-mer code of every source, column of the window it comes from
+               and its number of mismatches on other symbols
+    """
+    k, window_count = columns.shape
+    windows = np.arange(window_count)
+    extra = np.zeros(window_count, dtype=np.uint8)
+
+    for j in range(k):
+        other = columns[j] == INVALID_ROW
+        if not other.any():
+            continue
+        kept = ~other
+        other &= extra + 1 < limit
+
+        expanded = np.repeat(columns[:, other], 4, axis=1)
+        expanded[j] = np.tile(np.arange(4, dtype=np.uint8), expanded.shape[1] // 4)
+        columns = np.concatenate((columns[:, kept], expanded), axis=1)
+        windows = np.concatenate((windows[kept], np.repeat(windows[other], 4)))
+        extra = np.concatenate((extra[kept], np.repeat(extra[other] + 1, 4)))
+
+    codes = np.zeros(columns.shape[1], dtype=np.intp)
+    for j in range(k):
+        codes = (codes << 2) | columns[j]
+    return codes, windows, extra
+
+
+def _initial_bound(columns, segment_starts):
+    """
+    Smallest d(Pattern, Dna) over the first window of every DNA string, read as a pattern with A for
+    other symbols (an upper bound for the median).
+    """
+    best = None
+    for start in segment_starts.tolist():
+        pattern = columns[:, start].copy()
+        pattern[pattern == INVALID_ROW] = 0
+        mismatches = (columns != pattern[:, np.newaxis]).sum(axis=0)
+        distance = int(np.minimum.reduceat(mismatches, segment_starts).sum())
+        if best is None or distance < best:
+            best = distance
+    return best
+
+
+def _subtree_sources(columns, segment_starts, k, suffix_length):
+    """
+    Sources of the stacked per-string suffix tables of _subtree_distances, from the last
+    suffix_length symbols of every window.
+
+    Returns:
+        tuple: (indices, merged) - source index (string index * 4^suffix_length + suffix code) of every
+               window, or when other symbols are present, of every source of _expand_sources, with
+               merged = (distinct suffix of every window, their number, distinct suffix of every source,
+               mismatches on other symbols); windows with the same suffix in the same string are merged
+    """
+    strings = np.zeros(columns.shape[1], dtype=np.intp)
+    strings[segment_starts[1:]] = 1
+    np.cumsum(strings, out=strings)
+
+    suffix_columns = columns[k - suffix_length:]
+    if not (suffix_columns == INVALID_ROW).any():
+        codes = np.zeros(columns.shape[1], dtype=np.intp)
+        for row in suffix_columns:
+            codes = (codes << 2) | row
+        return strings * 4 ** suffix_length + codes, None
+
+    distinct, distinct_strings, suffix = _distinct_windows(suffix_columns, strings)
+    codes, windows, extra = _expand_sources(distinct, k)
+    return distinct_strings[windows] * 4 ** suffix_length + codes, (suffix, distinct.shape[1], windows, extra)
+
+
+def _subtree_distances(prefix_distances, sources, string_count, k, suffix_length):
+    """
+    d(Prefix + Suffix, Dna) for every suffix of length suffix_length, given the Hamming distance
+    between the prefix and the first symbols of every window.
+
+    Per string, this is string_distance_table with every window as a source at its prefix distance
+    instead of 0: after one relaxation sweep per suffix position, entry x holds
+    min over windows of (prefix distance + Hamming distance between x and the window suffix).
+
+    Returns:
+        np.ndarray: Array of length 4^suffix_length indexed by suffix code
+    """
+    indices, merged = sources
+    source_distances = prefix_distances
+    if merged is not None:
+        # Windows sharing a suffix only count through the closest prefix
+        suffix, suffix_count, windows, extra = merged
+        suffix_distances = np.full(suffix_count, k, dtype=np.uint8)
+        np.minimum.at(suffix_distances, suffix, prefix_distances)
+        source_distances = suffix_distances[windows] + extra
+
+    size = 4 ** suffix_length
+    distances = np.full(string_count * size, k, dtype=np.uint8)
+    np.minimum.at(distances, indices, source_distances)
+
+    _relax_positions(distances.reshape(string_count, size), suffix_length)
+    return distances.reshape(string_count, size).sum(axis=0, dtype=np.uint32)
+
+
+def median_string_branch_and_bound(k, dna_strings):
+    """
+    Find the k-mer minimizing d(Pattern, Dna), the sum over the DNA strings of the minimum
+    Hamming distance between Pattern and any k-mer of the string.
+
+    The prefix tree is walked depth-first with an explicit stack of next nucleotides,
+    keeping one row of partial window distances per depth, down to the prefixes of
+    k - SUBTREE_TABLE_K symbols whose subtrees are solved with one table of 4^SUBTREE_TABLE_K
+    suffixes per DNA string: memory is O(k) rows plus these tables, and no list of patterns is ever built.
+
+    The bound only prunes once prefixes are long enough to miss most windows: on 10 random strings
+    of 600 bases and k = 12, the 4^5 prefixes of length 5 are all solved (under 2 s).
+
+    Args:
+        k: Length of the pattern (k <= 32)
+        dna_strings: List of DNA strings
+
+    Returns:
+        str: Median string (the lexicographically first one in case of ties, like the brute force),
+             or "" if a DNA string is shorter than k
+    """
+    if any(len(dna_string) < k for dna_string in dna_strings):
+        return ""
+    if not dna_strings:
+        return NUCLEOTIDES[0] * k
+
+    columns, segment_starts = _window_columns(dna_strings, k)
+    suffix_length = min(k, SUBTREE_TABLE_K)
+    sources = _subtree_sources(columns, segment_starts, k, suffix_length)
+    prefix_length = k - suffix_length
+
+    # partial[j][w] = Hamming distance between the current prefix of length j and window w
+    partial = np.zeros((prefix_length + 1, columns.shape[1]), dtype=np.uint8)
+    if prefix_length == 0:
+        totals = _subtree_distances(partial[0], sources, len(dna_strings), k, suffix_length)
+        return decode_kmer(int(np.argmin(totals)), k)
+
+    prefix = [0] * prefix_length
+    next_symbol = [0] * prefix_length
+
+    # Until the first subtree is solved, patterns as good as the initial bound must still be explored
+    best_distance = _initial_bound(columns, segment_starts)
+    best_pattern = None
+
+    depth = 0
+    while depth >= 0:
+        symbol = next_symbol[depth]
+        if symbol == 4:
+            depth -= 1
+            continue
+        next_symbol[depth] = symbol + 1
+
+        # Extend the prefix with this symbol and bound every pattern below it
+        row = partial[depth + 1]
+        np.add(partial[depth], columns[depth] != symbol, out=row)
+        bound = int(np.minimum.reduceat(row, segment_starts).sum())
+
+        if bound > best_distance or (bound == best_distance and best_pattern is not None):
+            continue
+
+        prefix[depth] = symbol
+        if depth + 1 == prefix_length:
+            # Exact distances of the whole subtree; argmin keeps the lexicographically first suffix
+            totals = _subtree_distances(row, sources, len(dna_strings), k, suffix_length)
+            best_suffix = int(np.argmin(totals))
+            distance = int(totals[best_suffix])
+            if distance < best_distance or (distance == best_distance and best_pattern is None):
+                best_distance = distance
+                best_pattern = ''.join(NUCLEOTIDES[s] for s in prefix) + decode_kmer(best_suffix, suffix_length)
+            continue
+
+        depth += 1
+        next_symbol[depth] = 0
+
+    return best_pattern
+
+
+def string_distance_table(dna_string, k):
+    """
+    Minimum Hamming distance from every k-mer to the k-mers of a DNA string.
+
+    Args:
+        dna_string: DNA sequence (str, bytes-like or uint8 array), at least k long
+        k: Length of k-mers (k <= DISTANCE_TABLE_K_LIMIT)
+
+    Returns:
+        np.ndarray: uint8 array of length 4^k, element x being d(k-mer with code x, dna_string)
+    """
+    if k > DISTANCE_TABLE_K_LIMIT:
+        raise ValueError(f"Distance tables only available for k <= {DISTANCE_TABLE_K_LIMIT}")
+
+    # Sources at distance 0 (or their number of other symbols), everything else at most k away
+    distances = np.full(4 ** k, k, dtype=np.uint8)
+    codes = encode_for_scan(dna_string)
+    if (codes == INVALID_ROW).any():
+        columns = np.lib.stride_tricks.sliding_window_view(codes, k).T
+        sources, _, extra = _expand_sources(_distinct_windows(columns)[0], k)
+        np.minimum.at(distances, sources, extra)
+    else:
+        distances[kmer_codes(codes, k).astype(np.intp)] = 0
+
+    _relax_positions(distances[np.newaxis], k)
+    return distances
+
+
+def pattern_distance_table(k, dna_strings):
+    """
+    d(Pattern, Dna) for every k-mer Pattern: sum of the string distance tables.
+
+    Returns:
+        np.ndarray: Array of length 4^k indexed by k-mer code
+    """
+    dtype = np.uint16 if len(dna_strings) * k < 2 ** 16 else np.uint32
+    total = np.zeros(4 ** k, dtype=dtype)
+    for dna_string in dna_strings:
+        total += string_distance_table(dna_string, k)
+    return total
+
+
+def table_distance(table, pattern):
+    """d(Pattern, Dna) looked up in a table from pattern_distance_table, in O(1)."""
+    return int(table[encode_kmer(pattern)])
+
+
+def median_strings(k, dna_strings, table=None):
+    """
+    All median strings, in lexicographic order (the first one is what median_string returns).
+
+    Args:
+        k: Length of the pattern (k <= DISTANCE_TABLE_K_LIMIT)
+        dna_strings: List of DNA strings, each at least k long
+        table: Table from pattern_distance_table (computed if not given)
+    """
+    if table is None:
+        table = pattern_distance_table(k, dna_strings)
+    best = np.flatnonzero(table == table.min())
+    return [decode_kmer(code, k) for code in best.tolist()]
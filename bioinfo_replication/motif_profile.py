@@ -0,0 +1,85 @@
+#Incremental count matrix for motif searches
+#greedy, randomized and Gibbs searches change a motif collection one motif at a time;
+#instead of recounting the whole collection after each change (create_profile_matrix + score_motifs),
+#the 4 x k count matrix is updated in O(k) when a motif is added or removed,
+#and the profile and the score are read from it
+
+import numpy as np
+
+from dna_encoding import NUCLEOTIDES, STRICT_BASE_TO_CODE, as_byte_array
+from pwm_scanner import log_profile
+
+
+class MotifProfile:
+    """
+    Count matrix of a motif collection (rows A, C, G, T, one column per position),
+    with a pseudocount added to every cell.
+
+    Example:
+        profile = MotifProfile(k)
+        profile.add('ACGT')
+        profile.remove('ACGT')
+    """
+
+    def __init__(self, k, pseudocount=1):
+        self.k = k
+        self.pseudocount = pseudocount
+        self.counts = np.full((4, k), pseudocount, dtype=np.int64)
+        self.motif_count = 0
+        self._columns = np.arange(k)
+
+    @classmethod
+    def from_motifs(cls, motifs, k=None, pseudocount=1):
+        """Count matrix of a whole motif collection."""
+        if k is None:
+            k = len(motifs[0])
+        profile = cls(k, pseudocount)
+        for motif in motifs:
+            profile.add(motif)
+        return profile
+
+    def _cells(self, motif):
+        """
+        Rows and columns of the cells counting the nucleotides of a motif
+        (other symbols, lower case included, are not counted, like in create_profile_matrix).
+        """
+        codes = STRICT_BASE_TO_CODE[as_byte_array(motif)[:self.k]]
+        valid = codes != 255
+        return codes[valid], self._columns[:len(codes)][valid]
+
+    def add(self, motif):
+        """Add a motif to the collection in O(k)."""
+        rows, columns = self._cells(motif)
+        self.counts[rows, columns] += 1
+        self.motif_count += 1
+
+    def remove(self, motif):
+        """Remove a motif previously added to the collection in O(k)."""
+        rows, columns = self._cells(motif)
+        self.counts[rows, columns] -= 1
+        self.motif_count -= 1
+
+    def profile(self):
+        """
+        Profile matrix with pseudocounts (same values as create_profile_matrix).
+
+        Returns:
+            np.ndarray: (4, k) array of probabilities, rows A, C, G, T
+        """
+        return self.counts / (self.motif_count + 4 * self.pseudocount)
+
+    def log_profile(self):
+        """Log-probabilities of the profile, for the pwm_scanner functions."""
+        return log_profile(self.profile())
+
+    def consensus(self):
+        """Most frequent nucleotide of every column (the first one in A, C, G, T order in case of ties)."""
+        return ''.join(NUCLEOTIDES[row] for row in np.argmax(self.counts, axis=0).tolist())
+
+    def score(self):
+        """
+        Score of the collection: number of motif symbols differing from the consensus
+        (same value as score_motifs).
+        """
+        max_counts = self.counts.max(axis=0) - self.pseudocount
+        return int(self.motif_count * self.k - max_counts.sum())
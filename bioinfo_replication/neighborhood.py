@@ -0,0 +1,306 @@
+#d-neighborhoods of integer-encoded k-mers
+#a neighbor at distance i replaces i nucleotides; on 2-bit codes, that is an XOR with a mask
+#holding a non-zero 2-bit value (1, 2 or 3) at each substituted position.
+#the list of masks only depends on (k, d), so it is computed once and every k-mer is expanded
+#with one XOR per neighbor instead of rebuilding string sets recursively
+#neighborhood_frequency_array does the same for a whole table of k-mer counts at once
+#symbols other than upper-case A, C, G, T have no code: k-mers holding them go through neighbor_strings,
+#and in neighborhoods of a whole sequence they match no nucleotide (see neighborhood_sources)
+#neighbor_codes keeps recent neighborhoods up to a total size in bytes; the searches expanding one k-mer
+#at a time free them with clear_neighbor_cache once they are done
+
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import combinations, product
+
+import numpy as np
+
+from dna_encoding import MAX_K, STRICT_BASE_TO_CODE, as_byte_array, decode_kmer, encode_kmer, masked_kmer_codes
+
+# Bytes of k-mer neighborhoods kept by neighbor_codes (64 MB; larger neighborhoods are never kept)
+NEIGHBORHOOD_CACHE_BYTES = 64 << 20
+# Number of (k, d) whose substitution masks are kept
+MASK_CACHE_SIZE = 8
+# Largest k for neighborhood bitmaps (4^12 flags = 16 MB)
+NEIGHBORHOOD_BITMAP_K_LIMIT = 12
+# Neighbor codes generated at once when building a sorted neighborhood array
+NEIGHBOR_BLOCK_SIZE = 1 << 22
+
+# LRU cache of neighbor_codes: (code, k, d) -> neighbor codes, least recently used first
+_neighbor_cache = OrderedDict()
+_neighbor_cache_bytes = 0
+
+
+@lru_cache(maxsize=MASK_CACHE_SIZE)
+def substitution_mask_list(k, d):
+    """
+    All XOR masks turning a k-mer code into the codes of its d-neighborhood.
+    Masks are distinct, so the neighbors they produce are distinct; mask 0 gives the k-mer itself.
+
+    Returns:
+        tuple: Masks as Python ints, ordered by number of substitutions
+    """
+    masks = [0]
+    for distance in range(1, min(d, k) + 1):
+        for positions in combinations(range(k), distance):
+            for values in product((1, 2, 3), repeat=distance):
+                mask = 0
+                for position, value in zip(positions, values):
+                    mask |= value << (2 * (k - 1 - position))
+                masks.append(mask)
+    return tuple(masks)
+
+
+@lru_cache(maxsize=MASK_CACHE_SIZE)
+def substitution_masks(k, d):
+    """Same masks as substitution_mask_list, as a read-only uint64 NumPy array."""
+    masks = np.array(substitution_mask_list(k, d), dtype=np.uint64)
+    masks.flags.writeable = False
+    return masks
+
+
+def iter_neighbor_codes(code, k, d):
+    """Lazily yield the codes of the d-neighborhood of a k-mer code."""
+    for mask in substitution_mask_list(k, d):
+        yield code ^ mask
+
+
+def neighbor_codes(code, k, d):
+    """
+    Codes of the d-neighborhood of a k-mer code, as a read-only uint64 NumPy array.
+    Results are kept in an LRU cache keyed by (code, k, d), so repeated k-mers are expanded once;
+    the cache holds at most NEIGHBORHOOD_CACHE_BYTES of neighbor codes.
+    """
+    global _neighbor_cache_bytes
+    key = (code, k, d)
+    neighbors = _neighbor_cache.get(key)
+    if neighbors is not None:
+        _neighbor_cache.move_to_end(key)
+        return neighbors
+
+    neighbors = np.uint64(code) ^ substitution_masks(k, d)
+    neighbors.flags.writeable = False
+    if neighbors.nbytes <= NEIGHBORHOOD_CACHE_BYTES:
+        _neighbor_cache[key] = neighbors
+        _neighbor_cache_bytes += neighbors.nbytes
+        while _neighbor_cache_bytes > NEIGHBORHOOD_CACHE_BYTES:
+            _, dropped = _neighbor_cache.popitem(last=False)
+            _neighbor_cache_bytes -= dropped.nbytes
+    return neighbors
+
+
+def clear_neighbor_cache():
+    """Drop every neighborhood kept by neighbor_codes."""
+    global _neighbor_cache_bytes
+    _neighbor_cache.clear()
+    _neighbor_cache_bytes = 0
+
+
+def neighbor_strings(pattern, d):
+    """
+    d-neighborhood of a pattern as strings: the substituted positions take A, C, G, T,
+    the other symbols of the pattern (N, lower case, ...) stay where they are not substituted.
+    Patterns of A, C, G, T that fit in a code are expanded with neighbor_codes.
+    """
+    if d == 0:
+        return {pattern}
+
+    if len(pattern) <= MAX_K and set(pattern) <= set('ACGT'):
+        k = len(pattern)
+        return {decode_kmer(code, k) for code in neighbor_codes(encode_kmer(pattern), k, d).tolist()}
+
+    if len(pattern) == 1:
+        return {'A', 'C', 'G', 'T'}
+
+    neighborhood = set()
+    for text in neighbor_strings(pattern[1:], d):
+        if sum(a != b for a, b in zip(pattern[1:], text)) < d:
+            # The suffix uses fewer than d mismatches: the first symbol can be anything
+            neighborhood.update(nucleotide + text for nucleotide in 'ACGT')
+        else:
+            neighborhood.add(pattern[0] + text)
+    return neighborhood
+
+
+def neighborhood_size(k, d):
+    """Number of k-mers within Hamming distance d of a k-mer."""
+    return len(substitution_mask_list(k, d))
+
+
+def _mask_frequency_array(codes, counts, k, d, dtype):
+    """Add the count of every distinct k-mer to all its neighbors, one substitution mask at a time."""
+    frequencies = np.zeros(4 ** k, dtype=dtype)
+    counts = counts.astype(dtype)
+    for mask in substitution_masks(k, d):
+        # A mask maps distinct codes to distinct codes, so no index repeats within one update
+        frequencies[(codes ^ mask).astype(np.intp)] += counts
+    return frequencies
+
+
+def neighborhood_layers(codes, counts, k, d, dtype=np.uint32):
+    """
+    Exact-distance counts behind the position-by-position method.
+
+    layers[t][x] holds the number of k-mers differing from x in exactly t positions (t <= d):
+    counts are placed in layer 0, then spread_layers processes every position. Processing a
+    position moves every count of layer t - 1 to the 3 other nucleotides at that position:
+    layer t += (sum over the 4 nucleotides) - (same nucleotide). Cost O(k * d * 4^k),
+    independent of the number of distinct k-mers.
+
+    Returns:
+        list: d + 1 arrays of length 4^k
+    """
+    layers = [np.zeros(4 ** k, dtype=dtype) for _ in range(min(d, k) + 1)]
+    layers[0][codes.astype(np.intp)] = counts
+    spread_layers(layers, k, range(k))
+    return layers
+
+
+def spread_layers(layers, k, positions, processed=0):
+    """
+    Process the given positions (0 = first nucleotide) of the layers of neighborhood_layers, in place.
+    Positions can be processed in any order, each one once; processed is the number of positions
+    already processed before this call (no layer beyond it can be reached yet).
+    """
+    for position in positions:
+        processed += 1
+        shape = (4 ** position, 4, 4 ** (k - 1 - position))
+        # Descending t, so layer t - 1 still holds its value before this position
+        for t in range(min(len(layers) - 1, processed), 0, -1):
+            previous = layers[t - 1].reshape(shape)
+            current = layers[t].reshape(shape)
+            current += previous.sum(axis=1, keepdims=True, dtype=current.dtype)
+            current -= previous
+
+
+def _layered_frequency_array(codes, counts, k, d, dtype):
+    """Same result as _mask_frequency_array, computed position by position over the dense array."""
+    layers = neighborhood_layers(codes, counts, k, d, dtype)
+    frequencies = layers[0]
+    for layer in layers[1:]:
+        frequencies += layer
+    return frequencies
+
+
+def masks_are_cheaper(distinct_count, k, d):
+    """
+    Expanding every distinct k-mer costs (distinct k-mers) * (neighborhood size) updates,
+    the position-by-position pass about k * d * 4^k: tell whether the first one is cheaper.
+    """
+    return distinct_count * neighborhood_size(k, d) <= k * min(d, k) * 4 ** k
+
+
+def neighborhood_frequency_array(codes, counts, k, d, use_masks=None):
+    """
+    Dense array of approximate counts: element x is the number of k-mers (with multiplicity)
+    within Hamming distance d of the k-mer with code x.
+
+    Args:
+        codes: uint64 array of distinct k-mer codes (e.g. from kmer_counter.count_kmers)
+        counts: Number of occurrences of each code
+        k: Length of k-mers (4^k counts are allocated)
+        d: Maximum number of mismatches
+        use_masks: Force (True) or forbid (False) the per-k-mer mask updates
+                   (default: whichever of the two methods is cheaper)
+
+    Returns:
+        np.ndarray: Array of length 4^k
+    """
+    d = min(d, k)
+    total = int(counts.sum()) if len(counts) else 0
+    dtype = np.uint32 if total < 2 ** 30 else np.uint64
+
+    if use_masks is None:
+        use_masks = masks_are_cheaper(len(codes), k, d)
+    if use_masks:
+        return _mask_frequency_array(codes, counts, k, d, dtype)
+    return _layered_frequency_array(codes, counts, k, d, dtype)
+
+
+def _fill_masks(positions, k):
+    """XOR masks putting every combination of nucleotides at the given positions of a k-mer code."""
+    masks = np.zeros(1, dtype=np.uint64)
+    for position in positions:
+        values = np.arange(4, dtype=np.uint64) << np.uint64(2 * (k - 1 - position))
+        masks = (masks[:, np.newaxis] | values).ravel()
+    return masks
+
+
+def other_neighbor_codes(code, positions, k, d):
+    """
+    Codes of the k-mers of A, C, G, T within Hamming distance d of a k-mer holding other symbols
+    at the given positions (each code once). Other symbols match no nucleotide: every nucleotide
+    goes at those positions, and the rest of the k-mer has d - len(positions) substitutions left.
+
+    Args:
+        code: Code of the k-mer with 0 at the other positions (as from masked_kmer_codes)
+        positions: Positions of the other symbols
+    """
+    if len(positions) > d:
+        return np.empty(0, dtype=np.uint64)
+
+    fills = _fill_masks(positions, k)
+    filled_bits = np.uint64(0)
+    for position in positions:
+        filled_bits |= np.uint64(3 << (2 * (k - 1 - position)))
+    masks = substitution_masks(k, min(d - len(positions), k))
+    masks = masks[(masks & filled_bits) == 0]
+    return ((np.uint64(code) | fills)[:, np.newaxis] ^ masks).ravel()
+
+
+def neighborhood_sources(sequence, k, d):
+    """
+    Codes whose neighborhoods make up the k-mers within Hamming distance d of some k-mer of a sequence,
+    by radius. k-mers of A, C, G, T have radius d. Other symbols match no nucleotide, so a k-mer
+    holding m <= d of them gives the codes with every nucleotide at those positions, with radius d - m.
+
+    Returns:
+        dict: radius -> sorted distinct uint64 codes
+    """
+    codes, valid = masked_kmer_codes(sequence, k)
+    sources = {d: [codes[valid]]}
+
+    if not valid.all():
+        other = STRICT_BASE_TO_CODE[as_byte_array(sequence)] == 255
+        for start in np.flatnonzero(~valid).tolist():
+            positions = np.flatnonzero(other[start:start + k]).tolist()
+            if len(positions) <= d:
+                # Other symbols are coded 0 by masked_kmer_codes, so the masks fill them in
+                sources.setdefault(d - len(positions), []).append(codes[start] | _fill_masks(positions, k))
+
+    return {radius: np.unique(np.concatenate(parts)) for radius, parts in sources.items()}
+
+
+def neighborhood_bitmap(sequence, k, d):
+    """
+    Flags of the k-mers within Hamming distance d of some k-mer of a sequence.
+
+    Returns:
+        np.ndarray: bool array of length 4^k indexed by k-mer code
+    """
+    if k > NEIGHBORHOOD_BITMAP_K_LIMIT:
+        raise ValueError(f"Neighborhood bitmaps only available for k <= {NEIGHBORHOOD_BITMAP_K_LIMIT}")
+
+    bitmap = np.zeros(4 ** k, dtype=bool)
+    for radius, codes in neighborhood_sources(sequence, k, d).items():
+        if len(codes):
+            bitmap |= neighborhood_frequency_array(codes, np.ones(len(codes), dtype=np.uint32), k, radius) > 0
+    return bitmap
+
+
+def neighborhood_code_array(sequence, k, d):
+    """
+    Codes of the k-mers within Hamming distance d of some k-mer of a sequence,
+    for k too large for a bitmap.
+
+    Returns:
+        np.ndarray: Sorted distinct uint64 codes
+    """
+    blocks = [np.empty(0, dtype=np.uint64)]
+    for radius, codes in neighborhood_sources(sequence, k, d).items():
+        masks = substitution_masks(k, min(radius, k))
+        block_size = max(1, NEIGHBOR_BLOCK_SIZE // len(masks))
+        for start in range(0, len(codes), block_size):
+            neighbors = codes[start:start + block_size, np.newaxis] ^ masks
+            blocks.append(np.unique(neighbors))
+    return np.unique(np.concatenate(blocks))
@@ -0,0 +1,496 @@
+#Process-pool drivers for the motif searches of part_3 and part_4
+#the DNA strings are encoded once into a shared memory DnaCollection that every worker process attaches to
+#when the pool starts (read-only module state, no copy of the sequences), then each task only carries a few integers.
+#workers score windows from the k-mer codes precomputed in the shared block and slice motifs from the shared
+#symbols, so they return the same motifs (case and other symbols included) as the serial runs on the strings themselves
+
+#multi-start searches draw from one independent random stream per run, spawned from a master seed:
+#the result of a run does not depend on which worker ran it, so it is reproducible for any worker count
+
+#anytime mode: instead of a fixed number of runs, runs keep being started until a wall-clock budget
+#is spent or the best score has not improved for a number of runs, and the best motifs so far are returned
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+import numpy as np
+
+from dna_collection import DnaCollection
+from dna_encoding import MAX_K, as_byte_array, kmer_text, masked_kmer_codes
+from motif_profile import MotifProfile
+from pwm_scanner import encode_for_scan, encoded_window_log_scores, first_best, kmer_code_log_scores
+
+# DNA of the current pool, set in each worker by _init_worker
+_shared = {}
+# Runs per task in multi-start searches, relative to the number of workers (smaller tasks stream results sooner)
+TASKS_PER_WORKER = 4
+# Anytime mode: RandomizedMotifSearch runs are short, so they are sent to workers in blocks
+RANDOMIZED_RUNS_PER_TASK = 16
+# Anytime mode: upper bound on the iterations of a Gibbs chain, and iterations without
+# improvement after which a chain has plateaued and is stopped
+GIBBS_MAX_ITERATIONS = 100000
+GIBBS_CHAIN_PATIENCE = 1000
+# A Gibbs chain checks its deadline every DEADLINE_CHECK_INTERVAL iterations
+DEADLINE_CHECK_INTERVAL = 64
+
+
+def _init_worker(collection, k, t):
+    """Pool initializer: attach the worker to the shared DNA collection."""
+    _shared['collection'] = collection
+    _shared['dna'] = collection.symbol_views()
+    _shared['windows'] = collection_windows(collection, k)
+    _shared['k'] = k
+    _shared['t'] = t
+
+
+def default_workers():
+    """Number of worker processes when none is given (one per CPU)."""
+    return os.cpu_count() or 1
+
+
+def shared_collection(dna_strings, k):
+    """DnaCollection of the DNA strings, with the codes of their k-mers when they fit in 64 bits."""
+    return DnaCollection(dna_strings, k if k <= MAX_K else None)
+
+
+def sequence_windows(dna_strings, k):
+    """
+    Windows of every DNA string in the form the scoring kernels read: masked k-mer codes
+    (dna_encoding.masked_kmer_codes) for k <= MAX_K, encode_for_scan codes for longer motifs.
+    """
+    if k <= MAX_K:
+        return [masked_kmer_codes(dna_string, k) for dna_string in dna_strings]
+    return [encode_for_scan(dna_string) for dna_string in dna_strings]
+
+
+def collection_windows(collection, k):
+    """Same as sequence_windows, as read-only views of a collection made by shared_collection."""
+    if k <= MAX_K:
+        return [collection.kmer_codes(i, k) for i in range(len(collection))]
+    return collection.sequences()
+
+
+def window_scores(windows, log_probabilities):
+    """Log-probability of every window of a DNA string, from its entry of sequence_windows."""
+    if isinstance(windows, tuple):
+        return kmer_code_log_scores(*windows, log_probabilities)
+    return encoded_window_log_scores(windows, log_probabilities)
+
+
+def greedy_motifs_from_start(dna_strings, windows, k, t, start):
+    """
+    One iteration of GreedyMotifSearch (with pseudocounts): Motif1 is the k-mer of Dna[0]
+    starting at start, each next motif is the profile-most probable k-mer of the next string.
+
+    Args:
+        dna_strings: DNA strings (or their symbol views in a DnaCollection)
+        windows: Their windows, from sequence_windows
+
+    Returns:
+        tuple: (score, motifs)
+    """
+    motif = kmer_text(dna_strings[0], start, k)
+    motifs = [motif]
+    profile = MotifProfile(k)
+    profile.add(motif)
+
+    for j in range(1, t):
+        scores = window_scores(windows[j], profile.log_profile())
+        position = int(first_best(scores)) if scores.size else -1
+        motif = kmer_text(dna_strings[j], position, k) if position >= 0 else ""
+        motifs.append(motif)
+        profile.add(motif)
+
+    return profile.score(), motifs
+
+
+def _greedy_block(starts):
+    """Best (score, start, motifs) over a block of start positions, earliest start first in case of ties."""
+    best = None
+    for start in starts:
+        score, motifs = greedy_motifs_from_start(_shared['dna'], _shared['windows'], _shared['k'], _shared['t'], start)
+        if best is None or score < best[0]:
+            best = (score, start, motifs)
+    return best
+
+
+def parallel_greedy_motif_search(dna_strings, k, t, workers=None):
+    """
+    GreedyMotifSearch with the start positions in Dna[0] split across a process pool.
+
+    Every start position is independent; each worker takes a contiguous block of them
+    and the blocks are reduced to the best collection, the earliest start winning ties,
+    so the result is the one of the serial greedy_motif_search.
+
+    Args:
+        dna_strings: List of DNA strings
+        k: Length of motifs
+        t: Number of strings
+        workers: Number of processes (default: one per CPU; 1 runs in this process)
+
+    Returns:
+        list: Best motifs found
+    """
+    if workers is None:
+        workers = default_workers()
+
+    # Same starting point as the serial version: first k-mer of each string
+    best_motifs = [dna_string[:k] for dna_string in dna_strings]
+    best_score = MotifProfile.from_motifs(best_motifs, k).score()
+
+    start_count = len(dna_strings[0]) - k + 1
+    if start_count <= 0:
+        return best_motifs
+
+    if workers <= 1:
+        windows = sequence_windows(dna_strings, k)
+        for start in range(start_count):
+            score, motifs = greedy_motifs_from_start(dna_strings, windows, k, t, start)
+            if score < best_score:
+                best_score = score
+                best_motifs = motifs
+        return best_motifs
+
+    block_count = min(workers, start_count)
+    bounds = [start_count * i // block_count for i in range(block_count + 1)]
+    blocks = [range(bounds[i], bounds[i + 1]) for i in range(block_count)]
+
+    with shared_collection(dna_strings, k) as collection, \
+            ProcessPoolExecutor(max_workers=block_count, initializer=_init_worker,
+                                initargs=(collection, k, t)) as executor:
+        results = list(executor.map(_greedy_block, blocks))
+
+    # Blocks are in start order: keep the first strictly better one
+    for score, _, motifs in results:
+        if score < best_score:
+            best_score = score
+            best_motifs = motifs
+
+    return best_motifs
+
+
+def run_seeds(seed, run_count):
+    """Independent seed sequences of every run, spawned from one master seed."""
+    return np.random.SeedSequence(seed).spawn(run_count)
+
+
+def most_probable_motif(dna_string, windows, k, log_probabilities):
+    """Profile-most probable k-mer of a DNA string given with its windows ("" if it is shorter than k)."""
+    scores = window_scores(windows, log_probabilities)
+    if scores.size == 0:
+        return ""
+    position = int(first_best(scores))
+    return kmer_text(dna_string, position, k)
+
+
+def randomized_motifs_from_seed(dna_strings, windows, k, t, seed_sequence):
+    """
+    One run of RandomizedMotifSearch drawing its initial motifs from its own random stream.
+
+    Returns:
+        tuple: (score, motifs, iterations)
+    """
+    rng = np.random.default_rng(seed_sequence)
+
+    motifs = []
+    for i in range(t):
+        max_start = len(dna_strings[i]) - k
+        if max_start <= 0:
+            motifs.append(kmer_text(dna_strings[i], 0, k).ljust(k, 'A'))
+        else:
+            start = int(rng.integers(0, max_start + 1))
+            motifs.append(kmer_text(dna_strings[i], start, k))
+
+    profile = MotifProfile.from_motifs(motifs, k)
+    best_motifs = motifs
+    best_score = profile.score()
+
+    # Iterate until the score stops improving
+    iterations = 0
+    while True:
+        iterations += 1
+        log_probabilities = profile.log_profile()
+        new_motifs = [most_probable_motif(dna_strings[i], windows[i], k, log_probabilities) for i in range(t)]
+        new_profile = MotifProfile.from_motifs(new_motifs, k)
+        new_score = new_profile.score()
+
+        if new_score >= best_score:
+            return best_score, best_motifs, iterations
+        best_motifs, best_score, profile = new_motifs, new_score, new_profile
+
+
+def _run_block(run_function, runs, arguments):
+    """Run a block of (run index, seed sequence) pairs of a seeded search in a worker."""
+    return [
+        (run, *run_function(_shared['dna'], _shared['windows'], _shared['k'], _shared['t'], seed_sequence, *arguments))
+        for run, seed_sequence in runs
+    ]
+
+
+def iter_seeded_runs(run_function, dna_strings, k, t, run_count, seed=None, workers=None, arguments=()):
+    """
+    Run a seeded search run_count times across a process pool,
+    yielding (run, score, motifs, iterations) as runs finish (not in run order).
+
+    Args:
+        run_function: Module-level function (dna_strings, windows, k, t, seed_sequence, *arguments)
+                      returning (score, motifs, iterations); in workers, dna_strings are the symbol views
+                      of the shared DnaCollection (slice motifs with dna_encoding.kmer_text)
+        dna_strings: List of DNA strings
+        k: Length of motifs
+        t: Number of strings
+        run_count: Number of runs
+        seed: Master seed (None: fresh entropy, not reproducible)
+        workers: Number of processes (default: one per CPU; 1 runs in this process)
+        arguments: Extra arguments passed to run_function
+    """
+    if workers is None:
+        workers = default_workers()
+    runs = list(enumerate(run_seeds(seed, run_count)))
+
+    if workers <= 1:
+        windows = sequence_windows(dna_strings, k)
+        for run, seed_sequence in runs:
+            yield (run, *run_function(dna_strings, windows, k, t, seed_sequence, *arguments))
+        return
+
+    block_size = max(1, -(-run_count // (workers * TASKS_PER_WORKER)))
+    blocks = [runs[i:i + block_size] for i in range(0, run_count, block_size)]
+
+    with shared_collection(dna_strings, k) as collection, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(collection, k, t)) as executor:
+        futures = [executor.submit(_run_block, run_function, block, arguments) for block in blocks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def best_of_runs(results, on_run=None):
+    """
+    Reduce (run, score, motifs, iterations) results to the best motifs, the lowest run index winning ties
+    (so the result does not depend on the order in which runs finish).
+
+    Args:
+        on_run: Optional callback on_run(run, score, best_score) called for each result
+    """
+    best = None
+    for run, score, motifs, _ in results:
+        if best is None or (score, run) < best[:2]:
+            best = (score, run, motifs)
+        if on_run is not None:
+            on_run(run, score, best[0])
+
+    return best[2] if best is not None else None
+
+
+def iter_randomized_motif_search(dna_strings, k, t, run_count, seed=None, workers=None):
+    """
+    Run RandomizedMotifSearch run_count times across a process pool,
+    yielding (run, score, motifs, iterations) as runs finish (not in run order).
+    """
+    return iter_seeded_runs(randomized_motifs_from_seed, dna_strings, k, t, run_count, seed, workers)
+
+
+def parallel_randomized_motif_search(dna_strings, k, t, run_count=1000, seed=None, workers=None, on_run=None):
+    """
+    Best motifs over run_count runs of RandomizedMotifSearch.
+
+    For a given seed the result is identical whatever the number of workers:
+    every run has its own random stream, and ties between runs go to the lowest run index.
+
+    Args:
+        on_run: Optional callback on_run(run, score, best_score) called as each run finishes
+
+    Returns:
+        list: Best motifs found
+    """
+    results = iter_seeded_runs(randomized_motifs_from_seed, dna_strings, k, t, run_count, seed, workers)
+    return best_of_runs(results, on_run)
+
+
+def gibbs_chain(dna_strings, windows, k, t, seed_sequence, iterations, patience=None, deadline=None):
+    """
+    One chain of the Gibbs sampler, drawing from its own random stream.
+
+    At each iteration a motif i is picked at random and taken out of the count matrix,
+    every window of string i is scored with the log-profile of the other motifs in one pass,
+    and the new motif i is sampled in proportion to the window probabilities
+    (binary search in their cumulative sum) before being counted back in.
+
+    Args:
+        iterations: Maximum number of iterations
+        patience: Stop once the score has not improved for this many iterations (plateau)
+        deadline: Stop at this time.time() value
+
+    Returns:
+        tuple: (score, motifs, iterations) - best collection seen and iterations done
+    """
+    rng = np.random.default_rng(seed_sequence)
+    sequences = [as_byte_array(dna_string) for dna_string in dna_strings]
+
+    # Motifs are kept as start positions
+    starts = [int(rng.integers(0, max(0, len(dna_string) - k) + 1)) for dna_string in dna_strings[:t]]
+    profile = MotifProfile(k)
+    for i in range(t):
+        profile.add(sequences[i][starts[i]:starts[i] + k])
+
+    best_starts = starts[:]
+    best_score = profile.score()
+    last_improvement = 0
+
+    iteration = 0
+    while iteration < iterations:
+        if patience is not None and iteration - last_improvement >= patience:
+            break
+        if deadline is not None and iteration % DEADLINE_CHECK_INTERVAL == 0 and time.time() >= deadline:
+            break
+        iteration += 1
+
+        i = int(rng.integers(0, t))
+        profile.remove(sequences[i][starts[i]:starts[i] + k])
+
+        scores = window_scores(windows[i], profile.log_profile())
+        if scores.size:
+            best_window = scores.max()
+            if best_window == -np.inf:
+                starts[i] = int(rng.integers(0, scores.size))
+            else:
+                # Probabilities relative to the best window (no underflow)
+                cumulative = np.cumsum(np.exp(scores - best_window))
+                starts[i] = int(np.searchsorted(cumulative, rng.random() * cumulative[-1]))
+
+        profile.add(sequences[i][starts[i]:starts[i] + k])
+
+        score = profile.score()
+        if score < best_score:
+            best_score = score
+            best_starts = starts[:]
+            last_improvement = iteration
+
+    return best_score, [kmer_text(dna_strings[i], best_starts[i], k) for i in range(t)], iteration
+
+
+def parallel_gibbs_sampler(dna_strings, k, t, iterations, chain_count, seed=None, workers=None, on_run=None):
+    """
+    Best motifs over chain_count independent Gibbs sampler chains run across a process pool.
+    For a given seed the result does not depend on the number of workers.
+
+    Args:
+        iterations: Iterations per chain
+        on_run: Optional callback on_run(chain, score, best_score) as chains finish
+
+    Returns:
+        list: Best motifs found
+    """
+    results = iter_seeded_runs(gibbs_chain, dna_strings, k, t, chain_count, seed, workers, (iterations,))
+    return best_of_runs(results, on_run)
+
+
+def anytime_motif_search(dna_strings, k, t, method='gibbs', time_budget=None, patience=None, seed=None,
+                         workers=None, iterations=GIBBS_MAX_ITERATIONS, chain_patience=GIBBS_CHAIN_PATIENCE,
+                         on_progress=None):
+    """
+    Keep running independent Gibbs chains or RandomizedMotifSearch runs until a limit is hit,
+    then return the best motifs found so far.
+
+    Args:
+        dna_strings: List of DNA strings
+        k: Length of motifs
+        t: Number of strings
+        method: 'gibbs' or 'randomized'
+        time_budget: Wall-clock budget in seconds (running chains are stopped at the deadline)
+        patience: Stop after this many finished runs without improving the best score
+        seed: Master seed of the random streams of the runs
+        workers: Number of processes (default: one per CPU)
+        iterations: Maximum iterations of a Gibbs chain
+        chain_patience: A Gibbs chain stops after this many iterations without improvement
+        on_progress: Optional callback on_progress(progress) after each finished block of runs, progress being a dict:
+            'elapsed': seconds since the start
+            'runs': finished runs
+            'iterations': iterations done by the finished runs
+            'iterations_per_second': iterations / elapsed
+            'best_score': best score so far
+            'history': list of (elapsed, best_score), one entry per improvement
+
+    Returns:
+        list: Best motifs found
+    """
+    if time_budget is None and patience is None:
+        raise ValueError("Give a time budget, a patience, or both")
+    if workers is None:
+        workers = default_workers()
+
+    start_time = time.time()
+    deadline = start_time + time_budget if time_budget is not None else None
+
+    if method == 'gibbs':
+        run_function, arguments, runs_per_task = gibbs_chain, (iterations, chain_patience, deadline), 1
+    elif method == 'randomized':
+        run_function, arguments, runs_per_task = randomized_motifs_from_seed, (), RANDOMIZED_RUNS_PER_TASK
+    else:
+        raise ValueError(f"Unknown method: {method}")
+
+    master_seed = np.random.SeedSequence(seed)
+    next_run = 0
+    best = None
+    runs_without_improvement = 0
+    progress = {'elapsed': 0.0, 'runs': 0, 'iterations': 0, 'iterations_per_second': 0.0,
+                'best_score': None, 'history': []}
+
+    def next_block():
+        nonlocal next_run
+        block = list(enumerate(master_seed.spawn(runs_per_task), start=next_run))
+        next_run += runs_per_task
+        return block
+
+    def record(results):
+        """Account for finished runs, return True when a limit is hit."""
+        nonlocal best, runs_without_improvement
+        elapsed = time.time() - start_time
+        for run, score, motifs, run_iterations in results:
+            progress['runs'] += 1
+            progress['iterations'] += run_iterations
+            if best is None or score < best[0]:
+                runs_without_improvement = 0
+                progress['history'].append((elapsed, score))
+            else:
+                runs_without_improvement += 1
+            if best is None or (score, run) < best[:2]:
+                best = (score, run, motifs)
+
+        progress['elapsed'] = elapsed
+        progress['iterations_per_second'] = progress['iterations'] / elapsed if elapsed > 0 else 0.0
+        progress['best_score'] = best[0]
+        if on_progress is not None:
+            on_progress(progress)
+
+        out_of_time = deadline is not None and time.time() >= deadline
+        out_of_patience = patience is not None and runs_without_improvement >= patience
+        return out_of_time or out_of_patience
+
+    if workers <= 1:
+        windows = sequence_windows(dna_strings, k)
+        while True:
+            results = [
+                (run, *run_function(dna_strings, windows, k, t, seed_sequence, *arguments))
+                for run, seed_sequence in next_block()
+            ]
+            if record(results):
+                break
+    else:
+        with shared_collection(dna_strings, k) as collection, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                    initargs=(collection, k, t)) as executor:
+            # Keep one block in flight per worker until a limit is hit
+            pending = {executor.submit(_run_block, run_function, next_block(), arguments) for _ in range(workers)}
+            stopping = False
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stopping = record(future.result()) or stopping
+                if not stopping:
+                    while len(pending) < workers:
+                        pending.add(executor.submit(_run_block, run_function, next_block(), arguments))
+
+    return best[2]
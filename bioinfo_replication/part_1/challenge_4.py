@@ -1,25 +1,36 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aho_corasick import multiple_pattern_matching
+from sequence_loader import find_pattern, line_text, map_lines
+
 def PatternMatching(Pattern, Genome):
     """
     Find all starting positions where Pattern appears as a substring of Genome
     
     Args:
         Pattern (str): The pattern to search for
-        Genome (str): The genome string to search in
+        Genome (str): The genome string to search in (or a byte view from load_genome)
     
     Returns:
         list: List of starting positions (0-indexed)
     """
-    positions = []
-    pattern_length = len(Pattern)
-    genome_length = len(Genome)
+    # Vectorized comparison on the genome bytes, no k-mer slicing
+    return find_pattern(Genome, Pattern).tolist()
+
+def MultiplePatternMatching(Patterns, Genome):
+    """
+    Find all starting positions of every pattern in Patterns with a single pass over Genome
+    (Aho-Corasick automaton built once over all patterns)
     
-    # Search through the genome
-    for i in range(genome_length - pattern_length + 1):
-        # Check if pattern matches at position i
-        if Genome[i:i + pattern_length] == Pattern:
-            positions.append(i)
+    Args:
+        Patterns (list): The patterns to search for
+        Genome (str): The genome string to search in
     
-    return positions
+    Returns:
+        dict: Pattern -> list of starting positions (0-indexed)
+    """
+    return multiple_pattern_matching(Patterns, Genome)
 
 # Test with sample data
 def test_sample():
@@ -60,30 +71,29 @@ def solve_from_file(filename):
     Line 2: Genome
     """
     try:
-        with open(filename, 'r') as file:
-            lines = file.read().strip().split('\n')
+        # The genome line is searched in place from the memory-mapped file
+        lines = map_lines(filename)
+        if len(lines) >= 2:
+            pattern = line_text(lines[0])
+            genome = lines[1]
+            
+            print(f"Pattern: {pattern}")
+            print(f"Genome:  {len(genome)} nucleotides")
+            
+            positions = PatternMatching(pattern, genome)
+            result_str = " ".join(map(str, positions))
+            
+            print(f"Starting positions: {result_str}")
+            
+            # Save result to output file
+            with open('output_bonus_v2.txt', 'w') as output:
+                output.write(result_str)
+            print("Result saved to output_bonus_v2.txt")
+            
+            return result_str
+        else:
+            print("Error: File should have at least 2 lines (Pattern and Genome)")
             
-            if len(lines) >= 2:
-                pattern = lines[0].strip()
-                genome = lines[1].strip()
-                
-                print(f"Pattern: {pattern}")
-                print(f"Genome:  {genome}")
-                
-                positions = PatternMatching(pattern, genome)
-                result_str = " ".join(map(str, positions))
-                
-                print(f"Starting positions: {result_str}")
-                
-                # Save result to output file
-                with open('output_bonus_v2.txt', 'w') as output:
-                    output.write(result_str)
-                print("Result saved to output_bonus_v2.txt")
-                
-                return result_str
-            else:
-                print("Error: File should have at least 2 lines (Pattern and Genome)")
-                
     except FileNotFoundError:
         print(f"File '{filename}' not found")
     except Exception as e:
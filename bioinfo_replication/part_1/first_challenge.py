@@ -1,13 +1,17 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from aho_corasick import multiple_pattern_count
+from sequence_loader import find_pattern, line_text, map_lines
+
 # Simple PatternCount Implementation
+# Text can also be a byte view from load_genome
 def PatternCount(Text, Pattern):
-    count = 0
-    pattern_length = len(Pattern)
-    
-    for i in range(len(Text) - pattern_length + 1):
-        if Text[i:i + pattern_length] == Pattern:
-            count += 1
-    
-    return count
+    return len(find_pattern(Text, Pattern))
+
+# Batch version: count every pattern with one pass over Text (Aho-Corasick automaton)
+def MultiplePatternCount(Text, Patterns):
+    return multiple_pattern_count(Patterns, Text)
 
 # Step 1: Let's test with simple data first
 print("Step 1: Testing the function")
@@ -22,31 +26,26 @@ print("-" * 30)
 # Step 2: Actual file 
 print("Step 2")
 try:
-    with open('data/first_sample.txt', 'r') as file:
-        content = file.read()
-        print("File content:")
-        print(repr(content))  
-        print("-" * 30)
+    # Lines are memory-mapped views: Text is searched in place, never copied into a str
+    lines = map_lines('data/first_sample.txt')
+    print(f"Number of lines found: {len(lines)}")
+    
+    if len(lines) >= 2:
+        text = lines[0]
+        pattern = line_text(lines[1])
         
-        lines = content.strip().split('\n')
-        print(f"Number of lines found: {len(lines)}")
+        print(f"Text (line 1): {len(text)} nucleotides")
+        print(f"Pattern (line 2): {pattern}")
         
-        if len(lines) >= 2:
-            text = lines[0]
-            pattern = lines[1]
-            
-            print(f"Text (line 1): {text}")
-            print(f"Pattern (line 2): {pattern}")
-            
-            result = PatternCount(text, pattern)
-            print(f"Final Result: {result}")
-            
-            # Save to output file
-            with open('output_v1.txt', 'w') as output_file:
-                output_file.write(str(result))
-            print("Result saved to output.txt")
-        else:
-            print("Error: Need at least 2 lines in the file")
+        result = PatternCount(text, pattern)
+        print(f"Final Result: {result}")
+        
+        # Save to output file
+        with open('output_v1.txt', 'w') as output_file:
+            output_file.write(str(result))
+        print("Result saved to output.txt")
+    else:
+        print("Error: Need at least 2 lines in the file")
             
 except FileNotFoundError:
     print("File not found in current directory")
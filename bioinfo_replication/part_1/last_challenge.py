@@ -1,3 +1,11 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+
+from dna_encoding import MAX_K, decode_kmer, kmer_text, masked_kmer_codes
+from sequence_loader import line_text, map_lines
+
 def FindClumps(Genome, k, L, t):
     """
     Find all k-mers forming (L, t)-clumps in Genome
@@ -11,33 +19,54 @@ def FindClumps(Genome, k, L, t):
     Returns:
         list: All distinct k-mers forming (L, t)-clumps
     """
+    # Integer codes of all k-mers; a window of length L holds L - k + 1 of them
+    # k-mers holding other symbols (N, lower case, ...) or longer than 32 are keyed by their string instead
+    if k <= MAX_K:
+        window_codes, valid = masked_kmer_codes(Genome, k)
+        codes = window_codes.tolist()
+        for position in np.flatnonzero(~valid).tolist():
+            codes[position] = kmer_text(Genome, position, k)
+    else:
+        codes = [kmer_text(Genome, i, k) for i in range(len(Genome) - k + 1)]
+    window_size = L - k + 1
+    
+    if window_size <= 0 or len(codes) < window_size:
+        return []
+    
     clumps = set()
     
-    # Slide window of length L across the genome
-    for i in range(len(Genome) - L + 1):
-        window = Genome[i:i + L]
+    # Count k-mers in the first window once
+    kmer_count = {}
+    for code in codes[:window_size]:
+        kmer_count[code] = kmer_count.get(code, 0) + 1
+    
+    for code, count in kmer_count.items():
+        if count >= t:
+            clumps.add(code)
+    
+    # Slide the window: remove the leaving k-mer, add the entering one
+    # Only the entering k-mer's count grows, so it is the only one to check against t
+    for i in range(window_size, len(codes)):
+        kmer_count[codes[i - window_size]] -= 1
         
-        # Count k-mers in this window
-        kmer_count = {}
-        for j in range(len(window) - k + 1):
-            kmer = window[j:j + k]
-            kmer_count[kmer] = kmer_count.get(kmer, 0) + 1
+        entering = codes[i]
+        count = kmer_count.get(entering, 0) + 1
+        kmer_count[entering] = count
         
-        # Find k-mers that appear at least t times
-        for kmer, count in kmer_count.items():
-            if count >= t:
-                clumps.add(kmer)
+        if count >= t:
+            clumps.add(entering)
     
-    return list(clumps)
+    return sorted(decode_kmer(code, k) if isinstance(code, int) else code for code in clumps)
 
 # Solve from file
-with open('data/last_sample.txt', 'r') as file:
-    lines = file.read().strip().split('\n')
+if __name__ == "__main__":
+    # The genome line is used in place from the memory-mapped file
+    lines = map_lines('data/last_sample.txt')
     
-    genome = lines[0].strip()
-    k = int(lines[1].strip())
-    L = int(lines[2].strip())
-    t = int(lines[3].strip())
+    genome = lines[0]
+    k = int(line_text(lines[1]))
+    L = int(line_text(lines[2]))
+    t = int(line_text(lines[3]))
     
     result = FindClumps(genome, k, L, t)
     result_str = " ".join(result)
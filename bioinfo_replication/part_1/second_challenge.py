@@ -1,5 +1,11 @@
 #second_challenge
 
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from kmer_counter import kmer_frequencies, most_frequent_kmers
+from sequence_loader import line_text, map_lines
+
 def FrequentWords(Text, k):
     """
     Find all most frequent k-mers in Text
@@ -11,27 +17,8 @@ def FrequentWords(Text, k):
     Returns:
         list: All most frequent k-mers
     """
-    # Dictionary to count frequency of each k-mer
-    frequency_map = {}
-    
-    # Generate all k-mers and count their frequencies
-    for i in range(len(Text) - k + 1):
-        kmer = Text[i:i + k]
-        if kmer in frequency_map:
-            frequency_map[kmer] += 1
-        else:
-            frequency_map[kmer] = 1
-    
-    # Find the maximum frequency
-    max_frequency = max(frequency_map.values())
-    
-    # Find all k-mers with maximum frequency
-    frequent_kmers = []
-    for kmer, frequency in frequency_map.items():
-        if frequency == max_frequency:
-            frequent_kmers.append(kmer)
-    
-    return frequent_kmers
+    # Count 2-bit encoded k-mers in a frequency array instead of a dict of sliced strings
+    return most_frequent_kmers(Text, k)
 
 # Test with the sample data
 def test_sample():
@@ -59,29 +46,29 @@ def solve_from_file(filename):
     Line 2: k (integer)
     """
     try:
-        with open(filename, 'r') as file:
-            lines = file.read().strip().split('\n')
+        # The text line is counted in place from the memory-mapped file
+        lines = map_lines(filename)
+        
+        if len(lines) >= 2:
+            text = lines[0]
+            k = int(line_text(lines[1]))
             
-            if len(lines) >= 2:
-                text = lines[0].strip()
-                k = int(lines[1].strip())
-                
-                print(f"Text: {text}")
-                print(f"k: {k}")
-                
-                result = FrequentWords(text, k)
-                result_str = " ".join(result)
-                
-                print(f"Most frequent {k}-mers: {result_str}")
-                
-                # Save result to output file
-                with open('part_1/output_v2.txt', 'w') as output:
-                    output.write(result_str)
-                print("Result saved to output_v2.txt")
-                
-                return result_str
-            else:
-                print("Error: File should have at least 2 lines (Text and k)")
+            print(f"Text: {len(text)} nucleotides")
+            print(f"k: {k}")
+            
+            result = FrequentWords(text, k)
+            result_str = " ".join(result)
+            
+            print(f"Most frequent {k}-mers: {result_str}")
+            
+            # Save result to output file
+            with open('part_1/output_v2.txt', 'w') as output:
+                output.write(result_str)
+            print("Result saved to output_v2.txt")
+            
+            return result_str
+        else:
+            print("Error: File should have at least 2 lines (Text and k)")
                 
     except FileNotFoundError:
         print(f"File '{filename}' not found")
@@ -116,14 +103,7 @@ def debug_kmers(Text, k):
     """
     print(f"=== Debug: All {k}-mers in {Text} ===")
     
-    frequency_map = {}
-    
-    for i in range(len(Text) - k + 1):
-        kmer = Text[i:i + k]
-        if kmer in frequency_map:
-            frequency_map[kmer] += 1
-        else:
-            frequency_map[kmer] = 1
+    frequency_map = kmer_frequencies(Text, k)
     
     # Sort by frequency (descending) then by k-mer name
     sorted_kmers = sorted(frequency_map.items(), key=lambda x: (-x[1], x[0]))
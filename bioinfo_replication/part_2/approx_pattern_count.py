@@ -1,3 +1,7 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sequence_loader import line_text, map_lines
 from helpers import approximate_pattern_matching
 
 def approximate_pattern_count(pattern, text, d):
@@ -19,11 +23,11 @@ def approximate_pattern_count(pattern, text, d):
     return len(positions)
 
 # Read input from file
-with open('data/part_2_data/sample_5.txt', 'r') as f:
-    lines = f.read().strip().split('\n')
-    pattern = lines[0]
-    text = lines[1]
-    d = int(lines[2])
+# The text line is scanned in place from the memory-mapped file
+lines = map_lines('data/part_2_data/sample_5.txt')
+pattern = line_text(lines[0])
+text = lines[1]
+d = int(line_text(lines[2]))
 
 # Count approximate pattern matches
 result = approximate_pattern_count(pattern, text, d)
@@ -0,0 +1,65 @@
+#Benchmark: full-scan approximate pattern matching vs seed-and-extend (pigeonhole filtering)
+#on a random megabase text, with the seed index built once and reused across queries
+
+import random
+import time
+
+from helpers import (
+    approximate_pattern_matching,
+    approximate_pattern_matching_seeded,
+    build_seed_index,
+    seed_length_for
+)
+
+
+def random_dna(length, rng):
+    return ''.join(rng.choice('ACGT') for _ in range(length))
+
+
+def plant_pattern(text, pattern, count, d, rng):
+    """Insert copies of pattern with up to d random substitutions at random positions."""
+    text = list(text)
+    k = len(pattern)
+    for _ in range(count):
+        start = rng.randint(0, len(text) - k)
+        copy = list(pattern)
+        for _ in range(rng.randint(0, d)):
+            copy[rng.randrange(k)] = rng.choice('ACGT')
+        text[start:start + k] = copy
+    return ''.join(text)
+
+
+def main():
+    rng = random.Random(42)
+    text_length = 2_000_000
+    k, d = 20, 3
+    query_count = 50
+
+    print(f"Text length: {text_length}, k = {k}, d = {d}, {query_count} queries")
+
+    patterns = [random_dna(k, rng) for _ in range(query_count)]
+    text = random_dna(text_length, rng)
+    for pattern in patterns:
+        text = plant_pattern(text, pattern, 5, d, rng)
+
+    start = time.perf_counter()
+    full_scan_results = [approximate_pattern_matching(pattern, text, d) for pattern in patterns]
+    full_scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    seed_index = build_seed_index(text, seed_length_for(k, d))
+    index_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    seeded_results = [approximate_pattern_matching_seeded(pattern, text, d, seed_index) for pattern in patterns]
+    seeded_time = time.perf_counter() - start
+
+    print(f"Full scan:        {full_scan_time:.3f} s ({full_scan_time / query_count * 1000:.1f} ms/query)")
+    print(f"Seed index build: {index_time:.3f} s (once)")
+    print(f"Seed-and-extend:  {seeded_time:.3f} s ({seeded_time / query_count * 1000:.1f} ms/query)")
+    print(f"Speedup per query: {full_scan_time / seeded_time:.1f}x")
+    print(f"Same results: {full_scan_results == seeded_results}")
+
+
+if __name__ == "__main__":
+    main()
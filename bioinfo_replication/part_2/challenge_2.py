@@ -1,8 +1,11 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sequence_loader import load_genome
 from helpers import find_minimum_skew
 
-# Read genome from file
-with open('data/part_2_data/sample_2.txt', 'r') as f:
-    genome = f.read().strip()
+# Memory-map the genome file (plain or FASTA)
+genome = load_genome('data/part_2_data/sample_2.txt')
 
 # Find and print minimum skew positions
 result = find_minimum_skew(genome)
@@ -1,9 +1,97 @@
 # The goal is to find all k-mers with up to d mismatches with Pattern in Text 
 
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from helpers import hamming_distance,neighbors
+from concurrent.futures import ProcessPoolExecutor
+from dna_encoding import MAX_K, as_byte_array, decode_kmer, encode_kmer, is_nucleotide_string, kmer_text, masked_kmer_codes
+from neighborhood import clear_neighbor_cache, masks_are_cheaper, neighbor_codes, neighborhood_frequency_array, neighborhood_layers, spread_layers
 from itertools import product
 
-def frequent_words_with_mismatches(text, k, d):
+import numpy as np
+
+# Largest k for the frequency-array mode: 4^12 uint32 counts = 64 MB per array
+FREQUENCY_ARRAY_K_LIMIT = 12
+
+def split_kmers(text, k):
+    """
+    k-mers of text made of upper-case A, C, G, T as codes, and the other ones (N, lower case, ...) as strings.
+    
+    Returns:
+        tuple: (uint64 array of codes, list of the other k-mers)
+    """
+    if k > MAX_K:
+        # No code holds k-mers this long
+        return np.empty(0, dtype=np.uint64), [kmer_text(text, i, k) for i in range(len(text) - k + 1)]
+    codes, valid = masked_kmer_codes(text, k)
+    others = [kmer_text(text, position, k) for position in np.flatnonzero(~valid).tolist()]
+    return codes[valid], others
+
+def other_neighborhood_counts(other_kmers, d):
+    """
+    Count the d-neighborhoods of k-mers holding other symbols with the string generator,
+    which keeps these symbols where the string version keeps them.
+    
+    Returns:
+        tuple: (dict code -> count for the neighbors made of A, C, G, T, dict k-mer -> count for the others)
+    """
+    code_counts = {}
+    string_counts = {}
+    for kmer in other_kmers:
+        for neighbor in neighbors(kmer, d):
+            if is_nucleotide_string(neighbor):
+                code = encode_kmer(neighbor)
+                code_counts[code] = code_counts.get(code, 0) + 1
+            else:
+                string_counts[neighbor] = string_counts.get(neighbor, 0) + 1
+    return code_counts, string_counts
+
+def merge_counts(total, counts):
+    """Add the counts of one dictionary to another."""
+    for key, count in counts.items():
+        total[key] = total.get(key, 0) + count
+    return total
+
+def add_code_counts(frequencies, code_counts):
+    """Add a dictionary code -> count to a dense array indexed by k-mer code."""
+    for code, count in code_counts.items():
+        frequencies[code] += count
+    return frequencies
+
+def most_frequent_words(k, code_counts, string_counts):
+    """
+    k-mers of highest count.
+    
+    Args:
+        code_counts: Dense array indexed by k-mer code, or dictionary code -> count
+        string_counts: Dictionary k-mer -> count of the k-mers holding other symbols
+    
+    Returns:
+        list: The k-mers, in lexicographic order
+    """
+    if isinstance(code_counts, dict):
+        code_max = max(code_counts.values(), default=0)
+    else:
+        code_max = int(code_counts.max())
+    max_count = max(code_max, max(string_counts.values(), default=0))
+    if max_count == 0:
+        return []
+    
+    patterns = [kmer for kmer in string_counts if string_counts[kmer] == max_count]
+    if code_max == max_count:
+        if isinstance(code_counts, dict):
+            best = [code for code in code_counts if code_counts[code] == max_count]
+        else:
+            best = np.flatnonzero(code_counts == max_count).tolist()
+        patterns.extend(decode_kmer(code, k) for code in best)
+    return sorted(patterns)
+
+def kmer_counts(codes):
+    """Distinct codes of an array of k-mer codes and their counts."""
+    return np.unique(codes, return_counts=True)
+
+def frequent_words_with_mismatches(text, k, d, use_frequency_array=None, workers=1):
     """
     Find all most frequent k-mers with up to d mismatches in text.
     
@@ -11,20 +99,30 @@ def frequent_words_with_mismatches(text, k, d):
         text (str): The DNA string to analyze
         k (int): Length of k-mers to consider
         d (int): Maximum number of mismatches allowed
+        use_frequency_array (bool): Count into a dense 4^k array instead of a dictionary
+                                    (default: when k <= FREQUENCY_ARRAY_K_LIMIT)
+        workers (int): Number of processes counting chunks of text in parallel
         
+    k-mers holding symbols other than upper-case A, C, G, T (N, lower case, ...) are expanded
+    as strings, like the string version did for every k-mer.
+    
     Returns:
-        list: All most frequent k-mers with up to d mismatches
+        list: All most frequent k-mers with up to d mismatches, in lexicographic order
     """
-    patterns = []
-    freq_map = {}  # Dictionary to count approximate matches
-    n = len(text)
+    if use_frequency_array is None:
+        use_frequency_array = k <= FREQUENCY_ARRAY_K_LIMIT
+    if workers > 1:
+        return frequent_words_with_mismatches_parallel(text, k, d, workers, use_frequency_array)
+    if use_frequency_array:
+        return frequent_words_with_mismatches_array(text, k, d)
     
-    # For each k-mer in the text
-    for i in range(n - k + 1):
-        pattern = text[i:i + k]  # Extract k-mer at position i
-        
-        # Get all k-mers within distance d of this pattern
-        neighborhood = neighbors(pattern, d)
+    freq_map = {}  # Dictionary to count approximate matches, keyed by k-mer code
+    codes, others = split_kmers(text, k)
+    
+    # For each k-mer in the text (as its 2-bit code)
+    for code in codes.tolist():
+        # Neighborhood from the LRU cache: a k-mer already seen is not expanded again
+        neighborhood = neighbor_codes(code, k, d).tolist()
         
         # Increment count for each neighbor
         for neighbor in neighborhood:
@@ -32,26 +130,184 @@ def frequent_words_with_mismatches(text, k, d):
                 freq_map[neighbor] += 1
             else:
                 freq_map[neighbor] = 1
+    clear_neighbor_cache()
     
-    # Find the maximum frequency
-    max_count = max(freq_map.values()) if freq_map else 0
+    other_codes, string_counts = other_neighborhood_counts(others, d)
+    merge_counts(freq_map, other_codes)
     
     # Collect all k-mers with maximum frequency
-    for pattern in freq_map:
-        if freq_map[pattern] == max_count:
-            patterns.append(pattern)
+    return most_frequent_words(k, freq_map, string_counts)
+
+def frequent_words_with_mismatches_array(text, k, d):
+    """
+    Frequency-array version of frequent_words_with_mismatches.
+    
+    The distinct k-mers of text are counted exactly first, then each count is added to
+    all neighbors in a dense array indexed by k-mer code, so the work depends on the
+    number of distinct k-mers (or on 4^k) instead of on the length of text.
+    
+    Returns:
+        list: All most frequent k-mers with up to d mismatches, in lexicographic order
+    """
+    if k > FREQUENCY_ARRAY_K_LIMIT:
+        raise ValueError(f"Frequency-array mode only available for k <= {FREQUENCY_ARRAY_K_LIMIT}")
+    
+    codes, others = split_kmers(text, k)
+    other_codes, string_counts = other_neighborhood_counts(others, d)
+    
+    codes, counts = kmer_counts(codes)
+    if len(codes):
+        frequencies = neighborhood_frequency_array(codes, counts, k, d).astype(np.int64)
+    else:
+        frequencies = np.zeros(4 ** k, dtype=np.int64)
+    
+    return most_frequent_words(k, add_code_counts(frequencies, other_codes), string_counts)
+
+def text_chunks(text, chunk_count, k):
+    """
+    Split text into chunk_count pieces overlapping by k - 1 symbols,
+    so that every k-mer of text lies in exactly one chunk.
+    
+    Returns:
+        list: Chunks as bytes
+    """
+    data = as_byte_array(text)
+    kmer_count = len(data) - k + 1
+    if kmer_count <= 0:
+        return []
+    
+    chunk_count = max(1, min(chunk_count, kmer_count))
+    bounds = [kmer_count * i // chunk_count for i in range(chunk_count + 1)]
+    return [data[bounds[i]:bounds[i + 1] + k - 1].tobytes() for i in range(chunk_count)]
+
+def count_chunk_neighborhoods(chunk, k, d, use_frequency_array):
+    """
+    Count the d-neighborhoods of the k-mers of one chunk of text (run in a worker process).
+    
+    Returns:
+        tuple: (dense 4^k count array or dictionary code -> count,
+                dictionary k-mer -> count of the neighbors holding other symbols)
+    """
+    codes, others = split_kmers(chunk, k)
+    other_codes, string_counts = other_neighborhood_counts(others, d)
+    
+    if use_frequency_array:
+        codes, counts = kmer_counts(codes)
+        if len(codes) == 0:
+            frequencies = np.zeros(4 ** k, dtype=np.uint32)
+        else:
+            frequencies = neighborhood_frequency_array(codes, counts, k, d, use_masks=True)
+        return add_code_counts(frequencies, other_codes), string_counts
+    
+    freq_map = other_codes
+    for code in codes.tolist():
+        for neighbor in neighbor_codes(code, k, d).tolist():
+            freq_map[neighbor] = freq_map.get(neighbor, 0) + 1
+    clear_neighbor_cache()
+    return freq_map, string_counts
+
+def layered_frequency_array_parallel(codes, counts, k, d, workers):
+    """
+    Position-by-position frequency array (see neighborhood.neighborhood_layers) split across processes.
+    
+    The k-mers are grouped by their first p nucleotides, with 4^p >= workers. The last k - p
+    positions never mix groups, so each worker processes them for one group on its own 4^(k-p) block;
+    the blocks laid end to end are the layers of the whole array, and only the first p positions
+    are left to process in this process.
+    
+    Args:
+        codes: uint64 array of distinct k-mer codes (e.g. from kmer_counter.count_kmers)
+        counts: Number of occurrences of each code
+    
+    Returns:
+        np.ndarray: Array of length 4^k, same values as neighborhood_frequency_array
+    """
+    total = int(counts.sum()) if len(counts) else 0
+    dtype = np.uint32 if total < 2 ** 30 else np.uint64
+    
+    prefix_length = 0
+    while 4 ** prefix_length < workers and prefix_length < k:
+        prefix_length += 1
+    suffix_length = k - prefix_length
+    groups = codes >> np.uint64(2 * suffix_length)
+    suffixes = codes & np.uint64(4 ** suffix_length - 1)
+    
+    group_count = 4 ** prefix_length
+    group_codes = [suffixes[groups == group] for group in range(group_count)]
+    group_counts = [counts[groups == group] for group in range(group_count)]
+    
+    with ProcessPoolExecutor(max_workers=min(workers, group_count)) as executor:
+        blocks = list(executor.map(neighborhood_layers, group_codes, group_counts, [suffix_length] * group_count,
+                                   [d] * group_count, [dtype] * group_count))
+    
+    # Blocks only reach distance k - p; the layers beyond start empty
+    layers = [np.concatenate([block[t] for block in blocks]) for t in range(len(blocks[0]))]
+    layers += [np.zeros(4 ** k, dtype=dtype) for _ in range(len(layers), min(d, k) + 1)]
+    del blocks
+    spread_layers(layers, k, range(prefix_length), processed=suffix_length)
+    
+    frequencies = layers[0]
+    for layer in layers[1:]:
+        frequencies += layer
+    return frequencies
+
+def frequent_words_with_mismatches_parallel(text, k, d, workers, use_frequency_array=None):
+    """
+    Parallel version of frequent_words_with_mismatches.
+    
+    The text is split into one chunk per worker (overlapping by k - 1), each worker process
+    counts the neighborhoods of its chunk, and the per-chunk counts are summed.
+    
+    In frequency-array mode, chunks are only worth it while expanding their k-mers is cheaper
+    than one position-by-position pass over the 4^k array. That pass does not depend on the
+    text length, so past this point (e.g. k = 12, d = 3 on a megabase) the 4^k array is split
+    across the workers instead (see layered_frequency_array_parallel).
+    
+    Returns:
+        list: All most frequent k-mers with up to d mismatches, in lexicographic order
+    """
+    if use_frequency_array is None:
+        use_frequency_array = k <= FREQUENCY_ARRAY_K_LIMIT
+    if use_frequency_array and k > FREQUENCY_ARRAY_K_LIMIT:
+        raise ValueError(f"Frequency-array mode only available for k <= {FREQUENCY_ARRAY_K_LIMIT}")
+    
+    chunks = text_chunks(text, workers, k)
+    if not chunks:
+        return []
+    
+    if use_frequency_array and not masks_are_cheaper(min(len(chunks[0]), 4 ** k), k, d):
+        codes, others = split_kmers(text, k)
+        other_codes, string_counts = other_neighborhood_counts(others, d)
+        codes, counts = kmer_counts(codes)
+        frequencies = layered_frequency_array_parallel(codes, counts, k, d, workers).astype(np.int64)
+        return most_frequent_words(k, add_code_counts(frequencies, other_codes), string_counts)
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        results = executor.map(count_chunk_neighborhoods, chunks,
+                               [k] * len(chunks), [d] * len(chunks), [use_frequency_array] * len(chunks))
+        
+        # Reduction: sum the counts of all chunks
+        code_counts = np.zeros(4 ** k, dtype=np.int64) if use_frequency_array else {}
+        string_counts = {}
+        for chunk_counts, chunk_string_counts in results:
+            if use_frequency_array:
+                code_counts += chunk_counts
+            else:
+                merge_counts(code_counts, chunk_counts)
+            merge_counts(string_counts, chunk_string_counts)
     
-    return patterns
+    return most_frequent_words(k, code_counts, string_counts)
 
-# Read input from file
-with open('data/part_2_data/sample_6.txt', 'r') as f:
-    lines = f.read().strip().split('\n')
-    text = lines[0]
-    k = int(lines[1])
-    d = int(lines[2])
+if __name__ == "__main__":
+    # Read input from file
+    with open('data/part_2_data/sample_6.txt', 'r') as f:
+        lines = f.read().strip().split('\n')
+        text = lines[0]
+        k = int(lines[1])
+        d = int(lines[2])
 
-# Find frequent words with mismatches
-result = frequent_words_with_mismatches(text, k, d)
+    # Find frequent words with mismatches
+    result = frequent_words_with_mismatches(text, k, d)
 
-# Print results
-print(' '.join(result))
+    # Print results
+    print(' '.join(result))
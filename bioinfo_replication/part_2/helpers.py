@@ -1,5 +1,23 @@
 #DNA analysis functions
 
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from dna_encoding import MAX_K, as_byte_array, encode_kmer, is_nucleotide_string, masked_kmer_codes
+from hamming_kernel import window_hamming_distances
+from neighborhood import neighbor_strings
+
+# Skew step of each ASCII symbol: +1 for G, -1 for C, 0 otherwise (upper case only, like the string version)
+SKEW_STEPS = np.zeros(256, dtype=np.int8)
+SKEW_STEPS[ord('G')] = 1
+SKEW_STEPS[ord('C')] = -1
+
+# Genomes are scanned in chunks of this many nucleotides when the full skew array is not needed
+SKEW_CHUNK_SIZE = 1 << 22
+
 def calculate_skew(genome):
     """
     Calculate the skew values for a DNA string.
@@ -9,47 +27,126 @@ def calculate_skew(genome):
     
     Args:
         genome (str): DNA string containing nucleotides A, T, G, C
+                      (or a byte view from load_genome)
         
     Returns:
         list: List of skew values from position 0 to len(genome)
     """
-    skew_values = [0]  # Skew_0 is always 0
-    current_skew = 0
+    return skew_array(genome).tolist()
+
+def skew_array(genome):
+    """
+    Same values as calculate_skew, as a NumPy array (cumulative sum of +1/-1/0 steps over the genome bytes).
     
-    for nucleotide in genome:
-        if nucleotide == 'G':
-            current_skew += 1
-        elif nucleotide == 'C':
-            current_skew -= 1
-        # For A and T, skew remains the same
+    Args:
+        genome (str): DNA string (or a byte view from load_genome)
         
-        skew_values.append(current_skew)
+    Returns:
+        np.ndarray: Skew values from position 0 to len(genome)
+    """
+    steps = SKEW_STEPS[as_byte_array(genome)]
+    dtype = np.int32 if len(steps) < 2 ** 31 else np.int64
+    
+    skew_values = np.zeros(len(steps) + 1, dtype=dtype)  # Skew_0 is always 0
+    np.cumsum(steps, dtype=dtype, out=skew_values[1:])
     
     return skew_values
 
+def iter_genome_chunks(genome, chunk_size=SKEW_CHUNK_SIZE):
+    """Yield consecutive chunks of a genome as byte views (no copy for bytes-like input)."""
+    data = as_byte_array(genome)
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+def minimum_skew_from_chunks(chunks):
+    """
+    Streaming Minimum Skew: track the running skew, its minimum and the arg-min
+    positions chunk by chunk, without storing the skew array of the whole genome.
+    
+    Args:
+        chunks: Iterable of consecutive pieces of the genome (str or bytes-like)
+        
+    Returns:
+        tuple: (minimum skew value, list of all positions where it is attained)
+    """
+    min_skew = 0
+    min_positions = [np.zeros(1, dtype=np.int64)]  # Skew_0 = 0
+    current_skew = 0
+    offset = 0
+    
+    for chunk in chunks:
+        steps = SKEW_STEPS[as_byte_array(chunk)]
+        if steps.size == 0:
+            continue
+        
+        # Skew at positions offset+1 ... offset+len(chunk)
+        skew = current_skew + np.cumsum(steps, dtype=np.int64)
+        chunk_min = int(skew.min())
+        
+        if chunk_min <= min_skew:
+            positions = np.flatnonzero(skew == chunk_min) + offset + 1
+            if chunk_min < min_skew:
+                min_skew = chunk_min
+                min_positions = [positions]
+            else:
+                min_positions.append(positions)
+        
+        current_skew = int(skew[-1])
+        offset += steps.size
+    
+    return min_skew, np.concatenate(min_positions).tolist()
+
 def find_minimum_skew(genome):
     """
     Find all positions where the skew diagram attains a minimum.
     
     Args:
         genome (str): DNA string containing nucleotides A, T, G, C
+                      (or a byte view from load_genome)
         
     Returns:
         list: All positions (indices) where skew is minimum
     """
-    # Reuse the calculate_skew function
-    skew_values = calculate_skew(genome)
+    # Streaming scan: memory stays bounded by the chunk size
+    _, min_positions = minimum_skew_from_chunks(iter_genome_chunks(genome))
+    
+    return min_positions
+
+def windowed_skew(genome, window):
+    """
+    Skew sampled every `window` nucleotides, for plotting skew diagrams of very long chromosomes.
     
-    # Find the minimum skew value
-    min_skew = min(skew_values)
+    Args:
+        genome (str): DNA string (or a byte view from load_genome)
+        window (int): Sampling step in nucleotides
+        
+    Returns:
+        tuple: (positions, skew values) as NumPy arrays, positions 0, window, 2*window, ...
+               followed by len(genome) if it is not a multiple of window
+    """
+    if window <= 0:
+        raise ValueError("window must be positive")
+    
+    # Chunks that are a multiple of window keep the sampling grid aligned
+    chunk_size = max(window, SKEW_CHUNK_SIZE - SKEW_CHUNK_SIZE % window)
+    samples = [np.zeros(1, dtype=np.int64)]
+    current_skew = 0
+    length = 0
     
-    # Find all positions where this minimum occurs
-    min_positions = []
-    for i, skew in enumerate(skew_values):
-        if skew == min_skew:
-            min_positions.append(i)
+    for chunk in iter_genome_chunks(genome, chunk_size):
+        skew = current_skew + np.cumsum(SKEW_STEPS[chunk], dtype=np.int64)
+        samples.append(skew[window - 1::window])
+        current_skew = int(skew[-1])
+        length += chunk.size
     
-    return min_positions
+    positions = np.arange(0, length + 1, window)
+    skew_values = np.concatenate(samples)
+    
+    if length % window:
+        positions = np.append(positions, length)
+        skew_values = np.append(skew_values, current_skew)
+    
+    return positions, skew_values
 
 def solve_minimum_skew_problem(genome):
     """
@@ -61,13 +158,14 @@ def solve_minimum_skew_problem(genome):
     Returns:
         dict: Dictionary containing minimum positions, skew values, and min skew value
     """
-    min_positions = find_minimum_skew(genome)
-    skew_values = calculate_skew(genome)
-    min_skew_value = min(skew_values)
+    # Compute the skew array once and derive everything from it
+    skew_values = skew_array(genome)
+    min_skew_value = int(skew_values.min())
+    min_positions = np.flatnonzero(skew_values == min_skew_value).tolist()
     
     return {
         'min_positions': min_positions,
-        'skew_values': skew_values,
+        'skew_values': skew_values.tolist(),
         'min_skew_value': min_skew_value
     }
 
@@ -119,19 +217,99 @@ def approximate_pattern_matching(pattern, text, d):
     Returns:
         list: All starting positions where pattern appears with at most d mismatches
     """
-    positions = []
-    pattern_length = len(pattern)
+    # Distances from pattern to every window of text at once (XOR + popcount on 2-bit codes)
+    distances = window_hamming_distances(pattern, text)
+    
+    return np.flatnonzero(distances <= d).tolist()
+
+def build_seed_index(text, seed_length):
+    """
+    Index every seed_length-mer of text: k-mer codes sorted, with their positions.
+    Seeds holding symbols other than upper-case A, C, G, T are left out (no piece can match them exactly).
+    Build it once and reuse it for every pattern searched with the same seed length.
     
-    # Check every possible position in the text
-    for i in range(len(text) - pattern_length + 1):
-        # Extract k-mer from text starting at position i
-        substring = text[i:i + pattern_length]
+    Args:
+        text (str): The text to index (or a byte view from load_genome)
+        seed_length (int): Length of the indexed seeds (at most 32)
         
-        # Check if Hamming distance is at most d
-        if hamming_distance(pattern, substring) <= d:
-            positions.append(i)
+    Returns:
+        dict: 'seed_length', 'codes' (sorted seed codes) and 'positions' (their positions in text)
+    """
+    codes, valid = masked_kmer_codes(text, seed_length)
+    positions = np.flatnonzero(valid)
+    order = positions[np.argsort(codes[positions], kind='stable')]
     
-    return positions
+    return {
+        'seed_length': seed_length,
+        'codes': codes[order],
+        'positions': order,
+    }
+
+def seed_length_for(k, d):
+    """
+    Seed length used by the pigeonhole filter: the pattern is cut into d+1 pieces,
+    and if it matches with at most d mismatches, at least one piece matches exactly.
+    """
+    return min(k // (d + 1), MAX_K)
+
+def approximate_pattern_matching_seeded(pattern, text, d, seed_index=None):
+    """
+    Find all approximate occurrences of a pattern using seed-and-extend (pigeonhole filtering).
+    
+    1. Cut pattern into d+1 disjoint pieces of length seed_length_for(k, d)
+    2. Look up the exact occurrences of each piece in the seed index of text
+    3. Each hit gives a candidate start position; verify only those with a Hamming distance
+    
+    Returns exactly the same positions as approximate_pattern_matching, but the work
+    is proportional to the number of seed hits instead of the text length.
+    
+    Args:
+        pattern (str): The pattern to search for
+        text (str): The text to search in (or a byte view from load_genome)
+        d (int): Maximum number of mismatches allowed
+        seed_index (dict): Optional index from build_seed_index(text, seed_length_for(k, d))
+        
+    Returns:
+        list: All starting positions where pattern appears with at most d mismatches
+    """
+    k = len(pattern)
+    seed_length = seed_length_for(k, d)
+    
+    # More pieces than nucleotides: no seed to filter with
+    # Other symbols in the pattern: its pieces cannot be looked up in the index
+    if seed_length == 0 or not is_nucleotide_string(pattern):
+        return approximate_pattern_matching(pattern, text, d)
+    
+    if seed_index is None:
+        seed_index = build_seed_index(text, seed_length)
+    elif seed_index['seed_length'] != seed_length:
+        raise ValueError(f"Seed index built for seeds of length {seed_index['seed_length']}, expected {seed_length}")
+    
+    data = as_byte_array(text)
+    last_start = len(data) - k
+    if last_start < 0:
+        return []
+    
+    # Step 1-2: Exact hits of every piece give candidate starts
+    # Pieces start every k // (d+1) nucleotides; seeds longer than 32 are cut to their first 32 symbols
+    piece_length = k // (d + 1)
+    candidates = []
+    for piece_start in range(0, (d + 1) * piece_length, piece_length):
+        piece_code = np.uint64(encode_kmer(pattern[piece_start:piece_start + seed_length]))
+        low = np.searchsorted(seed_index['codes'], piece_code, side='left')
+        high = np.searchsorted(seed_index['codes'], piece_code, side='right')
+        candidates.append(seed_index['positions'][low:high] - piece_start)
+    
+    candidates = np.unique(np.concatenate(candidates))
+    candidates = candidates[(candidates >= 0) & (candidates <= last_start)]
+    
+    # Step 3: Verify candidates, one pattern column at a time
+    symbols = as_byte_array(pattern)
+    mismatches = np.zeros(len(candidates), dtype=np.int32)
+    for offset in range(k):
+        mismatches += data[candidates + offset] != symbols[offset]
+    
+    return candidates[mismatches <= d].tolist()
 
 def neighbors(pattern, d):
     """
@@ -147,25 +325,5 @@ def neighbors(pattern, d):
     Returns:
         set: All strings within Hamming distance d from pattern
     """
-    if d == 0:
-        return {pattern}
-    
-    if len(pattern) == 1:
-        return {'A', 'C', 'G', 'T'}
-    
-    neighborhood = set()
-    
-    # Get neighbors of the suffix (all but first character)
-    suffix_neighbors = neighbors(pattern[1:], d)
-    
-    for text in suffix_neighbors:
-        # Reuse hamming_distance function from helpers
-        if hamming_distance(pattern[1:], text) < d:
-            # If suffix uses < d mismatches, first character can be anything
-            for nucleotide in ['A', 'C', 'G', 'T']:
-                neighborhood.add(nucleotide + text)
-        else:
-            # If suffix uses exactly d mismatches, first character must match
-            neighborhood.add(pattern[0] + text)
-    
-    return neighborhood
\ No newline at end of file
+    # Codes and XOR masks for DNA k-mers, the recursive generator for the others
+    return neighbor_strings(pattern, d)
@@ -1,7 +1,18 @@
 # most frequent_words_with_mismatches_and_reverse_complements
 
-from helpers import hamming_distance
-from d_neighborhood import neighbors
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from itertools import chain
+
+import numpy as np
+
+from dna_encoding import (MAX_K, STRICT_BASE_TO_CODE, as_byte_array, decode_kmer, is_nucleotide_string, kmer_text,
+                          masked_kmer_codes, reverse_complement_codes)
+from hamming_kernel import window_hamming_distances
+from neighborhood import (clear_neighbor_cache, neighbor_codes, neighbor_strings, neighborhood_frequency_array,
+                          other_neighbor_codes)
+from d_neighborhood import FREQUENCY_ARRAY_K_LIMIT
 
 def reverse_complement(pattern):
     """
@@ -28,14 +39,93 @@ def approximate_pattern_count(text, pattern, d):
     Returns:
         int: Count of approximate matches
     """
-    count = 0
-    k = len(pattern)
+    # Batch distances to every window of text
+    return int((window_hamming_distances(pattern, text) <= d).sum())
+
+def other_kmer_neighbors(text, codes, starts, k, d):
+    """
+    Neighbor codes of the k-mers of text holding symbols other than A, C, G, T (N, lower case, ...).
+    
+    Their d-neighborhoods must be made of A, C, G, T only, or some neighbor has no reverse complement
+    (the string version fails on it as well).
+    
+    Raises:
+        ValueError: If a neighbor of such a k-mer holds another symbol
+    """
+    other = STRICT_BASE_TO_CODE[as_byte_array(text)] == 255
+    neighbors = []
+    for start in starts.tolist():
+        # Within d >= k mismatches, every symbol can be substituted
+        if d < k:
+            kmer = kmer_text(text, start, k)
+            for neighbor in neighbor_strings(kmer, d):
+                if not is_nucleotide_string(neighbor):
+                    raise ValueError(f"No reverse complement for {neighbor!r}, a neighbor of {kmer!r}")
+        positions = np.flatnonzero(other[start:start + k]).tolist()
+        neighbors.append(other_neighbor_codes(int(codes[start]), positions, k, d))
+    return neighbors
+
+def mismatch_counts(text, k, d):
+    """
+    Count_d(Text, Pattern) for every k-mer Pattern within d mismatches of a k-mer of text,
+    in a single pass over the text.
+    
+    Args:
+        text: DNA sequence (str, bytes-like or uint8 array)
+        k (int): Length of k-mers (at most MAX_K)
+        d (int): Maximum mismatches allowed
+        
+    Returns:
+        tuple: (codes, counts) - k-mer codes with a non-zero count and their counts
+    """
+    codes, valid = masked_kmer_codes(text, k)
+    # k-mers holding other symbols only count for the patterns within d of their nucleotides
+    other_neighbors = other_kmer_neighbors(text, codes, np.flatnonzero(~valid), k, d)
+    codes = codes[valid]
+    
+    if k <= FREQUENCY_ARRAY_K_LIMIT:
+        # Dense array indexed by k-mer code
+        codes, counts = np.unique(codes, return_counts=True)
+        if len(codes):
+            frequencies = neighborhood_frequency_array(codes, counts, k, d).astype(np.int64)
+        else:
+            frequencies = np.zeros(4 ** k, dtype=np.int64)
+        for neighbors in other_neighbors:
+            frequencies[neighbors.astype(np.intp)] += 1
+        codes = np.flatnonzero(frequencies).astype(np.uint64)
+        return codes, frequencies[codes.astype(np.intp)]
     
+    # Larger k: count the neighbor codes of every text k-mer in a dictionary
+    freq_map = {}
+    for neighbors in chain((neighbor_codes(code, k, d) for code in codes.tolist()), other_neighbors):
+        for neighbor in neighbors.tolist():
+            freq_map[neighbor] = freq_map.get(neighbor, 0) + 1
+    clear_neighbor_cache()
+    codes = np.fromiter(freq_map.keys(), dtype=np.uint64, count=len(freq_map))
+    counts = np.fromiter(freq_map.values(), dtype=np.int64, count=len(freq_map))
+    return codes, counts
+
+def frequent_words_by_strings(text, k, d):
+    """
+    Same as frequent_words_with_mismatches_and_reverse_complements for k-mers too long for a code (k > MAX_K):
+    the neighbors of every k-mer of text are counted as strings in a dictionary, still in a single pass.
+    
+    Raises:
+        ValueError: If a neighbor holds a symbol other than A, C, G, T (it has no reverse complement)
+    """
+    freq_map = {}
     for i in range(len(text) - k + 1):
-        if hamming_distance(text[i:i + k], pattern) <= d:
-            count += 1
+        kmer = kmer_text(text, i, k)
+        for neighbor in neighbor_strings(kmer, d):
+            if not is_nucleotide_string(neighbor):
+                raise ValueError(f"No reverse complement for {neighbor!r}, a neighbor of {kmer!r}")
+            freq_map[neighbor] = freq_map.get(neighbor, 0) + 1
+    if not freq_map:
+        return []
     
-    return count
+    combined = {pattern: count + freq_map.get(reverse_complement(pattern), 0) for pattern, count in freq_map.items()}
+    max_count = max(combined.values())
+    return sorted(pattern for pattern, count in combined.items() if count == max_count)
 
 def frequent_words_with_mismatches_and_reverse_complements(text, k, d):
     """
@@ -44,56 +134,48 @@ def frequent_words_with_mismatches_and_reverse_complements(text, k, d):
     For each k-mer Pattern, we count:
     Count_d(Text, Pattern) + Count_d(Text, Pattern_rc)
     
+    Count_d is computed once for every pattern (mismatch_counts), then each pattern's
+    count is added to the count of its reverse complement, found by its integer code.
+    
     Args:
         text (str): DNA string to analyze
         k (int): Length of k-mers
         d (int): Maximum mismatches allowed
         
     Returns:
-        list: All k-mers with maximum combined count
+        list: All k-mers with maximum combined count, in lexicographic order
     """
-    freq_map = {}
+    if k > MAX_K:
+        return frequent_words_by_strings(text, k, d)
     
-    # Generate all possible k-mers
-    all_kmers = set()
-    for i in range(len(text) - k + 1):
-        pattern = text[i:i + k]
-        # Add both the pattern and all its neighbors to consider
-        neighborhood = neighbors(pattern, d)
-        all_kmers.update(neighborhood)
-    
-    # For each possible k-mer, calculate combined count
-    for pattern in all_kmers:
-        pattern_rc = reverse_complement(pattern)
-        
-        # Count approximate occurrences of pattern
-        count_pattern = approximate_pattern_count(text, pattern, d)
-        
-        # Count approximate occurrences of reverse complement
-        count_rc = approximate_pattern_count(text, pattern_rc, d)
-        
-        # Store the combined count
-        freq_map[pattern] = count_pattern + count_rc
+    codes, counts = mismatch_counts(text, k, d)
+    if len(codes) == 0:
+        return []
     
-    # Find maximum combined count
-    max_count = max(freq_map.values()) if freq_map else 0
+    # Sort by code to look reverse complements up with a binary search
+    order = np.argsort(codes)
+    codes, counts = codes[order], counts[order]
+    
+    # Count of the reverse complement (0 if it is not within d mismatches of any text k-mer)
+    rc_codes = reverse_complement_codes(codes, k)
+    rc_index = np.minimum(np.searchsorted(codes, rc_codes), len(codes) - 1)
+    rc_counts = np.where(codes[rc_index] == rc_codes, counts[rc_index], 0)
     
-    # Collect all k-mers with maximum count
-    frequent_patterns = []
-    for pattern in freq_map:
-        if freq_map[pattern] == max_count:
-            frequent_patterns.append(pattern)
+    # Find maximum combined count
+    combined = counts + rc_counts
+    best = codes[combined == combined.max()]
     
-    return frequent_patterns
+    return [decode_kmer(code, k) for code in best.tolist()]
 
-# Read input from file
-with open('data/part_2_data/sample_8.txt', 'r') as f:
-    lines = f.read().strip().split('\n')
-    text = lines[0]
-    k, d = map(int, lines[1].split())
+if __name__ == "__main__":
+    # Read input from file
+    with open('data/part_2_data/sample_8.txt', 'r') as f:
+        lines = f.read().strip().split('\n')
+        text = lines[0]
+        k, d = map(int, lines[1].split())
 
-# Find frequent words with mismatches and reverse complements
-result = frequent_words_with_mismatches_and_reverse_complements(text, k, d)
+    # Find frequent words with mismatches and reverse complements
+    result = frequent_words_with_mismatches_and_reverse_complements(text, k, d)
 
-# Print results
-print(' '.join(result))
+    # Print results
+    print(' '.join(result))
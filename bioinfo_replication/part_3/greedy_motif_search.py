@@ -1,12 +1,16 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from motif_profile import MotifProfile
+from parallel_motif_search import parallel_greedy_motif_search
+from pwm_scanner import most_probable_position
 from helpers import (
-    profile_most_probable_kmer,
-    create_profile_matrix, 
     score_motifs,
     format_motifs_output
 )
 
 
-def greedy_motif_search(dna_strings, k, t):
+def greedy_motif_search(dna_strings, k, t, workers=1):
     """
     Implement the GreedyMotifSearch algorithm.
     
@@ -27,10 +31,15 @@ def greedy_motif_search(dna_strings, k, t):
         dna_strings: List of DNA sequence strings
         k: Length of motifs to find
         t: Number of strings (should equal len(dna_strings))
+        workers: Number of processes; above 1, start positions are split across a
+                 process pool (same result, without the per-iteration trace)
     
     Returns:
         List of k-mers representing the best motif collection
     """
+    if workers > 1:
+        return parallel_greedy_motif_search(dna_strings, k, t, workers)
+    
     # Step 1: Initialize BestMotifs with first k-mer from each string
     best_motifs = []
     for dna_string in dna_strings:
@@ -54,21 +63,24 @@ def greedy_motif_search(dna_strings, k, t):
         motif1 = first_string[i:i + k]
         current_motifs = [motif1]
         
+        # Count matrix updated as motifs are appended (no rebuild from scratch)
+        profile = MotifProfile(k)
+        profile.add(motif1)
+        
         print(f"Trying Motif1 = '{motif1}' (position {i})")
         
         # Step 2b-e: Greedily find best k-mers for remaining strings
         for j in range(1, t):  # j goes from 1 to t-1 (strings 2 to t)
-            # Build profile from current motifs
-            profile = create_profile_matrix(current_motifs)
-            
-            # Find profile-most probable k-mer in string j+1
-            best_kmer = profile_most_probable_kmer(dna_strings[j], k, profile)
+            # Find profile-most probable k-mer in string j+1, using the profile of the current motifs
+            position = most_probable_position(dna_strings[j], profile.log_profile())
+            best_kmer = dna_strings[j][position:position + k] if position >= 0 else ""
             current_motifs.append(best_kmer)
+            profile.add(best_kmer)
             
             print(f"  Added Motif{j+1} = '{best_kmer}' from string {j+1}")
         
         # Step 2f-g: Score the current motif collection
-        current_score = score_motifs(current_motifs)
+        current_score = profile.score()
         print(f"  Final motifs: {current_motifs}")
         print(f"  Score: {current_score}")
         
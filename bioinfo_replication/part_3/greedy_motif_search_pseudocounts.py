@@ -10,15 +10,19 @@ Output: A collection of strings BestMotifs resulting from applying
         GreedyMotifSearch(Dna, k, t) with pseudocounts (+1 in count motifs matrix).
 """
 
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from motif_profile import MotifProfile
+from parallel_motif_search import parallel_greedy_motif_search
+from pwm_scanner import most_probable_position
 from helpers import (
-    profile_most_probable_kmer,
-    create_profile_matrix,
     score_motifs,
     format_motifs_output
 )
 
 
-def greedy_motif_search(dna, k, t):
+def greedy_motif_search(dna, k, t, workers=1):
     """
     Greedy algorithm to find motifs with pseudocounts.
     
@@ -33,10 +37,14 @@ def greedy_motif_search(dna, k, t):
         dna: List of DNA strings
         k: Length of motifs to find
         t: Number of strings (should equal len(dna))
+        workers: Number of processes splitting the start positions (same result)
     
     Returns:
         List of best motifs found
     """
+    if workers > 1:
+        return parallel_greedy_motif_search(dna, k, t, workers)
+    
     # Initialize BestMotifs with first k-mer from each string
     best_motifs = [string[:k] for string in dna]
     best_score = score_motifs(best_motifs)
@@ -46,17 +54,20 @@ def greedy_motif_search(dna, k, t):
         # Start with i-th k-mer from first string
         motifs = [dna[0][i:i + k]]
         
+        # Count matrix of the current motifs (with pseudocounts), updated in O(k) per motif
+        profile = MotifProfile(k)
+        profile.add(motifs[0])
+        
         # For each remaining string, find the most probable k-mer
         for j in range(1, t):
-            # Create profile from current motifs (with pseudocounts)
-            profile = create_profile_matrix(motifs)
-            
             # Find most probable k-mer in string j given the profile
-            most_probable = profile_most_probable_kmer(dna[j], k, profile)
+            position = most_probable_position(dna[j], profile.log_profile())
+            most_probable = dna[j][position:position + k] if position >= 0 else ""
             motifs.append(most_probable)
+            profile.add(most_probable)
         
         # Check if these motifs are better than current best
-        current_score = score_motifs(motifs)
+        current_score = profile.score()
         if current_score < best_score:
             best_motifs = motifs[:]
             best_score = current_score
@@ -1,6 +1,9 @@
 #calculating the difference/distance between a pattern and one of the t DNA strings, and minimize that distance for all : Median String
 
-from helpers import hamming_distance
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hamming_kernel import min_window_distance
 
 
 def distance_between_pattern_and_strings(pattern, dna_strings):
@@ -17,26 +20,12 @@ def distance_between_pattern_and_strings(pattern, dna_strings):
     Returns:
         Total distance (sum of minimum distances from pattern to each DNA string)
     """
-    k = len(pattern)
     total_distance = 0
     
     # For each DNA string
     for text in dna_strings:
-        min_hamming_distance = float('inf')  # Initialize to infinity
-        
-        # Check every k-mer in this DNA string
-        for i in range(len(text) - k + 1):
-            kmer = text[i:i + k]
-            
-            # Calculate Hamming distance between pattern and this k-mer
-            current_distance = hamming_distance(pattern, kmer)
-            
-            # Keep track of minimum distance for this DNA string
-            if current_distance < min_hamming_distance:
-                min_hamming_distance = current_distance
-        
-        # Add the minimum distance to total
-        total_distance += min_hamming_distance
+        # Minimum over the batch of distances to every k-mer of this DNA string
+        total_distance += min_window_distance(pattern, text)
     
     return total_distance
 
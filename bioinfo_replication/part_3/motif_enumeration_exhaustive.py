@@ -3,8 +3,16 @@
 
 import sys
 import os
-sys.path.append('part_2')
-from helpers import hamming_distance, neighbors
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from dna_encoding import MAX_K, decode_kmer, is_nucleotide_string
+from hamming_kernel import window_hamming_distances
+from kmer_counter import split_kmers
+from neighborhood import (NEIGHBORHOOD_BITMAP_K_LIMIT, clear_neighbor_cache, neighbor_codes, neighbor_strings,
+                          neighborhood_bitmap, neighborhood_code_array)
 
 def get_all_kmers(dna_string, k):
     """Get all k-mers from a DNA string."""
@@ -15,35 +23,106 @@ def get_all_kmers(dna_string, k):
 
 def appears_in_dna_with_mismatches(pattern, dna_string, d):
     """Check if pattern appears in dna_string with at most d mismatches."""
-    k = len(pattern)
-    for i in range(len(dna_string) - k + 1):
-        kmer = dna_string[i:i + k]
-        if hamming_distance(pattern, kmer) <= d:
-            return True
-    return False
+    return bool((window_hamming_distances(pattern, dna_string) <= d).any())
+
+def string_neighborhood(dna_string, k, d):
+    """
+    d-neighborhood of all k-mers of one DNA string: bitmap over the 4^k codes for small k,
+    sorted code array otherwise.
+    """
+    if k <= NEIGHBORHOOD_BITMAP_K_LIMIT:
+        return neighborhood_bitmap(dna_string, k, d)
+    return neighborhood_code_array(dna_string, k, d)
 
-def motif_enumeration(dna_list, k, d):
-    """Find all (k,d)-motifs in DNA strings."""
+def other_motifs(dna_list, k, d):
+    """
+    (k,d)-motifs holding symbols other than A, C, G, T (N, lower case, ...): neighbors of the
+    k-mers holding such symbols, tested against every DNA string. k-mers longer than a code
+    all go through here, the others only give motifs the neighborhoods cannot hold.
+    """
+    candidates = set()
+    for dna_string in dna_list:
+        _, _, others = split_kmers(dna_string, k)
+        for kmer in others:
+            candidates.update(neighbor_strings(kmer, d))
+    if k <= MAX_K:
+        candidates = {pattern for pattern in candidates if not is_nucleotide_string(pattern)}
+    
+    return [pattern for pattern in candidates
+            if all(appears_in_dna_with_mismatches(pattern, dna_string, d) for dna_string in dna_list)]
+
+def motif_enumeration(dna_list, k, d, workers=1):
+    """
+    Find all (k,d)-motifs in DNA strings.
+    
+    A (k,d)-motif is in the d-neighborhood of every string, so the neighborhood of each
+    string is built once and the neighborhoods are intersected.
+    
+    Args:
+        dna_list: List of DNA strings
+        k: Length of motifs
+        d: Maximum number of mismatches
+        workers: Number of processes building string neighborhoods in parallel
+    
+    Returns:
+        list: (k,d)-motifs in lexicographic order
+    """
+    if not dna_list:
+        return []
+    if k > MAX_K:
+        return sorted(other_motifs(dna_list, k, d))
+    
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(dna_list))) as executor:
+            neighborhoods = executor.map(string_neighborhood, dna_list,
+                                         [k] * len(dna_list), [d] * len(dna_list))
+            motifs = next(neighborhoods)
+            for neighborhood in neighborhoods:
+                motifs = intersect_neighborhoods(motifs, neighborhood)
+    else:
+        motifs = string_neighborhood(dna_list[0], k, d)
+        for dna_string in dna_list[1:]:
+            # Nothing left to intersect: no need to build the other neighborhoods
+            if not (motifs.any() if motifs.dtype == bool else motifs.size):
+                break
+            motifs = intersect_neighborhoods(motifs, string_neighborhood(dna_string, k, d))
+    
+    codes = np.flatnonzero(motifs) if motifs.dtype == bool else motifs
+    return sorted([decode_kmer(code, k) for code in codes.tolist()] + other_motifs(dna_list, k, d))
+
+def intersect_neighborhoods(first, second):
+    """Intersection of two neighborhoods from string_neighborhood."""
+    if first.dtype == bool:
+        return first & second
+    return np.intersect1d(first, second, assume_unique=True)
+
+def motif_enumeration_by_scanning(dna_list, k, d):
+    """
+    Find all (k,d)-motifs by testing every neighbor of every k-mer against all DNA strings.
+    """
     patterns = set()
+    checked = set()  # neighbors already tested against all DNA strings
+    
+    def test(pattern):
+        # Check if this pattern appears in ALL DNA strings with at most d mismatches
+        if all(appears_in_dna_with_mismatches(pattern, dna, d) for dna in dna_list):
+            patterns.add(pattern)
     
-    # For each k-mer in each DNA string
+    # For each k-mer in each DNA string (as its 2-bit code, or as a string if it holds other symbols)
     for dna_string in dna_list:
-        kmers = get_all_kmers(dna_string, k)
-        for kmer in kmers:
-            # Generate all neighbors within d mismatches
-            pattern_neighbors = neighbors(kmer, d)
-            
-            # Check each neighbor
-            for pattern in pattern_neighbors:
-                # Check if this pattern appears in ALL DNA strings with at most d mismatches
-                appears_in_all = True
-                for dna in dna_list:
-                    if not appears_in_dna_with_mismatches(pattern, dna, d):
-                        appears_in_all = False
-                        break
-                
-                if appears_in_all:
-                    patterns.add(pattern)
+        _, codes, others = split_kmers(dna_string, k)
+        for code in codes.tolist():
+            # Generate all neighbors within d mismatches (cached for repeated k-mers)
+            for neighbor in neighbor_codes(code, k, d).tolist():
+                if neighbor not in checked:
+                    checked.add(neighbor)
+                    test(decode_kmer(neighbor, k))
+        for kmer in others:
+            for neighbor in neighbor_strings(kmer, d):
+                if neighbor not in checked:
+                    checked.add(neighbor)
+                    test(neighbor)
+    clear_neighbor_cache()
     
     return sorted(list(patterns))
 
@@ -1,3 +1,10 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hamming_kernel import min_window_distance
+from median_search import MEDIAN_TABLE_K_LIMIT, median_string_branch_and_bound, median_strings
+
+
 def hamming_distance(str1, str2):
     """
     Calculate the Hamming distance between two strings of equal length.
@@ -11,16 +18,8 @@ def distance_pattern_to_string(pattern, dna_string):
     Find the minimum Hamming distance between a pattern and any k-mer in a DNA string.
     This represents how "close" the pattern is to the best match in that string.
     """
-    k = len(pattern)
-    min_distance = float('inf')
-    
-    # Check every possible k-mer in the DNA string
-    for i in range(len(dna_string) - k + 1):
-        kmer = dna_string[i:i + k]
-        distance = hamming_distance(pattern, kmer)
-        min_distance = min(min_distance, distance)
-    
-    return min_distance
+    # Distances to every k-mer of the DNA string in one batch (XOR + popcount on 2-bit codes)
+    return min_window_distance(pattern, dna_string)
 
 
 def distance_pattern_to_dna(pattern, dna_strings):
@@ -60,6 +59,17 @@ def median_string(k, dna_strings):
     """
     Find the k-mer that minimizes the total distance to all DNA strings.
     This is the "median string" - the most representative motif.
+    Same result as median_string_brute_force: small k use the table of distances
+    of all k-mers at once, larger k prune whole groups of k-mers with branch and bound.
+    """
+    if k <= MEDIAN_TABLE_K_LIMIT and dna_strings and all(len(dna_string) >= k for dna_string in dna_strings):
+        return median_strings(k, dna_strings)[0]
+    return median_string_branch_and_bound(k, dna_strings)
+
+
+def median_string_brute_force(k, dna_strings):
+    """
+    Median string by scoring every one of the 4^k possible k-mers.
     """
     min_distance = float('inf')
     best_pattern = ""
@@ -0,0 +1,46 @@
+#Expectation-maximization motif search
+#starts from the GreedyMotifSearch motifs and refines the profile with soft (posterior-weighted)
+#counts over every window, instead of restarting a randomized search many times
+
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from em_motif_search import expectation_maximization
+from parallel_motif_search import parallel_greedy_motif_search
+from helpers import (
+    score_motifs,
+    format_motifs_output
+)
+
+
+def main():
+    """
+    Read input and run the EM motif search seeded by the greedy motifs.
+    """
+    # Read input file
+    with open('data/part_4_data/sample_1.txt', 'r') as f:
+        lines = [line.strip() for line in f.readlines() if line.strip()]
+
+    # Parse first line: k and t
+    k, t = map(int, lines[0].split())
+
+    # Parse second line: DNA strings
+    dna_strings = lines[1].split()
+
+    # Verify we have the expected number of DNA strings
+    if len(dna_strings) != t:
+        print(f"Error: Expected {t} DNA strings, got {len(dna_strings)}")
+        return
+
+    greedy_motifs = parallel_greedy_motif_search(dna_strings, k, t, workers=1)
+    result = expectation_maximization(dna_strings, k, greedy_motifs)
+    print(f"Greedy score {score_motifs(greedy_motifs)}, EM score {score_motifs(result['motifs'])} "
+          f"after {result['iterations']} iterations", file=sys.stderr)
+
+    # Output result
+    print(format_motifs_output(result['motifs']))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,12 @@
-import random
+import os
 import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parallel_motif_search import anytime_motif_search, default_workers
+
+# Seconds of sampling when no budget is given on the command line
+DEFAULT_TIME_BUDGET = 10.0
+# Stop after this many chains in a row without improving the best score
+DEFAULT_PATIENCE = 50
 
 def read_input():
     """Read input from file or stdin"""
@@ -20,49 +27,6 @@ def read_input():
     
     return k, t, N, dna
 
-def create_profile(motifs, k):
-    """Create profile with pseudocounts - simplified"""
-    profile = {'A': [1]*k, 'C': [1]*k, 'G': [1]*k, 'T': [1]*k}
-    
-    for motif in motifs:
-        for i, nuc in enumerate(motif):
-            profile[nuc][i] += 1
-    
-    total = len(motifs) + 4
-    for nuc in profile:
-        for i in range(k):
-            profile[nuc][i] /= total
-    
-    return profile
-
-def random_kmer(text, k, profile):
-    """Simple random k-mer selection"""
-    n = len(text) - k + 1
-    probs = []
-    
-    for i in range(n):
-        kmer = text[i:i+k]
-        p = 1.0
-        for j, nuc in enumerate(kmer):
-            p *= profile[nuc][j]
-        probs.append(p)
-    
-    # Simple weighted selection
-    total = sum(probs)
-    if total == 0:
-        idx = random.randint(0, n-1)
-    else:
-        r = random.random() * total
-        cumsum = 0
-        idx = 0
-        for i, p in enumerate(probs):
-            cumsum += p
-            if r <= cumsum:
-                idx = i
-                break
-    
-    return text[idx:idx+k]
-
 def score(motifs):
     """Simple scoring"""
     if not motifs:
@@ -80,65 +44,29 @@ def score(motifs):
     
     return total
 
-def gibbs_minimal(dna, k, t, max_iter=10):
-    """Minimal Gibbs sampler - VERY limited iterations"""
-    # Random initial motifs
-    motifs = []
-    for seq in dna:
-        start = random.randint(0, max(0, len(seq) - k))
-        motifs.append(seq[start:start+k])
-    
-    best_motifs = motifs[:]
-    best_score = score(best_motifs)
-    
-    # Very few iterations
-    for _ in range(max_iter):
-        i = random.randint(0, t-1)
-        
-        # Profile without motif i
-        reduced = motifs[:i] + motifs[i+1:]
-        profile = create_profile(reduced, k)
-        
-        # New motif
-        motifs[i] = random_kmer(dna[i], k, profile)
-        
-        # Check improvement
-        current_score = score(motifs)
-        if current_score < best_score:
-            best_score = current_score
-            best_motifs = motifs[:]
-    
-    return best_motifs
-
 def main():
     print("Reading input...", file=sys.stderr)
     k, t, N, dna = read_input()
     
     print(f"k={k}, t={t}, sequences loaded", file=sys.stderr)
     
-    # EXTREMELY limited parameters for speed
-    if k >= 12:
-        iterations = 2000   # Only 5 iterations!
-        runs = 20      # Only 2 runs!
-    else:
-        iterations = 2000
-        runs = 20
-    
-    print(f"Using {runs} runs with {iterations} iterations each", file=sys.stderr)
-    
-    best_overall = None
-    best_score_overall = 1000
-    
-    for run in range(runs):
-        print(f"Run {run+1}", file=sys.stderr)
-        
-        result = gibbs_minimal(dna, k, t, iterations)
-        current_score = score(result)
-        
-        if current_score < best_score_overall:
-            best_score_overall = current_score
-            best_overall = result
-            print(f"Score: {current_score}", file=sys.stderr)
+    # Anytime search: chains run until the time budget is spent or the best score stops improving
+    # (usage: python gibbs_sampler.py input.txt [seconds])
+    time_budget = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_TIME_BUDGET
+    workers = default_workers()
+    print(f"Sampling for up to {time_budget:g} s ({workers} processes)", file=sys.stderr)
+    
+    last_reported = None
+    def report(progress):
+        nonlocal last_reported
+        if progress['best_score'] != last_reported:
+            last_reported = progress['best_score']
+            print(f"{progress['elapsed']:.1f} s, {progress['runs']} chains, "
+                  f"{progress['iterations_per_second']:.0f} iterations/s, score: {progress['best_score']}", file=sys.stderr)
+    
+    best_overall = anytime_motif_search(dna, k, t, 'gibbs', time_budget=time_budget, patience=DEFAULT_PATIENCE,
+                                        workers=workers, on_progress=report)
+    best_score_overall = score(best_overall)
     
     print(f"Done! Final score: {best_score_overall}", file=sys.stderr)
     print(" ".join(best_overall))
@@ -1,3 +1,9 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pwm_scanner import log_profile, most_probable_position
+
+
 def profile_probability(kmer, profile):
     """
     Calculate the probability of a k-mer given a profile matrix.
@@ -31,22 +37,12 @@ def profile_most_probable_kmer(text, k, profile):
     Find the k-mer in text with the highest probability according to the profile.
     If there are ties, return the first occurrence.
     """
-    max_probability = -1.0
-    most_probable_kmer = ""
+    # Log-probabilities of all k-mers in one vectorized pass (no underflow for long k-mers)
+    position = most_probable_position(text, log_profile(profile, k))
+    if position < 0:
+        return ""
     
-    # Check every possible k-mer in the text
-    for i in range(len(text) - k + 1):
-        kmer = text[i:i + k]
-        probability = profile_probability(kmer, profile)
-        
-        # Keep track of the highest probability k-mer
-        # Note: we only update if probability is STRICTLY greater
-        # This ensures we get the first occurrence in case of ties
-        if probability > max_probability:
-            max_probability = probability
-            most_probable_kmer = kmer
-    
-    return most_probable_kmer
+    return text[position:position + k]
 
 
 def create_profile_matrix(motifs):
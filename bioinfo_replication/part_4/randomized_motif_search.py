@@ -3,9 +3,13 @@
 
 
 import random
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from motif_profile import MotifProfile
+from parallel_motif_search import anytime_motif_search, parallel_randomized_motif_search
+from pwm_scanner import profile_most_probable_kmers
 from helpers import (
-    profile_most_probable_kmer,
-    create_profile_matrix,
     score_motifs,
     format_motifs_output
 )
@@ -44,27 +48,24 @@ def randomized_motif_search(dna_strings, k, t):
             motifs.append(dna_strings[i][start_pos:start_pos + k])
     
     best_motifs = motifs[:]
-    best_score = score_motifs(best_motifs)
+    profile = MotifProfile.from_motifs(motifs, k)
+    best_score = profile.score()
     
     # Step 2: Iteratively improve motifs
     while True:
-        # Create profile matrix from current motifs (with pseudocounts)
-        profile = create_profile_matrix(motifs)
-        
-        # Find most probable k-mer in each DNA string
-        new_motifs = []
-        for i in range(t):
-            most_probable = profile_most_probable_kmer(dna_strings[i], k, profile)
-            new_motifs.append(most_probable)
+        # Find most probable k-mer in each DNA string, using the profile of the current motifs
+        new_motifs = profile_most_probable_kmers(dna_strings[:t], k, profile.profile())
         
         # Check if new motifs are better
-        new_score = score_motifs(new_motifs)
+        new_profile = MotifProfile.from_motifs(new_motifs, k)
+        new_score = new_profile.score()
         
         if new_score < best_score:
             # Better motifs found, continue iteration
             motifs = new_motifs[:]
             best_motifs = new_motifs[:]
             best_score = new_score
+            profile = new_profile
         else:
             # No improvement, algorithm has converged
             break
@@ -72,7 +73,7 @@ def randomized_motif_search(dna_strings, k, t):
     return best_motifs
 
 
-def run_randomized_motif_search_multiple_times(dna_strings, k, t, num_runs=1000):
+def run_randomized_motif_search_multiple_times(dna_strings, k, t, num_runs=1000, seed=None, workers=1, on_run=None):
     """
     Run RandomizedMotifSearch multiple times and return the best result.
     
@@ -81,10 +82,17 @@ def run_randomized_motif_search_multiple_times(dna_strings, k, t, num_runs=1000)
         k: Length of motifs to find
         t: Number of DNA strings
         num_runs: Number of times to run the algorithm (default: 1000)
+        seed: Master seed; when given (or with workers > 1), every run draws from its own
+              stream derived from it, and the result only depends on the seed, not on workers
+        workers: Number of processes sharing the runs
+        on_run: Optional callback on_run(run, score, best_score) as runs finish
     
     Returns:
         Best motifs found across all runs
     """
+    if seed is not None or workers > 1:
+        return parallel_randomized_motif_search(dna_strings, k, t, num_runs, seed, workers, on_run)
+    
     best_motifs = None
     best_score = float('inf')
     
@@ -104,7 +112,8 @@ def run_randomized_motif_search_multiple_times(dna_strings, k, t, num_runs=1000)
 
 def main():
     """
-    Read input and run RandomizedMotifSearch 1000 times.
+    Read input and run RandomizedMotifSearch 1000 times,
+    or for a number of seconds given on the command line.
     """
     # Set random seed for reproducibility (optional)
     # random.seed(42)
@@ -124,9 +133,15 @@ def main():
         print(f"Error: Expected {t} DNA strings, got {len(dna_strings)}")
         return
     
-    # Run RandomizedMotifSearch 1000 times
-    print("Running RandomizedMotifSearch 1000 times...", file=__import__('sys').stderr)
-    best_motifs = run_randomized_motif_search_multiple_times(dna_strings, k, t, 1000)
+    if len(sys.argv) > 1:
+        # Anytime mode: restart until the time budget (seconds) is spent
+        time_budget = float(sys.argv[1])
+        print(f"Running RandomizedMotifSearch for {time_budget:g} s...", file=sys.stderr)
+        best_motifs = anytime_motif_search(dna_strings, k, t, 'randomized', time_budget=time_budget)
+    else:
+        # Run RandomizedMotifSearch 1000 times
+        print("Running RandomizedMotifSearch 1000 times...", file=sys.stderr)
+        best_motifs = run_randomized_motif_search_multiple_times(dna_strings, k, t, 1000)
     
     # Output result
     result = format_motifs_output(best_motifs)
@@ -0,0 +1,203 @@
+#Position weight matrix scanner for profile-most-probable k-mers
+#the profile is turned into log-probabilities once, then the score of every window of a sequence is
+#the sum over positions j of log_profile[base at i + j, j]: one gather of the encoded bases per position,
+#accumulated for all windows at once. Summing logs instead of multiplying probabilities never underflows,
+#so long motifs keep distinct scores instead of all rounding to 0
+
+#windows already packed as 2-bit k-mer codes (dna_encoding, k <= 32) are scored one byte at a time:
+#the log-probabilities of every group of 4 positions are summed once into a 256-entry table indexed by
+#the byte of the code holding them, so a window costs k / 4 lookups instead of k
+
+import numpy as np
+
+from dna_encoding import STRICT_BASE_TO_CODE, as_byte_array
+
+# Row of the log-profile used for symbols other than upper-case A, C, G, T (probability 0, like
+# profile_probability, which only knows the upper-case rows)
+INVALID_ROW = 4
+# Scores this close (relative) to the best one are rounding-level ties
+TIE_TOLERANCE = 1e-12
+# Positions covered by one lookup table when scoring k-mer codes (4 positions = one byte of the code)
+TABLE_POSITIONS = 4
+
+
+def log_profile(profile, k=None):
+    """
+    Log-probabilities of a profile matrix.
+
+    Args:
+        profile: Profile matrix as 4 rows (A, C, G, T) of per-position probabilities
+        k: Number of positions to keep (default: all)
+
+    Returns:
+        np.ndarray: (5, k) float array, row INVALID_ROW being -inf
+    """
+    probabilities = np.asarray(profile, dtype=np.float64)
+    if k is not None:
+        probabilities = probabilities[:, :k]
+
+    log_probabilities = np.full((5, probabilities.shape[1]), -np.inf)
+    with np.errstate(divide='ignore'):
+        log_probabilities[:4] = np.log(probabilities)
+    return log_probabilities
+
+
+def encode_for_scan(sequence):
+    """Codes of a sequence for scanning: 0-3 for A, C, G, T and INVALID_ROW for anything else (lower case included)."""
+    codes = STRICT_BASE_TO_CODE[as_byte_array(sequence)]
+    codes[codes == 255] = INVALID_ROW
+    return codes
+
+
+def window_log_scores(sequence, log_probabilities):
+    """
+    Log-probability of every window of a sequence.
+
+    Args:
+        sequence: DNA sequence (str, bytes-like or uint8 array)
+        log_probabilities: Array from log_profile
+
+    Returns:
+        np.ndarray: Array of length len(sequence) - k + 1 (empty if the sequence is shorter than k)
+    """
+    return encoded_window_log_scores(encode_for_scan(sequence), log_probabilities)
+
+
+def encoded_window_log_scores(codes, log_probabilities):
+    """Same as window_log_scores, for a sequence already encoded with encode_for_scan."""
+    k = log_probabilities.shape[1]
+    window_count = len(codes) - k + 1
+    if window_count <= 0:
+        return np.empty(0)
+
+    # Positions are added in order, so equal k-mers get bitwise equal scores
+    scores = np.zeros(window_count)
+    for j in range(k):
+        scores += log_probabilities[codes[j:j + window_count], j]
+    return scores
+
+
+def kmer_log_tables(log_probabilities):
+    """
+    Lookup tables scoring the packed k-mer codes of length k = log_probabilities.shape[1].
+
+    Returns:
+        list: (shift, mask, table) per group of up to TABLE_POSITIONS positions, last positions first:
+              table[(code >> shift) & mask] is the log-probability of those positions
+    """
+    k = log_probabilities.shape[1]
+    tables = []
+    for end in range(k, 0, -TABLE_POSITIONS):
+        start = max(0, end - TABLE_POSITIONS)
+        table = log_probabilities[:4, start]
+        for j in range(start + 1, end):
+            # First position in the most significant bits, like the k-mer codes
+            table = (table[:, None] + log_probabilities[:4, j]).reshape(-1)
+        tables.append((np.uint64(2 * (k - end)), np.uint64(4 ** (end - start) - 1), table))
+    return tables
+
+
+def kmer_code_log_scores(codes, valid, log_probabilities):
+    """
+    Same as window_log_scores, for windows given as masked k-mer codes (see dna_encoding.masked_kmer_codes).
+
+    Args:
+        codes: uint64 code of every window
+        valid: Windows made only of upper-case A, C, G, T (the others score -inf)
+        log_probabilities: Array from log_profile, with k <= 32 columns
+
+    Returns:
+        np.ndarray: Log-probability of every window
+    """
+    scores = np.zeros(len(codes))
+    for shift, mask, table in kmer_log_tables(log_probabilities):
+        scores += table[((codes >> shift) & mask).astype(np.intp)]
+    scores[~valid] = -np.inf
+    return scores
+
+
+def batch_window_log_scores(sequences, log_probabilities):
+    """
+    Log-probability of every window of several sequences, in one pass.
+
+    Sequences are padded to the same length with invalid symbols, so windows
+    running past the end of a shorter sequence score -inf.
+
+    Returns:
+        np.ndarray: (len(sequences), longest length - k + 1) array
+    """
+    return padded_window_log_scores(encode_padded(sequences), log_probabilities)
+
+
+def encode_padded(sequences):
+    """
+    Codes of several sequences (see encode_for_scan) as the rows of one array,
+    padded with INVALID_ROW up to the longest sequence.
+    """
+    longest = max((len(sequence) for sequence in sequences), default=0)
+    codes = np.full((len(sequences), longest), INVALID_ROW, dtype=np.uint8)
+    for row, sequence in enumerate(sequences):
+        sequence_codes = encode_for_scan(sequence)
+        codes[row, :len(sequence_codes)] = sequence_codes
+    return codes
+
+
+def padded_window_log_scores(codes, log_probabilities):
+    """Same as batch_window_log_scores, for sequences already encoded with encode_padded."""
+    k = log_probabilities.shape[1]
+    window_count = max(codes.shape[1] - k + 1, 0)
+
+    scores = np.zeros((codes.shape[0], window_count))
+    for j in range(k):
+        scores += log_probabilities[codes[:, j:j + window_count], j]
+    return scores
+
+
+def first_best(scores):
+    """
+    Index of the first maximum along the last axis of an array of log scores.
+    k-mers with equal probabilities can get log scores differing in the last bits
+    (the same factors summed in another order), so near-equal scores count as ties.
+    """
+    best = scores.max(axis=-1, keepdims=True)
+    # If every score is -inf (probability 0), the threshold is -inf too and the first window wins
+    threshold = best - TIE_TOLERANCE * np.maximum(1.0, np.abs(best))
+    return np.argmax(scores >= threshold, axis=-1)
+
+
+def most_probable_position(sequence, log_probabilities):
+    """
+    Start of the most probable window of a sequence (the first one in case of ties), -1 if there is none.
+    """
+    scores = window_log_scores(sequence, log_probabilities)
+    if scores.size == 0:
+        return -1
+    return int(first_best(scores))
+
+
+def batch_most_probable_positions(sequences, log_probabilities):
+    """
+    Start of the most probable window of each sequence (first occurrence in case of ties),
+    -1 for sequences shorter than the profile.
+    """
+    k = log_probabilities.shape[1]
+    scores = batch_window_log_scores(sequences, log_probabilities)
+    if scores.shape[1] == 0:
+        return [-1] * len(sequences)
+
+    positions = first_best(scores).tolist()
+    return [
+        position if len(sequence) >= k else -1
+        for position, sequence in zip(positions, sequences)
+    ]
+
+
+def profile_most_probable_kmers(sequences, k, profile):
+    """
+    Profile-most-probable k-mer of each sequence ("" for sequences shorter than k).
+    """
+    positions = batch_most_probable_positions(sequences, log_profile(profile, k))
+    return [
+        sequence[position:position + k] if position >= 0 else ""
+        for position, sequence in zip(positions, sequences)
+    ]
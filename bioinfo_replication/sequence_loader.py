@@ -0,0 +1,218 @@
+#Memory-mapped genome loader shared by the challenge scripts
+#instead of open().read().strip() (whole genome as a Python str, plus copies from slicing),
+#the file is memory-mapped and exposed as a uint8 NumPy view of its ASCII bytes:
+#the OS pages the genome in on demand, so multi-gigabyte inputs do not need to fit in Python objects
+
+#plain files holding the sequence on one line are viewed in place (zero copy);
+#FASTA files and wrapped sequences are stripped of headers/newlines once, into a cache file
+#kept in the user cache directory (the data directory is never written to)
+
+#challenge inputs holding a genome line next to parameter lines (pattern, k, d, ...) are read with
+#map_lines: every line is a view of the mapped file, so the genome line is used in place as well
+
+import hashlib
+import mmap
+import os
+import tempfile
+
+import numpy as np
+
+from dna_encoding import as_byte_array
+
+STRIPPED_SUFFIX = '.stripped'
+# Stripped copies go to $XDG_CACHE_HOME/bioinfo_replication (~/.cache by default)
+CACHE_DIRECTORY_NAME = 'bioinfo_replication'
+CHUNK_SIZE = 1 << 24  # 16 MB blocks when stripping a FASTA file
+_WHITESPACE = b' \t\r\n'
+_WHITESPACE_CODES = np.frombuffer(_WHITESPACE, dtype=np.uint8)
+
+
+def _map_file(path):
+    """Memory-map a whole file read-only."""
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _sequence_bounds(mapped):
+    """
+    Return (start, end) of the sequence if the mapped file holds it on one line
+    (no FASTA header, no newline inside), or None otherwise.
+    """
+    start, end = 0, len(mapped)
+    while end > start and mapped[end - 1] in _WHITESPACE:
+        end -= 1
+    while start < end and mapped[start] in _WHITESPACE:
+        start += 1
+
+    if mapped[start:start + 1] == b'>' or mapped.find(b'\n', start, end) != -1:
+        return None
+    return start, end
+
+
+def cache_directory():
+    """
+    Directory of the stripped genome copies: the user cache directory if it can be created,
+    else a directory in the system temporary directory.
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    for directory in (os.path.join(base, CACHE_DIRECTORY_NAME),
+                      os.path.join(tempfile.gettempdir(), CACHE_DIRECTORY_NAME)):
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            continue
+        if os.access(directory, os.W_OK):
+            return directory
+    raise OSError("No writable cache directory for stripped genomes")
+
+
+def stripped_cache_path(path, directory=None):
+    """Path of the stripped copy of a genome file (one file per absolute source path)."""
+    if directory is None:
+        directory = cache_directory()
+    absolute_path = os.path.abspath(path)
+    digest = hashlib.sha1(absolute_path.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(directory, f"{os.path.basename(absolute_path)}.{digest}{STRIPPED_SUFFIX}")
+
+
+def _strip_to_cache(path, cache_path):
+    """
+    Write the sequence of a FASTA/wrapped file without headers and whitespace.
+    The file is processed in CHUNK_SIZE blocks, so even a single huge line never has to fit in memory.
+    """
+    temporary_path = cache_path + '.tmp'
+    at_line_start = True
+    in_header = False
+
+    with open(path, 'rb') as source, open(temporary_path, 'wb') as target:
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+
+            data = np.frombuffer(chunk, dtype=np.uint8)
+            keep = ~np.isin(data, _WHITESPACE_CODES)
+            newlines = np.flatnonzero(data == ord('\n'))
+
+            # A header carried over from the previous chunk runs until the first newline
+            if in_header:
+                header_end = newlines[0] if newlines.size else len(data)
+                keep[:header_end] = False
+
+            # Header lines starting in this chunk
+            line_starts = newlines + 1
+            if at_line_start:
+                line_starts = np.concatenate(([0], line_starts))
+            line_starts = line_starts[line_starts < len(data)]
+
+            in_header = in_header and newlines.size == 0
+            for header_start in line_starts[data[line_starts] == ord('>')]:
+                following = newlines[np.searchsorted(newlines, header_start):]
+                header_end = following[0] if following.size else len(data)
+                keep[header_start:header_end] = False
+                in_header = following.size == 0
+
+            at_line_start = data[-1] == ord('\n')
+            target.write(data[keep].tobytes())
+
+    os.replace(temporary_path, cache_path)
+
+
+def load_genome(path, cache_dir=None):
+    """
+    Memory-map a plain or FASTA genome file.
+
+    Args:
+        path: Path of a file holding one sequence, either on a single line,
+              wrapped over several lines, or in FASTA format (all records are concatenated)
+        cache_dir: Directory of the stripped copy of FASTA/wrapped files (default: cache_directory())
+
+    Returns:
+        np.ndarray: Read-only uint8 view of the sequence's ASCII characters (A, C, G, T)
+    """
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=np.uint8)
+
+    mapped = _map_file(path)
+    bounds = _sequence_bounds(mapped)
+
+    if bounds is not None:
+        start, end = bounds
+        return np.frombuffer(mapped, dtype=np.uint8)[start:end]
+
+    # Strip headers and newlines once, reuse the stripped copy while it is up to date
+    cache_path = stripped_cache_path(path, cache_dir)
+    if not os.path.exists(cache_path) or os.path.getmtime(cache_path) < os.path.getmtime(path):
+        _strip_to_cache(path, cache_path)
+
+    if os.path.getsize(cache_path) == 0:
+        return np.empty(0, dtype=np.uint8)
+    return np.frombuffer(_map_file(cache_path), dtype=np.uint8)
+
+
+def map_lines(path):
+    """
+    Memory-map a text input file and view each non-empty line in place.
+
+    Args:
+        path: Path of the input file (e.g. a genome line followed by k, L, t lines)
+
+    Returns:
+        list: Read-only uint8 views of the lines, without surrounding whitespace
+    """
+    if os.path.getsize(path) == 0:
+        return []
+
+    data = np.frombuffer(_map_file(path), dtype=np.uint8)
+    line_ends = np.concatenate((np.flatnonzero(data == ord('\n')), [len(data)]))
+
+    lines = []
+    start = 0
+    for end in line_ends.tolist():
+        line_start, line_end = start, end
+        while line_end > line_start and data[line_end - 1] in _WHITESPACE_CODES:
+            line_end -= 1
+        while line_start < line_end and data[line_start] in _WHITESPACE_CODES:
+            line_start += 1
+        if line_end > line_start:
+            lines.append(data[line_start:line_end])
+        start = end + 1
+    return lines
+
+
+def line_text(line):
+    """Decode a short line from map_lines (a pattern or a parameter) into a str."""
+    return line.tobytes().decode('ascii')
+
+
+def find_pattern(sequence, pattern):
+    """
+    Find all starting positions of pattern in a sequence without slicing it into strings.
+
+    Candidate positions matching the first symbol are filtered symbol by symbol
+    with vectorized comparisons on the byte view.
+
+    Args:
+        sequence: str, bytes-like or uint8 array (e.g. the result of load_genome)
+        pattern: Pattern to search for
+
+    Returns:
+        np.ndarray: Sorted starting positions (0-indexed)
+    """
+    data = as_byte_array(sequence)
+    symbols = as_byte_array(pattern)
+    last_start = len(data) - len(symbols)
+
+    if last_start < 0:
+        return np.empty(0, dtype=np.intp)
+    # The empty pattern occurs at every position, like the slice comparison
+    if len(symbols) == 0:
+        return np.arange(last_start + 1)
+
+    candidates = np.flatnonzero(data[:last_start + 1] == symbols[0])
+    for offset in range(1, len(symbols)):
+        if candidates.size == 0:
+            break
+        candidates = candidates[data[candidates + offset] == symbols[offset]]
+
+    return candidates
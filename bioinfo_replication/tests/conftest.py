@@ -0,0 +1,43 @@
+#Shared test setup
+#the shared modules of bioinfo_replication are imported by name, like the part scripts do;
+#part scripts are loaded from their file, since several parts have their own helpers.py
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def _load_script(relative_path):
+    """Import a part script (e.g. 'part_2/helpers.py') as a module of its own."""
+    path = os.path.join(ROOT, relative_path)
+    name = 'script_' + relative_path[:-len('.py')].replace('/', '_')
+    if name in sys.modules:
+        return sys.modules[name]
+
+    # The script's own directory comes first, so its 'from helpers import ...' finds the right helpers
+    saved_path = sys.path[:]
+    saved_helpers = sys.modules.pop('helpers', None)
+    sys.path.insert(0, os.path.dirname(path))
+    try:
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path[:] = saved_path
+        sys.modules.pop('helpers', None)
+        if saved_helpers is not None:
+            sys.modules['helpers'] = saved_helpers
+
+    sys.modules[name] = module
+    return module
+
+
+@pytest.fixture(scope='session')
+def load_script():
+    return _load_script
@@ -0,0 +1,41 @@
+#Aho-Corasick search against the PatternMatching / PatternCount string loops
+
+import random
+
+import pytest
+
+from aho_corasick import build_automaton, multiple_pattern_count, multiple_pattern_matching
+
+
+def reference_positions(pattern, genome):
+    return [i for i in range(len(genome) - len(pattern) + 1) if genome[i:i + len(pattern)] == pattern]
+
+
+def test_sample():
+    assert multiple_pattern_matching(['ATAT'], 'GATATATGCATATACTT') == {'ATAT': [1, 3, 9]}
+    assert multiple_pattern_count(['GCG'], 'GCGCG') == {'GCG': 2}
+
+
+def test_other_symbols_and_case():
+    genome = 'ACGNacgACG'
+    assert multiple_pattern_matching(['ACG', 'acg', 'GNa', 'NN'], genome) == {
+        'ACG': [0, 7], 'acg': [4], 'GNa': [2], 'NN': []}
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgtN'])
+def test_matches_reference(alphabet):
+    rng = random.Random(alphabet)
+    for _ in range(300):
+        genome = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 100)))
+        patterns = [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 5))) for _ in range(rng.randint(1, 6))]
+        automaton = build_automaton(patterns)
+        positions = multiple_pattern_matching(patterns, genome, automaton)
+        counts = multiple_pattern_count(patterns, genome.encode('ascii'), automaton)
+        for pattern in patterns:
+            assert positions[pattern] == reference_positions(pattern, genome)
+            assert counts[pattern] == len(positions[pattern])
+
+
+def test_empty_pattern():
+    with pytest.raises(ValueError):
+        build_automaton(['ACG', ''])
@@ -0,0 +1,109 @@
+#frequent_words_with_mismatches: every mode and worker count against the string version
+
+import random
+
+import numpy as np
+import pytest
+
+from dna_encoding import decode_kmer
+from kmer_counter import count_kmers
+from neighborhood import masks_are_cheaper, neighborhood_frequency_array, neighborhood_layers
+
+
+def reference_neighbors(pattern, d):
+    """The original recursive d-neighborhood generator."""
+    if d == 0:
+        return {pattern}
+    if len(pattern) == 1:
+        return {'A', 'C', 'G', 'T'}
+    neighborhood = set()
+    for text in reference_neighbors(pattern[1:], d):
+        if sum(a != b for a, b in zip(pattern[1:], text)) < d:
+            neighborhood.update(nucleotide + text for nucleotide in 'ACGT')
+        else:
+            neighborhood.add(pattern[0] + text)
+    return neighborhood
+
+
+def reference_frequent_words(text, k, d):
+    counts = {}
+    for i in range(len(text) - k + 1):
+        for neighbor in reference_neighbors(text[i:i + k], d):
+            counts[neighbor] = counts.get(neighbor, 0) + 1
+    best = max(counts.values(), default=0)
+    return sorted(kmer for kmer in counts if counts[kmer] == best)
+
+
+@pytest.fixture(scope='module')
+def d_neighborhood(load_script):
+    return load_script('part_2/d_neighborhood.py')
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgtN'])
+def test_single_process_modes(d_neighborhood, alphabet):
+    rng = random.Random(alphabet)
+    for _ in range(100):
+        k, d = rng.randint(1, 5), rng.randint(0, 2)
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        expected = reference_frequent_words(text, k, d)
+        for use_frequency_array in (False, True):
+            assert d_neighborhood.frequent_words_with_mismatches(text, k, d, use_frequency_array) == expected
+
+
+@pytest.mark.parametrize('k, d', [(1, 1), (3, 2), (4, 1), (4, 4)])
+def test_neighborhood_layers(k, d):
+    rng = random.Random(k * 10 + d)
+    text = ''.join(rng.choice('ACGT') for _ in range(100))
+    codes, counts = count_kmers(text, k)
+    layers = neighborhood_layers(codes, counts, k, d)
+    assert len(layers) == d + 1
+    kmers = [decode_kmer(code, k) for code in range(4 ** k)]
+    for distance, layer in enumerate(layers):
+        expected = [sum(count for code, count in zip(codes.tolist(), counts.tolist())
+                        if sum(a != b for a, b in zip(kmer, kmers[code])) == distance) for kmer in kmers]
+        assert layer.tolist() == expected
+
+
+def test_frequency_array_mode(d_neighborhood):
+    rng = random.Random(11)
+    text = ''.join(rng.choice('ACGTN') for _ in range(300))
+    methods = set()
+    for k, d in ((3, 1), (5, 2), (7, 1)):
+        codes, counts = count_kmers(text.replace('N', ''), k)
+        methods.add(masks_are_cheaper(len(codes), k, d))
+        expected = reference_frequent_words(text, k, d)
+        assert d_neighborhood.frequent_words_with_mismatches_array(text, k, d) == expected
+        assert d_neighborhood.frequent_words_with_mismatches(text, k, d) == expected
+    # Both ways of filling the array are used by default on these inputs
+    assert methods == {True, False}
+
+    limit = d_neighborhood.FREQUENCY_ARRAY_K_LIMIT
+    with pytest.raises(ValueError):
+        d_neighborhood.frequent_words_with_mismatches_array(text, limit + 1, 1)
+
+
+@pytest.mark.parametrize('alphabet, k, d', [('ACGT', 4, 2), ('ACGTN', 3, 1), ('ACGTacgtN', 5, 3)])
+def test_worker_counts(d_neighborhood, alphabet, k, d):
+    # k = 5, d = 3 on 300 symbols goes through the position-by-position parallel path
+    rng = random.Random(alphabet)
+    text = ''.join(rng.choice(alphabet) for _ in range(300))
+    expected = reference_frequent_words(text, k, d)
+    for workers in (2, 3):
+        for use_frequency_array in (False, True):
+            assert d_neighborhood.frequent_words_with_mismatches(
+                text, k, d, use_frequency_array, workers=workers) == expected
+
+
+def test_longer_than_a_code(d_neighborhood):
+    rng = random.Random(33)
+    text = ''.join(rng.choice('ACGT') for _ in range(40))
+    assert d_neighborhood.frequent_words_with_mismatches(text, 33, 1) == reference_frequent_words(text, 33, 1)
+
+
+@pytest.mark.parametrize('k, d, workers', [(2, 2, 2), (5, 3, 3), (6, 2, 5), (4, 1, 17)])
+def test_layered_frequency_array_parallel(d_neighborhood, k, d, workers):
+    rng = random.Random(k * d)
+    text = ''.join(rng.choice('ACGT') for _ in range(2000))
+    codes, counts = count_kmers(text, k)
+    expected = neighborhood_frequency_array(codes, counts, k, d, use_masks=True)
+    assert np.array_equal(d_neighborhood.layered_frequency_array_parallel(codes, counts, k, d, workers), expected)
@@ -0,0 +1,77 @@
+#2-bit encoding against string slicing
+
+import random
+
+import numpy as np
+import pytest
+
+from dna_encoding import (decode_kmer, encode_kmer, encode_sequence, is_nucleotide_string, kmer_codes, kmer_text,
+                          masked_kmer_codes, reverse_complement_code, reverse_complement_codes)
+
+COMPLEMENT = {'A': 'T', 'T': 'A', 'G': 'C', 'C': 'G'}
+
+
+def reference_code(kmer):
+    code = 0
+    for symbol in kmer.upper():
+        code = code * 4 + 'ACGT'.index(symbol)
+    return code
+
+
+@pytest.mark.parametrize('k', [1, 2, 5, 16, 31, 32])
+def test_kmer_codes(k):
+    rng = random.Random(k)
+    text = ''.join(rng.choice('ACGTacgt') for _ in range(100))
+    expected = [reference_code(text[i:i + k]) for i in range(len(text) - k + 1)]
+    assert kmer_codes(text, k).tolist() == expected
+    assert kmer_codes(encode_sequence(text), k).tolist() == expected
+    assert [decode_kmer(code, k) for code in expected[:5]] == [text[i:i + k].upper() for i in range(5)]
+    assert encode_kmer(text[:k]) == expected[0]
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        encode_sequence('ACGN')
+    with pytest.raises(ValueError):
+        kmer_codes('ACGT', 33)
+    assert kmer_codes('ACG', 4).size == 0
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgtN'])
+def test_masked_kmer_codes(alphabet):
+    rng = random.Random(alphabet)
+    for _ in range(200):
+        k = rng.randint(1, 8)
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        for ignore_case in (False, True):
+            codes, valid = masked_kmer_codes(text, k, ignore_case)
+            kmers = [text[i:i + k] for i in range(len(text) - k + 1)]
+            nucleotides = 'ACGTacgt' if ignore_case else 'ACGT'
+            assert valid.tolist() == [set(kmer) <= set(nucleotides) for kmer in kmers]
+            assert codes[valid].tolist() == [reference_code(kmer) for kmer, ok in zip(kmers, valid) if ok]
+
+
+def test_is_nucleotide_string():
+    assert is_nucleotide_string('ACGT')
+    assert is_nucleotide_string('')
+    assert not is_nucleotide_string('ACgT')
+    assert not is_nucleotide_string('ACNT')
+    assert not is_nucleotide_string('ACGÅ')
+    assert is_nucleotide_string(b'GATTACA')
+
+
+def test_kmer_text():
+    text = 'acGTN'
+    for sequence in (text, text.encode('ascii'), np.frombuffer(text.encode('ascii'), dtype=np.uint8)):
+        assert kmer_text(sequence, 1, 3) == 'cGT'
+        assert kmer_text(sequence, 3, 5) == 'TN'
+
+
+@pytest.mark.parametrize('k', [1, 4, 17, 32])
+def test_reverse_complement(k):
+    rng = random.Random(k)
+    kmers = [''.join(rng.choice('ACGT') for _ in range(k)) for _ in range(50)]
+    expected = [reference_code(''.join(COMPLEMENT[symbol] for symbol in reversed(kmer))) for kmer in kmers]
+    codes = np.array([encode_kmer(kmer) for kmer in kmers], dtype=np.uint64)
+    assert reverse_complement_codes(codes, k).tolist() == expected
+    assert reverse_complement_code(int(codes[0]), k) == expected[0]
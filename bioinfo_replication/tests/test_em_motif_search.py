@@ -0,0 +1,78 @@
+#EM motif search against a window-by-window version of the E and M steps
+
+import math
+import random
+
+import numpy as np
+import pytest
+
+from em_motif_search import em_motif_search, expectation_maximization
+from motif_profile import MotifProfile
+
+ROWS = {'A': 0, 'C': 1, 'G': 2, 'T': 3}
+ALPHABETS = ['ACGT', 'ACGTacgtN']
+
+
+def random_dna(alphabet, seed, count=5, length=30):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(alphabet) for _ in range(length)) for _ in range(count)]
+
+
+def reference_iterations(dna_strings, k, initial_motifs, iterations):
+    """
+    EM of the OOPS model one window at a time: windows holding other symbols (lower case included)
+    have likelihood 0, the background counts upper-case A, C, G, T with one pseudocount each.
+    """
+    background = [1 + sum(dna_string.count(symbol) for dna_string in dna_strings) for symbol in 'ACGT']
+    background = [count / sum(background) for count in background]
+    profile = MotifProfile.from_motifs(initial_motifs, k).profile()
+
+    for _ in range(iterations):
+        counts = np.ones((4, k))
+        for dna_string in dna_strings:
+            ratios = []
+            for i in range(len(dna_string) - k + 1):
+                window = dna_string[i:i + k]
+                if all(symbol in ROWS for symbol in window):
+                    ratios.append(math.prod(profile[ROWS[symbol], j] / background[ROWS[symbol]]
+                                            for j, symbol in enumerate(window)))
+                else:
+                    ratios.append(0.0)
+            total = sum(ratios)
+            for i, ratio in enumerate(ratios):
+                if ratio:
+                    for j, symbol in enumerate(dna_string[i:i + k]):
+                        counts[ROWS[symbol], j] += ratio / total
+        profile = counts / counts.sum(axis=0)
+    return profile
+
+
+@pytest.mark.parametrize('alphabet', ALPHABETS)
+def test_iterations_match_reference(alphabet):
+    dna_strings = random_dna(alphabet, alphabet)
+    initial_motifs = [dna_string[:4] for dna_string in dna_strings]
+    result = expectation_maximization(dna_strings, 4, initial_motifs, max_iterations=5, tolerance=0)
+    assert result['iterations'] == 5
+    assert np.allclose(result['profile'], reference_iterations(dna_strings, 4, initial_motifs, 5))
+
+
+@pytest.mark.parametrize('alphabet', ALPHABETS)
+def test_motifs_are_windows_of_their_strings(alphabet):
+    dna_strings = random_dna(alphabet, alphabet + 'motifs') + ['ACG']
+    motifs = expectation_maximization(dna_strings, 5, [dna_string[:5] for dna_string in dna_strings])['motifs']
+    assert motifs[-1] == ""
+    for motif, dna_string in zip(motifs[:-1], dna_strings):
+        assert len(motif) == 5 and motif in dna_string
+
+
+def test_lower_case_window_is_never_picked():
+    dna_strings = ['ttttACGTtttt', 'ccACGTcc', 'acgtACGTa']
+    assert expectation_maximization(dna_strings, 4, ['ACGT'] * 3)['motifs'] == ['ACGT'] * 3
+
+
+@pytest.mark.parametrize('alphabet', ALPHABETS)
+def test_worker_counts(alphabet):
+    dna_strings = random_dna(alphabet, alphabet + 'workers')
+    expected = em_motif_search(dna_strings, 4, len(dna_strings), workers=1)
+    for workers in (2, 3):
+        assert em_motif_search(dna_strings, 4, len(dna_strings), workers=workers) == expected
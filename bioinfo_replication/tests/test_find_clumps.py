@@ -0,0 +1,27 @@
+#FindClumps (part_1) against the window-by-window dictionary version
+
+import random
+
+import pytest
+
+
+def reference_clumps(genome, k, L, t):
+    clumps = set()
+    for i in range(len(genome) - L + 1):
+        window = genome[i:i + L]
+        counts = {}
+        for j in range(len(window) - k + 1):
+            counts[window[j:j + k]] = counts.get(window[j:j + k], 0) + 1
+        clumps.update(kmer for kmer, count in counts.items() if count >= t)
+    return sorted(clumps)
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgtN'])
+def test_find_clumps(load_script, alphabet):
+    last_challenge = load_script('part_1/last_challenge.py')
+    rng = random.Random(alphabet)
+    for _ in range(200):
+        k = rng.choice([1, 2, 3, 33])
+        L, t = rng.randint(1, 70), rng.randint(1, 4)
+        genome = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        assert last_challenge.FindClumps(genome, k, L, t) == reference_clumps(genome, k, L, t)
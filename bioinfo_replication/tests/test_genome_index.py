@@ -0,0 +1,51 @@
+#FM-index queries against the string searches they replace
+
+import random
+
+import numpy as np
+import pytest
+
+from genome_index import (approximate_locate_pattern, build_genome_index, build_suffix_array, count_pattern,
+                          load_genome_index, locate_pattern, save_genome_index)
+
+
+def reference_positions(pattern, genome, d=0):
+    k = len(pattern)
+    return [i for i in range(len(genome) - k + 1) if sum(a != b for a, b in zip(pattern, genome[i:i + k])) <= d]
+
+
+def test_suffix_array_long_repeats():
+    # Runs longer than the packed sort key need the doubling rounds
+    codes = np.array([0] * 100 + [1] + [0] * 60, dtype=np.uint8)
+    genome = ''.join('ACGT'[code] for code in codes) + '$'
+    expected = sorted(range(len(genome)), key=lambda i: genome[i:].replace('$', ' '))
+    assert build_suffix_array(codes).tolist() == expected
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgtN'])
+def test_queries_match_reference(alphabet):
+    rng = random.Random(alphabet)
+    for _ in range(100):
+        genome = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 150)))
+        index = build_genome_index(genome)
+        for _ in range(5):
+            pattern = ''.join(rng.choice(alphabet + 'N') for _ in range(rng.randint(1, 5)))
+            d = rng.randint(0, 2)
+            assert locate_pattern(index, pattern) == reference_positions(pattern, genome)
+            assert count_pattern(index, pattern) == len(reference_positions(pattern, genome))
+            assert approximate_locate_pattern(index, pattern, d) == reference_positions(pattern, genome, d)
+
+
+def test_case_sensitive():
+    index = build_genome_index('acgACGNACG')
+    assert locate_pattern(index, 'ACG') == [3, 7]
+    assert locate_pattern(index, 'acg') == [0]
+    assert locate_pattern(index, 'GNA') == [5]
+
+
+def test_save_keeps_path(tmp_path):
+    genome = 'ACGTTGCA' * 20
+    path = tmp_path / 'genome.idx'
+    save_genome_index(build_genome_index(genome), path)
+    assert path.exists()
+    assert locate_pattern(load_genome_index(path), 'TGCA') == reference_positions('TGCA', genome)
@@ -0,0 +1,58 @@
+#GreedyMotifSearch with pseudocounts (part_3) against the string version
+
+import random
+
+import pytest
+
+ROWS = {'A': 0, 'C': 1, 'G': 2, 'T': 3}
+
+
+def reference_profile(motifs, k):
+    """create_profile_matrix: upper-case A, C, G, T counted, one pseudocount per cell."""
+    counts = [[1] * k for _ in range(4)]
+    for motif in motifs:
+        for i, symbol in enumerate(motif):
+            if symbol in ROWS:
+                counts[ROWS[symbol]][i] += 1
+    return [[count / (len(motifs) + 4) for count in row] for row in counts]
+
+
+def reference_most_probable(text, k, profile):
+    best_probability, best_kmer = -1.0, ""
+    for i in range(len(text) - k + 1):
+        probability = 1.0
+        for j, symbol in enumerate(text[i:i + k]):
+            probability = probability * profile[ROWS[symbol]][j] if symbol in ROWS else 0.0
+        if probability > best_probability:
+            best_probability, best_kmer = probability, text[i:i + k]
+    return best_kmer
+
+
+def reference_score(motifs):
+    return sum(len(motifs) - max(sum(motif[i] == symbol for motif in motifs) for symbol in 'ACGT')
+               for i in range(len(motifs[0])))
+
+
+def reference_greedy(dna, k, t):
+    best_motifs = [string[:k] for string in dna]
+    best_score = reference_score(best_motifs)
+    for i in range(len(dna[0]) - k + 1):
+        motifs = [dna[0][i:i + k]]
+        for j in range(1, t):
+            motifs.append(reference_most_probable(dna[j], k, reference_profile(motifs, k)))
+        if reference_score(motifs) < best_score:
+            best_motifs, best_score = motifs, reference_score(motifs)
+    return best_motifs
+
+
+@pytest.mark.parametrize('script', ['part_3/greedy_motif_search_pseudocounts.py', 'part_3/greedy_motif_search.py'])
+@pytest.mark.parametrize('alphabet', ['ACGT', 'acgt', 'ACGTacgtN'])
+def test_greedy_matches_reference(load_script, script, alphabet):
+    greedy = load_script(script)
+    rng = random.Random(alphabet)
+    for _ in range(5):
+        k, t = rng.randint(2, 6), rng.randint(2, 5)
+        dna = [''.join(rng.choice(alphabet) for _ in range(rng.randint(k, 25))) for _ in range(t)]
+        expected = reference_greedy(dna, k, t)
+        for workers in (1, 2):
+            assert greedy.greedy_motif_search(dna, k, t, workers) == expected
@@ -0,0 +1,68 @@
+#Hamming kernel against the string versions it replaced
+
+import random
+
+import pytest
+
+from dna_encoding import encode_kmer
+from hamming_kernel import hamming_distance_codes, min_window_distance, window_hamming_distances
+
+
+def reference_distances(pattern, text):
+    """d(pattern, window) for every window, comparing symbols as they are."""
+    k = len(pattern)
+    return [sum(a != b for a, b in zip(pattern, text[i:i + k])) for i in range(len(text) - k + 1)]
+
+
+def reference_matching(pattern, text, d):
+    """The original approximate_pattern_matching loop."""
+    return [i for i, distance in enumerate(reference_distances(pattern, text)) if distance <= d]
+
+
+def test_hamming_distance_codes():
+    assert hamming_distance_codes(encode_kmer('ACGT'), encode_kmer('ACCA')) == 2
+    assert hamming_distance_codes(encode_kmer('A' * 32), encode_kmer('T' * 32)) == 32
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgtN'])
+def test_window_distances_match_reference(alphabet):
+    rng = random.Random(alphabet)
+    for _ in range(300):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 80)))
+        pattern = ''.join(rng.choice(rng.choice(['ACGT', 'ACGTNa'])) for _ in range(rng.randint(0, 40)))
+        expected = reference_distances(pattern, text)
+        assert window_hamming_distances(pattern, text).tolist() == expected
+        assert window_hamming_distances(pattern, text.encode('ascii')).tolist() == expected
+
+
+def test_other_symbols_do_not_raise(load_script):
+    helpers = load_script('part_2/helpers.py')
+    # Regression: N in the text used to raise ValueError in the 2-bit path
+    assert helpers.approximate_pattern_matching('ACG', 'ACGNACG', 0) == [0, 4]
+    assert helpers.approximate_pattern_matching('ACG', 'ACGNACG', 1) == reference_matching('ACG', 'ACGNACG', 1)
+    # N only matches N
+    assert helpers.approximate_pattern_matching('ANG', 'ACGANG', 0) == [3]
+
+
+def test_case_sensitive(load_script):
+    helpers = load_script('part_2/helpers.py')
+    assert helpers.approximate_pattern_matching('ACG', 'acgACG', 0) == [3]
+    assert helpers.approximate_pattern_matching('ACG', 'acgACG', 2) == reference_matching('ACG', 'acgACG', 2)
+
+
+def test_min_window_distance():
+    assert min_window_distance('GATTCTCA', 'GCAAAGACGCTGACCAA') == 3
+    assert min_window_distance('ACGT', 'ACG') == float('inf')
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgtN'])
+def test_seeded_matching_matches_reference(load_script, alphabet):
+    helpers = load_script('part_2/helpers.py')
+    rng = random.Random(alphabet)
+    for _ in range(300):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 120)))
+        pattern = ''.join(rng.choice(rng.choice(['ACGT', 'ACGTN'])) for _ in range(rng.randint(1, 12)))
+        d = rng.randint(0, 3)
+        expected = reference_matching(pattern, text, d)
+        assert helpers.approximate_pattern_matching_seeded(pattern, text, d) == expected
+        assert helpers.approximate_pattern_matching_seeded(pattern, text.encode('ascii'), d) == expected
@@ -0,0 +1,70 @@
+#k-mer counting engine against the dictionary of substrings
+
+import random
+
+import pytest
+
+import kmer_counter
+from dna_encoding import decode_kmer
+from kmer_counter import count_kmers, count_kmers_in_reads, kmer_frequencies, most_frequent_kmers
+
+
+def reference_frequencies(text, k):
+    """The original frequency map: every substring of length k, in order of first appearance."""
+    counts = {}
+    for i in range(len(text) - k + 1):
+        counts[text[i:i + k]] = counts.get(text[i:i + k], 0) + 1
+    return counts
+
+
+def reference_frequent_words(text, k):
+    counts = reference_frequencies(text, k)
+    best = max(counts.values(), default=0)
+    return [kmer for kmer in counts if counts[kmer] == best]
+
+
+def as_dict(codes, counts, k):
+    return {decode_kmer(code, k): count for code, count in zip(codes.tolist(), counts.tolist())}
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgtN'])
+def test_most_frequent_kmers(alphabet):
+    rng = random.Random(alphabet)
+    for _ in range(300):
+        k = rng.choice([1, 2, 3, 4, 15, 33])
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        assert most_frequent_kmers(text, k) == reference_frequent_words(text, k)
+        assert list(kmer_frequencies(text, k).items()) == list(reference_frequencies(text, k).items())
+
+
+def test_frequent_words_script(load_script):
+    second_challenge = load_script('part_1/second_challenge.py')
+    assert second_challenge.FrequentWords('ACGTTGCATGTCGCATGATGCATGAGAGCT', 4) == ['GCAT', 'CATG']
+    assert second_challenge.FrequentWords('acgACGacg', 3) == ['acg']
+
+
+@pytest.mark.parametrize('k', [1, 3, 15, 32])
+def test_count_kmers(k):
+    rng = random.Random(k)
+    text = ''.join(rng.choice('ACGT') for _ in range(500))
+    codes, counts = count_kmers(text, k)
+    assert list(codes) == sorted(codes)
+    assert as_dict(codes, counts, k) == reference_frequencies(text, k)
+
+
+@pytest.mark.parametrize('k', [3, 15])
+def test_count_kmers_in_reads(monkeypatch, k):
+    # Small batches, so reads are counted over several of them
+    monkeypatch.setattr(kmer_counter, 'READ_BATCH_BASES', 64)
+    rng = random.Random(k)
+    reads = [''.join(rng.choice('ACGTacgtN') for _ in range(rng.randint(0, 40))) for _ in range(50)]
+
+    expected = {}
+    for read in reads:
+        for kmer, count in reference_frequencies(read.upper(), k).items():
+            if 'N' not in kmer:
+                expected[kmer] = expected.get(kmer, 0) + count
+
+    codes, counts = count_kmers_in_reads((read if i % 2 else read.encode('ascii') for i, read in enumerate(reads)), k)
+    assert list(codes) == sorted(codes)
+    assert as_dict(codes, counts, k) == expected
@@ -0,0 +1,64 @@
+#Distance tables and median strings against the string versions
+
+import itertools
+import random
+
+import pytest
+
+import median_search
+from median_search import median_string_branch_and_bound, median_strings, pattern_distance_table, string_distance_table
+
+
+def reference_distance(pattern, text):
+    """Minimum Hamming distance between pattern and the k-mers of text, comparing symbols as they are."""
+    k = len(pattern)
+    return min(sum(a != b for a, b in zip(pattern, text[i:i + k])) for i in range(len(text) - k + 1))
+
+
+def all_kmers(k):
+    return [''.join(kmer) for kmer in itertools.product('ACGT', repeat=k)]
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgt', 'ACGTNNNNa'])
+def test_string_distance_table(alphabet):
+    rng = random.Random(alphabet)
+    for _ in range(100):
+        k = rng.randint(1, 5)
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(k, 25)))
+        table = string_distance_table(text, k)
+        assert table.tolist() == [reference_distance(kmer, text) for kmer in all_kmers(k)]
+
+
+def test_other_symbols_match_no_nucleotide():
+    assert string_distance_table('NNNN', 2).tolist() == [2] * 16
+    assert string_distance_table('acgt', 4).max() == 4
+    assert string_distance_table('ANC', 3)[0] == 2
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgt'])
+def test_median_strings(alphabet):
+    rng = random.Random(alphabet)
+    for _ in range(30):
+        k = rng.randint(1, 4)
+        dna = [''.join(rng.choice(alphabet) for _ in range(rng.randint(k, 15))) for _ in range(rng.randint(1, 4))]
+        totals = {kmer: sum(reference_distance(kmer, text) for text in dna) for kmer in all_kmers(k)}
+        best = min(totals.values())
+        assert median_strings(k, dna) == [kmer for kmer in all_kmers(k) if totals[kmer] == best]
+        assert pattern_distance_table(k, dna).tolist() == list(totals.values())
+
+
+@pytest.mark.parametrize('subtree_k', [1, 2, 3, median_search.SUBTREE_TABLE_K])
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgt', 'NNNNA'])
+def test_branch_and_bound(monkeypatch, subtree_k, alphabet):
+    # Small subtree tables make the search go through the prefix tree
+    monkeypatch.setattr(median_search, 'SUBTREE_TABLE_K', subtree_k)
+    rng = random.Random(alphabet + str(subtree_k))
+    for _ in range(30):
+        k = rng.randint(1, 5)
+        dna = [''.join(rng.choice(alphabet) for _ in range(rng.randint(k, 14))) for _ in range(rng.randint(1, 4))]
+        totals = [sum(reference_distance(kmer, text) for text in dna) for kmer in all_kmers(k)]
+        assert median_string_branch_and_bound(k, dna) == all_kmers(k)[totals.index(min(totals))]
+
+
+def test_branch_and_bound_short_string():
+    assert median_string_branch_and_bound(3, ['ACGT', 'AC']) == ""
@@ -0,0 +1,71 @@
+#Frequent words with mismatches and reverse complements against the string version
+
+import random
+
+import pytest
+
+from test_neighborhood import reference_neighbors
+
+COMPLEMENT = {'A': 'T', 'T': 'A', 'G': 'C', 'C': 'G'}
+
+
+def reference_frequent_words(text, k, d):
+    """The original search: every neighbor of every k-mer, counted with its reverse complement."""
+    candidates = set()
+    for i in range(len(text) - k + 1):
+        candidates.update(reference_neighbors(text[i:i + k], d))
+
+    def count(pattern):
+        return sum(sum(a != b for a, b in zip(text[i:i + k], pattern)) <= d for i in range(len(text) - k + 1))
+
+    # Raises KeyError on neighbors holding other symbols
+    counts = {pattern: count(pattern) + count(''.join(COMPLEMENT[symbol] for symbol in reversed(pattern)))
+              for pattern in candidates}
+    best = max(counts.values(), default=0)
+    return sorted(pattern for pattern in counts if counts[pattern] == best)
+
+
+@pytest.fixture(scope='module')
+def mismatch_reverse_frequent(load_script):
+    return load_script('part_2/mismatch_reverse_frequent.py')
+
+
+@pytest.mark.parametrize('dense', [True, False])
+def test_matches_reference(mismatch_reverse_frequent, monkeypatch, dense):
+    if not dense:
+        monkeypatch.setattr(mismatch_reverse_frequent, 'FREQUENCY_ARRAY_K_LIMIT', 0)
+    rng = random.Random(dense)
+    for _ in range(300):
+        k, d = rng.randint(1, 4), rng.randint(0, 4)
+        text = ''.join(rng.choice('ACGT') for _ in range(rng.randint(0, 15)))
+        # Other symbols only work where every neighbor gets a nucleotide in their place
+        text += rng.choice(['', 'N', 'n'])
+        try:
+            expected = reference_frequent_words(text, k, d)
+        except KeyError:
+            with pytest.raises(ValueError):
+                mismatch_reverse_frequent.frequent_words_with_mismatches_and_reverse_complements(text, k, d)
+            continue
+        assert mismatch_reverse_frequent.frequent_words_with_mismatches_and_reverse_complements(text, k, d) == expected
+
+
+def test_other_symbols_inside(mismatch_reverse_frequent):
+    with pytest.raises(ValueError):
+        mismatch_reverse_frequent.frequent_words_with_mismatches_and_reverse_complements('ACNGT', 3, 1)
+    with pytest.raises(ValueError):
+        mismatch_reverse_frequent.frequent_words_with_mismatches_and_reverse_complements('acgt', 2, 1)
+    # Within d >= k mismatches every symbol is substituted
+    expected = reference_frequent_words('ACNGT', 2, 2)
+    assert mismatch_reverse_frequent.frequent_words_with_mismatches_and_reverse_complements('ACNGT', 2, 2) == expected
+
+
+def test_longer_than_a_code(mismatch_reverse_frequent):
+    frequent_words = mismatch_reverse_frequent.frequent_words_with_mismatches_and_reverse_complements
+    assert frequent_words('ACGT' * 10, 33, 0) == reference_frequent_words('ACGT' * 10, 33, 0)
+    rng = random.Random(33)
+    for d in (0, 1):
+        text = ''.join(rng.choice('ACGT') for _ in range(40))
+        assert frequent_words(text, 34, d) == reference_frequent_words(text, 34, d)
+    assert frequent_words('ACGT' * 8, 33, 1) == []
+    with pytest.raises(ValueError):
+        frequent_words('ACGTN' * 8, 33, 1)
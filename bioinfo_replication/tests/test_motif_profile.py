@@ -0,0 +1,45 @@
+#Incremental count matrix against create_profile_matrix / score_motifs (string versions)
+
+import random
+
+import numpy as np
+import pytest
+
+from motif_profile import MotifProfile
+
+
+def reference_profile(motifs):
+    """create_profile_matrix: counts of upper-case A, C, G, T with one pseudocount per cell."""
+    k = len(motifs[0])
+    return [[(1 + sum(motif[j] == nucleotide for motif in motifs)) / (len(motifs) + 4) for j in range(k)]
+            for nucleotide in 'ACGT']
+
+
+def reference_score(motifs):
+    """score_motifs: symbols differing from the most frequent upper-case nucleotide of their column."""
+    return sum(len(motifs) - max(sum(motif[j] == nucleotide for motif in motifs) for nucleotide in 'ACGT')
+               for j in range(len(motifs[0])))
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgt'])
+def test_matches_reference(alphabet):
+    rng = random.Random(alphabet)
+    for _ in range(300):
+        k = rng.randint(1, 8)
+        motifs = [''.join(rng.choice(alphabet) for _ in range(k)) for _ in range(rng.randint(1, 8))]
+        profile = MotifProfile.from_motifs(motifs)
+        assert np.allclose(profile.profile(), reference_profile(motifs))
+        assert profile.score() == reference_score(motifs)
+
+        # Adding then removing a motif leaves the collection unchanged
+        other = ''.join(rng.choice(alphabet) for _ in range(k))
+        profile.add(other.encode('ascii'))
+        profile.remove(other)
+        assert profile.score() == reference_score(motifs)
+
+
+def test_consensus_and_log_profile():
+    profile = MotifProfile.from_motifs(['ACGT', 'ACGA', 'TCGA'])
+    assert profile.consensus() == 'ACGA'
+    assert profile.log_profile().shape == (5, 4)
+    assert profile.score() == 2
@@ -0,0 +1,140 @@
+#d-neighborhoods and (k,d)-motif enumeration against the recursive string versions
+
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+import neighborhood
+from dna_encoding import decode_kmer, encode_kmer
+from kmer_counter import count_kmers
+from neighborhood import (clear_neighbor_cache, neighbor_codes, neighbor_strings, neighborhood_bitmap,
+                          neighborhood_code_array, neighborhood_frequency_array, neighborhood_size)
+
+
+def reference_neighbors(pattern, d):
+    """The original recursive d-neighborhood generator."""
+    if d == 0:
+        return {pattern}
+    if len(pattern) == 1:
+        return {'A', 'C', 'G', 'T'}
+    neighborhood = set()
+    for text in reference_neighbors(pattern[1:], d):
+        if sum(a != b for a, b in zip(pattern[1:], text)) < d:
+            neighborhood.update(nucleotide + text for nucleotide in 'ACGT')
+        else:
+            neighborhood.add(pattern[0] + text)
+    return neighborhood
+
+
+def reference_distance(pattern, text):
+    k = len(pattern)
+    distances = [sum(a != b for a, b in zip(pattern, text[i:i + k])) for i in range(len(text) - k + 1)]
+    return min(distances, default=float('inf'))
+
+
+def reference_motifs(dna_list, k, d):
+    """The original motif_enumeration: neighbors of every k-mer that appear in every string."""
+    patterns = set()
+    for dna_string in dna_list:
+        for i in range(len(dna_string) - k + 1):
+            for pattern in reference_neighbors(dna_string[i:i + k], d):
+                if all(reference_distance(pattern, dna) <= d for dna in dna_list):
+                    patterns.add(pattern)
+    return sorted(patterns)
+
+
+def all_kmers(k):
+    return [''.join(kmer) for kmer in itertools.product('ACGT', repeat=k)]
+
+
+@pytest.fixture(scope='module')
+def motif_enumeration(load_script):
+    return load_script('part_3/motif_enumeration_exhaustive.py')
+
+
+def test_neighbor_codes():
+    rng = random.Random(0)
+    for _ in range(200):
+        k, d = rng.randint(1, 6), rng.randint(0, 3)
+        pattern = ''.join(rng.choice('ACGT') for _ in range(k))
+        codes = neighbor_codes(encode_kmer(pattern), k, d).tolist()
+        assert len(codes) == len(set(codes)) == neighborhood_size(k, d)
+        assert {decode_kmer(code, k) for code in codes} == reference_neighbors(pattern, d)
+
+
+def test_neighbor_cache_is_bounded(monkeypatch):
+    clear_neighbor_cache()
+    entry_bytes = 8 * neighborhood_size(6, 2)
+    monkeypatch.setattr(neighborhood, 'NEIGHBORHOOD_CACHE_BYTES', 3 * entry_bytes)
+    first = neighbor_codes(0, 6, 2)
+    assert neighbor_codes(0, 6, 2) is first
+    for code in range(1, 10):
+        neighbor_codes(code, 6, 2)
+    assert len(neighborhood._neighbor_cache) == 3
+    assert neighborhood._neighbor_cache_bytes == 3 * entry_bytes
+    assert neighbor_codes(0, 6, 2) is not first
+
+    # Neighborhoods larger than the whole cache are computed but not kept
+    neighbor_codes(0, 8, 3)
+    assert (0, 8, 3) not in neighborhood._neighbor_cache
+    clear_neighbor_cache()
+    assert len(neighborhood._neighbor_cache) == 0 and neighborhood._neighbor_cache_bytes == 0
+
+
+def test_searches_free_the_cache(motif_enumeration):
+    motif_enumeration.motif_enumeration_by_scanning(['ACGTTGCA', 'TTGCAACG'], 4, 1)
+    assert len(neighborhood._neighbor_cache) == 0
+
+
+@pytest.mark.parametrize('pattern', ['A', 'N', 'AN', 'Na', 'acgt', 'ACGTNACG', 'A' * 33])
+def test_neighbor_strings(pattern):
+    for d in range(3):
+        assert neighbor_strings(pattern, d) == reference_neighbors(pattern, d)
+
+
+@pytest.mark.parametrize('k, d', [(1, 1), (3, 0), (4, 2), (5, 3), (3, 5)])
+def test_frequency_array_methods(k, d):
+    rng = random.Random(k * 10 + d)
+    text = ''.join(rng.choice('ACGT') for _ in range(200))
+    codes, counts = count_kmers(text, k)
+    expected = [sum(count for code, count in zip(codes.tolist(), counts.tolist())
+                    if sum(a != b for a, b in zip(kmer, decode_kmer(code, k))) <= d) for kmer in all_kmers(k)]
+    for use_masks in (True, False):
+        assert neighborhood_frequency_array(codes, counts, k, d, use_masks).tolist() == expected
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgtN', 'ACNN'])
+def test_sequence_neighborhoods(alphabet):
+    rng = random.Random(alphabet)
+    for _ in range(50):
+        k, d = rng.randint(1, 4), rng.randint(0, 2)
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 20)))
+        expected = [reference_distance(kmer, text) <= d for kmer in all_kmers(k)]
+        assert neighborhood_bitmap(text, k, d).tolist() == expected
+        assert neighborhood_code_array(text, k, d).tolist() == np.flatnonzero(expected).tolist()
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgtN', 'ACNN'])
+def test_motif_enumeration(motif_enumeration, monkeypatch, alphabet):
+    rng = random.Random(alphabet)
+    for _ in range(60):
+        k, d = rng.randint(1, 5), rng.randint(0, 2)
+        dna_list = [''.join(rng.choice(alphabet) for _ in range(rng.randint(k, 12))) for _ in range(rng.randint(1, 3))]
+        expected = reference_motifs(dna_list, k, d)
+        assert motif_enumeration.motif_enumeration(dna_list, k, d) == expected
+        assert motif_enumeration.motif_enumeration_by_scanning(dna_list, k, d) == expected
+
+    # Sorted code arrays instead of bitmaps, and several workers
+    monkeypatch.setattr(motif_enumeration, 'NEIGHBORHOOD_BITMAP_K_LIMIT', 0)
+    dna_list = [''.join(rng.choice(alphabet) for _ in range(15)) for _ in range(3)]
+    expected = reference_motifs(dna_list, 4, 1)
+    for workers in (1, 2):
+        assert motif_enumeration.motif_enumeration(dna_list, 4, 1, workers) == expected
+
+
+def test_motifs_longer_than_a_code(motif_enumeration):
+    rng = random.Random(33)
+    dna_list = [''.join(rng.choice('ACGTN') for _ in range(40)) for _ in range(2)]
+    assert motif_enumeration.motif_enumeration(dna_list, 33, 2) == reference_motifs(dna_list, 33, 2)
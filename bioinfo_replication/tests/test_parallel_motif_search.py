@@ -0,0 +1,273 @@
+#Parallel motif searches: same motifs whatever the number of workers, on the strings as given
+
+import math
+import pickle
+import random
+
+import numpy as np
+import pytest
+
+import parallel_motif_search
+from dna_collection import DnaCollection
+from dna_encoding import masked_kmer_codes
+from pwm_scanner import encode_for_scan
+
+ALPHABETS = ['ACGT', 'acgt', 'ACGTacgtN']
+ROWS = {'A': 0, 'C': 1, 'G': 2, 'T': 3}
+
+
+def random_dna(alphabet, seed, count=5, length=40):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(alphabet) for _ in range(length)) for _ in range(count)]
+
+
+def test_collection_keeps_symbols():
+    dna_strings = ['acgTN', '', 'GGa']
+    with DnaCollection(dna_strings) as collection:
+        assert len(collection) == 3
+        assert [collection.string(i) for i in range(3)] == dna_strings
+        assert collection.kmer(0, 1, 3) == 'cgT'
+        for i, dna_string in enumerate(dna_strings):
+            assert np.array_equal(collection.sequence(i), encode_for_scan(dna_string))
+        assert not collection.sequence(0).flags.writeable
+
+
+def test_collection_attaches_without_copy():
+    with DnaCollection(['ACGT', 'ttgn']) as collection:
+        attached = pickle.loads(pickle.dumps(collection))
+        try:
+            assert attached.kmer(1, 0, 4) == 'ttgn'
+            assert attached._memory.name == collection._memory.name
+        finally:
+            attached.close()
+
+
+def test_collection_kmer_codes():
+    dna_strings = ['ACGTNACGT', 'ac', '', 'GGATCCA']
+    with DnaCollection(dna_strings, 3) as collection:
+        attached = pickle.loads(pickle.dumps(collection))
+        try:
+            for i, dna_string in enumerate(dna_strings):
+                codes, valid = attached.kmer_codes(i, 3)
+                expected_codes, expected_valid = masked_kmer_codes(dna_string, 3)
+                assert valid.tolist() == expected_valid.tolist()
+                assert codes[valid].tolist() == expected_codes[expected_valid].tolist()
+                assert not codes.flags.writeable and not valid.flags.writeable
+            # Shared views for the collection's k, computed from the symbols for another one
+            assert np.shares_memory(attached.kmer_codes(0, 3)[0], attached.window_codes)
+            assert attached.kmer_codes(3, 4)[0].tolist() == masked_kmer_codes('GGATCCA', 4)[0].tolist()
+        finally:
+            attached.close()
+
+
+@pytest.mark.parametrize('alphabet', ALPHABETS)
+def test_greedy_workers(alphabet):
+    dna_strings = random_dna(alphabet, alphabet)
+    serial = parallel_motif_search.parallel_greedy_motif_search(dna_strings, 6, 5, workers=1)
+    assert all(motif in dna_string for motif, dna_string in zip(serial, dna_strings))
+    assert parallel_motif_search.parallel_greedy_motif_search(dna_strings, 6, 5, workers=2) == serial
+
+
+@pytest.mark.parametrize('alphabet', ALPHABETS)
+def test_seeded_searches_workers(alphabet):
+    dna_strings = random_dna(alphabet, alphabet + 'seeded')
+    randomized = [parallel_motif_search.parallel_randomized_motif_search(dna_strings, 5, 5, 20, seed=1, workers=workers)
+                  for workers in (1, 2)]
+    gibbs = [parallel_motif_search.parallel_gibbs_sampler(dna_strings, 5, 5, 100, 4, seed=2, workers=workers)
+             for workers in (1, 3)]
+    assert randomized[0] == randomized[1]
+    assert gibbs[0] == gibbs[1]
+    assert all(motif in dna_string for motif, dna_string in zip(gibbs[0], dna_strings))
+
+
+def test_motifs_longer_than_a_code():
+    dna_strings = random_dna('ACGTN', 'long', count=3, length=45)
+    serial = parallel_motif_search.parallel_greedy_motif_search(dna_strings, 33, 3, workers=1)
+    assert parallel_motif_search.parallel_greedy_motif_search(dna_strings, 33, 3, workers=2) == serial
+    gibbs = [parallel_motif_search.parallel_gibbs_sampler(dna_strings, 33, 3, 20, 2, seed=3, workers=workers)
+             for workers in (1, 2)]
+    assert gibbs[0] == gibbs[1]
+
+
+
+def reference_counts(motifs, k):
+    """Count matrix of create_profile_matrix: upper-case A, C, G, T counted, one pseudocount per cell."""
+    counts = [[1] * k for _ in range(4)]
+    for motif in motifs:
+        for j, symbol in enumerate(motif):
+            if symbol in ROWS:
+                counts[ROWS[symbol]][j] += 1
+    return counts
+
+
+def reference_weights(text, k, counts):
+    """
+    Probability of every window of text times (motif count + 4)^k: products of counts, compared exactly
+    (k-mers with equal probabilities tie, whatever the order of their factors).
+    """
+    return [math.prod(counts[ROWS[symbol]][j] if symbol in ROWS else 0 for j, symbol in enumerate(text[i:i + k]))
+            for i in range(len(text) - k + 1)]
+
+
+def reference_most_probable(text, k, counts):
+    weights = reference_weights(text, k, counts)
+    if not weights:
+        return ""
+    position = weights.index(max(weights))
+    return text[position:position + k]
+
+
+def reference_score(motifs):
+    return sum(len(motifs) - max(sum(motif[j] == symbol for motif in motifs) for symbol in 'ACGT')
+               for j in range(len(motifs[0])))
+
+
+def reference_randomized_run(dna_strings, k, t, seed_sequence):
+    """One RandomizedMotifSearch run on the strings, drawing the same initial motifs as randomized_motifs_from_seed."""
+    rng = np.random.default_rng(seed_sequence)
+    motifs = []
+    for dna_string in dna_strings[:t]:
+        max_start = len(dna_string) - k
+        if max_start <= 0:
+            motifs.append(dna_string[:k].ljust(k, 'A'))
+        else:
+            start = int(rng.integers(0, max_start + 1))
+            motifs.append(dna_string[start:start + k])
+
+    best_motifs, best_score = motifs, reference_score(motifs)
+    while True:
+        counts = reference_counts(best_motifs, k)
+        motifs = [reference_most_probable(dna_string, k, counts) for dna_string in dna_strings[:t]]
+        if reference_score(motifs) >= best_score:
+            return best_score, best_motifs
+        best_motifs, best_score = motifs, reference_score(motifs)
+
+
+@pytest.mark.parametrize('alphabet', ALPHABETS)
+def test_randomized_run_matches_reference(alphabet):
+    dna_strings = random_dna(alphabet, alphabet + 'randomized')
+    windows = parallel_motif_search.sequence_windows(dna_strings, 6)
+    for seed_sequence in parallel_motif_search.run_seeds(7, 20):
+        score, motifs, _ = parallel_motif_search.randomized_motifs_from_seed(dna_strings, windows, 6, 5, seed_sequence)
+        assert (score, motifs) == reference_randomized_run(dna_strings, 6, 5, seed_sequence)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_randomized_search_is_reproducible(load_script, workers):
+    randomized = load_script('part_4/randomized_motif_search.py')
+    dna_strings = random_dna('ACGT', 'reproducible', count=4, length=30)
+    runs = [reference_randomized_run(dna_strings, 5, 4, seed_sequence)
+            for seed_sequence in parallel_motif_search.run_seeds(11, 30)]
+    # Lowest score, the lowest run index winning ties
+    expected = min(range(30), key=lambda run: (runs[run][0], run))
+
+    reported = []
+    motifs = randomized.run_randomized_motif_search_multiple_times(
+        dna_strings, 5, 4, 30, seed=11, workers=workers, on_run=lambda *report: reported.append(report))
+    assert motifs == runs[expected][1]
+    assert sorted(run for run, _, _ in reported) == list(range(30))
+    best_scores = [best_score for _, _, best_score in reported]
+    assert best_scores == sorted(best_scores, reverse=True) and best_scores[-1] == runs[expected][0]
+
+
+def reference_gibbs_chain(dna_strings, k, t, seed_sequence, iterations):
+    """A Gibbs chain on the strings making the same random draws as gibbs_chain."""
+    rng = np.random.default_rng(seed_sequence)
+    starts = [int(rng.integers(0, max(0, len(dna_string) - k) + 1)) for dna_string in dna_strings[:t]]
+    motifs = [dna_string[start:start + k] for dna_string, start in zip(dna_strings, starts)]
+    best_score, best_motifs = reference_score(motifs), motifs[:]
+
+    for _ in range(iterations):
+        i = int(rng.integers(0, t))
+        # Window probabilities under the profile of the other motifs, relative to the best window
+        weights = reference_weights(dna_strings[i], k, reference_counts(motifs[:i] + motifs[i + 1:], k))
+        if max(weights) == 0:
+            start = int(rng.integers(0, len(weights)))
+        else:
+            cumulative = np.cumsum([weight / max(weights) for weight in weights])
+            start = int(np.searchsorted(cumulative, rng.random() * cumulative[-1]))
+        motifs[i] = dna_strings[i][start:start + k]
+        if reference_score(motifs) < best_score:
+            best_score, best_motifs = reference_score(motifs), motifs[:]
+    return best_score, best_motifs
+
+
+@pytest.mark.parametrize('alphabet', ALPHABETS + ['ACGTttttttttttttttttt'])
+@pytest.mark.parametrize('k', [4, 9])
+def test_gibbs_chain_matches_reference(alphabet, k):
+    dna_strings = random_dna(alphabet, alphabet + 'gibbs', count=4, length=25)
+    windows = parallel_motif_search.sequence_windows(dna_strings, k)
+    for seed_sequence in parallel_motif_search.run_seeds(k, 5):
+        score, motifs, iterations = parallel_motif_search.gibbs_chain(dna_strings, windows, k, 4, seed_sequence, 60)
+        assert iterations == 60
+        assert (score, motifs) == reference_gibbs_chain(dna_strings, k, 4, seed_sequence, 60)
+
+
+def test_gibbs_sampler_keeps_the_best_chain():
+    dna_strings = random_dna('ACGT', 'chains', count=4, length=25)
+    chains = [reference_gibbs_chain(dna_strings, 5, 4, seed_sequence, 40)
+              for seed_sequence in parallel_motif_search.run_seeds(8, 6)]
+    expected = min(range(6), key=lambda chain: (chains[chain][0], chain))
+    for workers in (1, 2):
+        motifs = parallel_motif_search.parallel_gibbs_sampler(dna_strings, 5, 4, 40, 6, seed=8, workers=workers)
+        assert motifs == chains[expected][1]
+
+
+def test_anytime_arguments():
+    with pytest.raises(ValueError):
+        parallel_motif_search.anytime_motif_search(['ACGT'], 2, 1)
+    with pytest.raises(ValueError):
+        parallel_motif_search.anytime_motif_search(['ACGT'], 2, 1, 'exhaustive', patience=1)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_anytime_patience(monkeypatch, workers):
+    monkeypatch.setattr(parallel_motif_search, 'RANDOMIZED_RUNS_PER_TASK', 4)
+    dna_strings = random_dna('ACGTN', 'patience', count=4, length=30)
+    reports = []
+    motifs = parallel_motif_search.anytime_motif_search(dna_strings, 5, 4, 'randomized', patience=10, seed=4,
+                                                        workers=workers, on_progress=lambda p: reports.append(dict(p)))
+    progress = reports[-1]
+
+    # Stops on the block where the 10th run in a row without improvement finished
+    assert progress['runs'] >= 10 and progress['runs'] % 4 == 0
+    assert len(reports) == progress['runs'] // 4
+    assert progress['best_score'] == reference_score(motifs)
+    scores = [score for _, score in progress['history']]
+    assert scores == sorted(scores, reverse=True) and len(set(scores)) == len(scores)
+    assert scores[-1] == progress['best_score']
+    assert progress['iterations_per_second'] == pytest.approx(progress['iterations'] / progress['elapsed'])
+
+    # Best of the runs done so far (each run has the same seed whichever worker ran it)
+    if workers == 1:
+        windows = parallel_motif_search.sequence_windows(dna_strings, 5)
+        runs = [parallel_motif_search.randomized_motifs_from_seed(dna_strings, windows, 5, 4, seed_sequence)
+                for seed_sequence in parallel_motif_search.run_seeds(4, progress['runs'])]
+        assert motifs == min(runs, key=lambda run: run[0])[1]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_anytime_time_budget(workers):
+    dna_strings = random_dna('ACGT', 'budget', count=5, length=200)
+    reports = []
+    motifs = parallel_motif_search.anytime_motif_search(dna_strings, 8, 5, 'gibbs', time_budget=0.5, seed=5,
+                                                        workers=workers, on_progress=lambda p: reports.append(dict(p)))
+    assert len(motifs) == 5 and all(motif in dna_string for motif, dna_string in zip(motifs, dna_strings))
+    # Running chains stop at the deadline, so the search ends shortly after it
+    assert 0.5 <= reports[-1]['elapsed'] < 5
+    assert reports[-1]['best_score'] == reference_score(motifs)
+
+
+def test_gibbs_chain_stops_on_plateau_and_deadline():
+    dna_strings = random_dna('ACGT', 'plateau', count=4, length=30)
+    windows = parallel_motif_search.sequence_windows(dna_strings, 5)
+    seed_sequence = parallel_motif_search.run_seeds(0, 1)[0]
+    _, _, iterations = parallel_motif_search.gibbs_chain(dna_strings, windows, 5, 4, seed_sequence, 100000, patience=50)
+    assert 50 <= iterations < 100000
+    # Same draws as without patience, up to where the chain stopped
+    expected = reference_gibbs_chain(dna_strings, 5, 4, seed_sequence, iterations)
+    assert parallel_motif_search.gibbs_chain(dna_strings, windows, 5, 4, seed_sequence, iterations)[:2] == expected
+
+    score, motifs, iterations = parallel_motif_search.gibbs_chain(dna_strings, windows, 5, 4, seed_sequence, 100000,
+                                                                 deadline=0.0)
+    assert iterations == 0 and score == reference_score(motifs)
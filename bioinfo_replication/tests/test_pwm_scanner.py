@@ -0,0 +1,71 @@
+#PWM scanner against profile_most_probable_kmer (string version)
+
+import random
+
+import numpy as np
+import pytest
+
+from dna_encoding import masked_kmer_codes
+from pwm_scanner import (batch_most_probable_positions, first_best, kmer_code_log_scores, log_profile,
+                         most_probable_position, profile_most_probable_kmers, window_log_scores)
+
+ROWS = {'A': 0, 'C': 1, 'G': 2, 'T': 3}
+
+
+def reference_most_probable(text, k, profile):
+    """The original loop: product of probabilities, other symbols (lower case included) give 0."""
+    best_probability, best_kmer = -1.0, ""
+    for i in range(len(text) - k + 1):
+        probability = 1.0
+        for j, symbol in enumerate(text[i:i + k]):
+            probability = probability * profile[ROWS[symbol]][j] if symbol in ROWS else 0.0
+        if probability > best_probability:
+            best_probability, best_kmer = probability, text[i:i + k]
+    return best_kmer
+
+
+def random_profile(rng, k):
+    return np.array([[rng.choice([0, 0.1, 0.2, 0.25, 0.4]) for _ in range(k)] for _ in range(4)])
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgt'])
+def test_most_probable_matches_reference(alphabet):
+    rng = random.Random(alphabet)
+    for _ in range(500):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        k = rng.randint(1, 8)
+        profile = random_profile(rng, k)
+        expected = reference_most_probable(text, k, profile)
+        position = most_probable_position(text, log_profile(profile, k))
+        assert (text[position:position + k] if position >= 0 else "") == expected
+        assert profile_most_probable_kmers([text, text.encode('ascii')], k, profile)[0] == expected
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgt'])
+def test_kmer_code_scores(alphabet):
+    rng = random.Random(alphabet + 'codes')
+    for _ in range(300):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        k = rng.choice([1, 3, 4, 5, 8, 13, 32])
+        profile = random_profile(rng, k)
+        scores = kmer_code_log_scores(*masked_kmer_codes(text, k), log_profile(profile, k))
+        assert np.allclose(scores, window_log_scores(text, log_profile(profile, k)))
+        position = int(first_best(scores)) if scores.size else -1
+        assert (text[position:position + k] if position >= 0 else "") == reference_most_probable(text, k, profile)
+
+
+def test_lower_case_has_probability_zero():
+    profile = np.full((4, 3), 0.25)
+    assert np.isneginf(window_log_scores('acg', log_profile(profile))).all()
+    assert most_probable_position('acgACG', log_profile(profile)) == 3
+
+
+def test_batch_positions():
+    profile = np.array([[1.0, 0, 0], [0, 1.0, 0], [0, 0, 1.0], [0, 0, 0]])
+    assert batch_most_probable_positions(['TTACG', 'AC', 'ACGACG'], log_profile(profile)) == [2, -1, 0]
+
+
+def test_first_best_ties():
+    scores = np.log(np.array([0.1, 0.3, 0.1 * 3, 0.2]))
+    assert first_best(scores) == 1
+    assert first_best(np.full(3, -np.inf)) == 0
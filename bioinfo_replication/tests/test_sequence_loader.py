@@ -0,0 +1,92 @@
+#Memory-mapped loader against reading the file into a str
+
+import os
+import random
+
+import numpy as np
+import pytest
+
+import sequence_loader
+from sequence_loader import find_pattern, line_text, load_genome, map_lines, stripped_cache_path
+
+
+def reference_sequence(content):
+    """Sequence of a plain, wrapped or FASTA file: header lines dropped, whitespace removed."""
+    return ''.join(''.join(line.split()) for line in content.split('\n') if not line.startswith('>'))
+
+
+def reference_positions(text, pattern):
+    return [i for i in range(len(text) - len(pattern) + 1) if text[i:i + len(pattern)] == pattern]
+
+
+def write(path, content):
+    with open(path, 'w', newline='') as f:
+        f.write(content)
+    return str(path)
+
+
+def test_single_line_is_viewed_in_place(tmp_path):
+    path = write(tmp_path / 'genome.txt', '  ACGTNacgt\r\n\n')
+    genome = load_genome(path, cache_dir=tmp_path / 'cache')
+    assert line_text(genome) == 'ACGTNacgt'
+    assert not genome.flags.writeable
+    assert not (tmp_path / 'cache').exists()
+
+
+def test_empty_file(tmp_path):
+    path = write(tmp_path / 'empty.txt', '')
+    assert load_genome(path).size == 0
+    assert map_lines(path) == []
+
+
+@pytest.mark.parametrize('chunk_size', [3, 7, 1 << 24])
+def test_fasta_and_wrapped_files(tmp_path, monkeypatch, chunk_size):
+    # Small chunks put headers and line breaks across chunk boundaries
+    monkeypatch.setattr(sequence_loader, 'CHUNK_SIZE', chunk_size)
+    rng = random.Random(chunk_size)
+    for i in range(20):
+        lines = []
+        for _ in range(rng.randint(1, 6)):
+            if rng.random() < 0.3:
+                lines.append('>record ' + ''.join(rng.choice('ACGT xyz') for _ in range(rng.randint(0, 12))))
+            lines.append(''.join(rng.choice('ACGTNacgt') for _ in range(rng.randint(0, 15))))
+        content = rng.choice(['\n', '\r\n']).join(lines) + rng.choice(['', '\n'])
+        if '\n' not in content.strip() and not content.startswith('>'):
+            continue
+
+        path = write(tmp_path / f'genome_{i}.fa', content)
+        genome = load_genome(path, cache_dir=tmp_path)
+        assert line_text(genome) == reference_sequence(content)
+        assert os.path.dirname(stripped_cache_path(path, tmp_path)) == str(tmp_path)
+
+
+def test_stripped_copy_is_refreshed(tmp_path):
+    path = write(tmp_path / 'genome.fa', '>a\nACGT\nAC\n')
+    assert line_text(load_genome(path, cache_dir=tmp_path)) == 'ACGTAC'
+
+    write(path, '>a\nTTTT\nGG\n')
+    os.utime(path, (os.path.getmtime(path) + 10,) * 2)
+    assert line_text(load_genome(path, cache_dir=tmp_path)) == 'TTTTGG'
+
+
+def test_cache_paths_depend_on_the_source_path(tmp_path):
+    first = stripped_cache_path(tmp_path / 'a' / 'genome.fa', tmp_path)
+    second = stripped_cache_path(tmp_path / 'b' / 'genome.fa', tmp_path)
+    assert first != second
+    assert os.path.basename(first).startswith('genome.fa.')
+
+
+def test_map_lines(tmp_path):
+    path = write(tmp_path / 'input.txt', 'ACGTacgtN \r\n\n  ATA\n3 4\n')
+    assert [line_text(line) for line in map_lines(path)] == ['ACGTacgtN', 'ATA', '3 4']
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTN', 'ACGTacgt'])
+def test_find_pattern(alphabet):
+    rng = random.Random(alphabet)
+    for _ in range(300):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 50)))
+        pattern = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 3)))
+        expected = reference_positions(text, pattern)
+        assert find_pattern(text, pattern).tolist() == expected
+        assert find_pattern(np.frombuffer(text.encode('ascii'), dtype=np.uint8), pattern).tolist() == expected
@@ -0,0 +1,37 @@
+#GC skew (part_2 helpers) against the string loop
+
+import random
+
+import pytest
+
+
+def reference_skew(genome):
+    skew = [0]
+    for symbol in genome:
+        skew.append(skew[-1] + (symbol == 'G') - (symbol == 'C'))
+    return skew
+
+
+@pytest.fixture(scope='module')
+def helpers(load_script):
+    return load_script('part_2/helpers.py')
+
+
+@pytest.mark.parametrize('alphabet', ['ACGT', 'ACGTNacgt'])
+def test_skew(helpers, alphabet):
+    rng = random.Random(alphabet)
+    for _ in range(100):
+        genome = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        skew = reference_skew(genome)
+        minimum = min(skew)
+        assert helpers.calculate_skew(genome) == skew
+        assert helpers.find_minimum_skew(genome) == [i for i, value in enumerate(skew) if value == minimum]
+
+        # Streaming and windowed modes, over chunks shorter than the genome
+        chunks = [genome[i:i + 7] for i in range(0, len(genome), 7)]
+        assert helpers.minimum_skew_from_chunks(chunks) == (minimum, helpers.find_minimum_skew(genome))
+        window = rng.randint(1, 10)
+        positions, values = helpers.windowed_skew(genome, window)
+        expected_positions = sorted(set(range(0, len(genome) + 1, window)) | {len(genome)})
+        assert positions.tolist() == expected_positions
+        assert values.tolist() == [skew[i] for i in expected_positions]